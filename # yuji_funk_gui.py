@@ -2,17 +2,1447 @@
 # Rewritten: only accepts WAV and OGG files; consolidated & bug-fixed
 import os
 import sys
-import glob
+import io
 import random
 import time
 import json
 import threading
-import traceback
+import bisect
+import collections
+import logging
+import logging.handlers
+import queue
+import tracemalloc
+import mmap
+import struct
+import wave
+import socket
+import socketserver
+import http.server
 
 from PyQt5 import QtCore, QtGui, QtWidgets
-import pygame
 import keyboard
 
+try:
+    import pygame  # default audio backend (see PygameBackend); the null/callback backends run without it
+except ImportError:
+    pygame = None
+
+try:
+    import orjson  # optional: faster parsing of large settings files
+except ImportError:
+    orjson = None
+
+try:
+    import numpy as np  # optional: offline audio envelope analysis for the vignette
+except ImportError:
+    np = None
+
+# reference point for start-up timings (main window time-to-first-paint)
+_PROCESS_START = time.perf_counter()
+
+# Default borp stage tiers, in progression order. Each tier may be overridden
+# from the 'borp_stages' list in the settings file:
+#   name      - stage key (also used to find its achievement sound)
+#   folder    - subfolder of shared_folder (or absolute path) with the borp files
+#   points    - points per press while in this stage (before combo multiplier)
+#   threshold - score at which this stage is reached
+#   quota     - presses needed to leave this stage (0 = number of files)
+#   sound     - achievement sound file (absolute or in stage_sounds_folder; '' = search by name)
+DEFAULT_BORP_STAGES = [
+    {'name': 'normal', 'folder': 'Normal', 'points': 1, 'threshold': 0, 'quota': 0, 'sound': ''},
+    {'name': 'super', 'folder': 'Super', 'points': 10, 'threshold': 100, 'quota': 0, 'sound': ''},
+    {'name': 'miracle', 'folder': 'Miracle', 'points': 100, 'threshold': 10000, 'quota': 0, 'sound': ''},
+]
+
+# Key bindings (key name as reported by the keyboard hook -> action), editable in
+# Settings and saved as 'key_bindings'. Keys not in the table are dropped by the
+# hook before the core sees them.
+#   borp - play the next borp / collect a token / advance the hyperborb sequence
+#   exit    - acknowledged only (passthrough key, see YujiFunkCore._action_exit)
+#   profile - start/stop the sampling profiler (see SamplingProfiler)
+KEY_ACTIONS = ('borp', 'exit', 'profile')
+DEFAULT_KEY_BINDINGS = {
+    'r': 'borp', '1': 'borp', '2': 'borp', '3': 'borp', '4': 'borp',
+    'numpad 9': 'exit', 'num 9': 'exit', 'numpad9': 'exit', '9': 'exit',
+    'f9': 'profile',
+}
+# minimum seconds between two accepted presses of an action
+DEFAULT_ACTION_DEBOUNCE = {'borp': 0.0, 'exit': 1.0, 'profile': 0.5}
+# whether the OS auto-repeat of a held key triggers the action again (False: dropped while held)
+DEFAULT_ACTION_REPEAT = {'borp': False, 'exit': False, 'profile': False}
+
+# -----------------------------
+# Logging: in-memory ring buffer + background file writer
+# -----------------------------
+log = logging.getLogger("yuji_funk")
+
+class RingBufferHandler(logging.Handler):
+    """Keeps the newest log records in memory; formatting is deferred until they are read."""
+    def __init__(self, capacity=500, level=logging.INFO):
+        super().__init__(level)
+        self.records = collections.deque(maxlen=capacity)
+        self.seq = 0
+        self.listeners = []  # called with no arguments on the logging thread after each record
+
+    def emit(self, record):
+        # no I/O and no formatting on the calling thread
+        self.records.append(record)
+        self.seq += 1
+        for fn in self.listeners:
+            try:
+                fn()
+            except Exception:
+                pass  # a closed window must not break logging
+
+    def tail(self, n=3, station=None):
+        """Formatted messages of the newest n records, oldest first.
+
+        With station, records tagged for another station (extra={'station': k}) are
+        skipped; untagged records are process-wide and always included.
+        """
+        if station is None:
+            records = list(self.records)[-n:]
+        else:
+            records = []
+            for r in reversed(list(self.records)):
+                if getattr(r, 'station', station) == station:
+                    records.append(r)
+                    if len(records) == n:
+                        break
+            records.reverse()
+        out = []
+        for r in records:
+            try:
+                out.append(r.getMessage())
+            except Exception:
+                out.append(str(r.msg))
+        return out
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves message formatting to the listener thread."""
+    def prepare(self, record):
+        return record
+
+
+# records are kept in memory from import time so the GUI can show them even when
+# the file writer is not running (e.g. when the core is embedded in tools)
+LOG_RING = RingBufferHandler()
+log.addHandler(LOG_RING)
+log.setLevel(logging.INFO)
+log.propagate = False
+
+def setup_logging(log_path, level="INFO", console=False, max_bytes=1_000_000, backups=3):
+    """Start the background writer: records are queued on the hot path and written
+    to a rotating file (and optionally stderr) by a QueueListener thread.
+    Returns the listener; call stop() on shutdown to flush."""
+    log.setLevel(getattr(logging, str(level).upper(), logging.INFO))
+    handlers = []
+    try:
+        file_handler = logging.handlers.RotatingFileHandler(log_path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+        file_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)-7s [%(threadName)s] %(message)s"))
+        handlers.append(file_handler)
+    except Exception as e:
+        log.warning("Log file unavailable (%s): %s", log_path, e)
+    if console:
+        stream = logging.StreamHandler()
+        stream.setFormatter(logging.Formatter("[%(levelname)s] %(message)s"))
+        handlers.append(stream)
+    q = queue.SimpleQueue()
+    log.addHandler(_DeferredQueueHandler(q))
+    listener = logging.handlers.QueueListener(q, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener
+
+# -----------------------------
+# Session statistics journal
+# -----------------------------
+def _atomic_write_text(path, text):
+    """Write text to path via a temp file + rename so readers never see a partial file."""
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class StatsJournal:
+    """Append-only game statistics.
+
+    Each game end (and each new high score, coalesced) becomes one small JSON line
+    in the journal. Lines are written and fsynced in batches by a background thread,
+    so a crash loses at most one batch. compact() folds the journal into a snapshot
+    file with totals and per-game history and truncates the journal; it is run at startup.
+    Records carry a sequence number 'n' and the snapshot stores the last one folded,
+    so records still in the journal after a crash between those two steps are skipped.
+    """
+    def __init__(self, journal_path, snapshot_path, history_limit=5000, flush_interval=1.0, batch_size=32):
+        self.journal_path = journal_path
+        self.snapshot_path = snapshot_path
+        self.history_limit = history_limit
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.totals = {'high_score': 0, 'total_score': 0, 'games_played': 0, 'history': []}
+        self._pending = []
+        self._pending_high = None
+        self._cond = threading.Condition()
+        self._file = None
+        self._thread = None
+        self._closing = False
+        self._seq = 0  # last sequence number folded or written
+
+    def compact(self, seed=None):
+        """Fold snapshot + journal into a new snapshot and truncate the journal.
+
+        seed provides starting totals when no snapshot exists yet (migration from
+        totals kept in the settings file). Returns the totals dict.
+        """
+        totals = dict(self.totals)
+        try:
+            if os.path.exists(self.snapshot_path):
+                with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                    totals.update(json.load(f))
+            elif seed:
+                totals.update({k: seed[k] for k in ('high_score', 'total_score', 'games_played') if k in seed})
+        except Exception as e:
+            log.error("Stats snapshot unreadable, starting from seed: %s", e)
+        history = list(totals.get('history') or [])
+        folded = totals.get('seq', 0)
+        self._seq = max(self._seq, folded)
+        replayed = skipped = 0
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line after a crash
+                    n = rec.get('n')
+                    if n is not None:
+                        self._seq = max(self._seq, n)
+                        if n <= folded:
+                            skipped += 1  # already in the snapshot (journal not truncated before a crash)
+                            continue
+                    replayed += 1
+                    score = rec.get('score', 0)
+                    totals['high_score'] = max(totals['high_score'], score)
+                    if rec.get('t') == 'game':
+                        totals['games_played'] += 1
+                        totals['total_score'] += score
+                        history.append({k: v for k, v in rec.items() if k not in ('t', 'n')})
+        totals['history'] = history[-self.history_limit:]
+        totals['seq'] = self._seq
+        if replayed or skipped or not os.path.exists(self.snapshot_path):
+            _atomic_write_text(self.snapshot_path, json.dumps(totals, separators=(',', ':')))
+            # journal content is now in the snapshot (and skipped by seq if this truncation is lost)
+            with open(self.journal_path, 'w') as f:
+                os.fsync(f.fileno())
+        log.info("Stats compacted: %d journal records (%d already folded), %d games total",
+                 replayed, skipped, totals['games_played'])
+        self.totals = totals
+        return totals
+
+    def open(self):
+        """Open the journal for appending and start the batch writer."""
+        self._file = open(self.journal_path, 'a', encoding='utf-8')
+        self._thread = threading.Thread(target=self._writer, name="StatsJournal", daemon=True)
+        self._thread.start()
+
+    def append(self, record):
+        with self._cond:
+            self._pending.append(record)
+            if len(self._pending) >= self.batch_size:
+                self._cond.notify()
+
+    def note_high_score(self, record):
+        """Queue a high-score record; repeated calls before the next flush keep only the latest."""
+        with self._cond:
+            self._pending_high = record
+
+    def close(self):
+        """Flush pending records and stop the writer."""
+        with self._cond:
+            self._closing = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _writer(self):
+        while True:
+            with self._cond:
+                if not self._closing:
+                    self._cond.wait(self.flush_interval)
+                batch = self._pending
+                self._pending = []
+                if self._pending_high is not None:
+                    batch.append(self._pending_high)
+                    self._pending_high = None
+                closing = self._closing
+            if batch and self._file is not None:
+                lines = []
+                for r in batch:
+                    self._seq += 1
+                    lines.append(json.dumps(dict(r, n=self._seq), separators=(',', ':')) + '\n')
+                try:
+                    self._file.write(''.join(lines))
+                    self._file.flush()
+                    os.fsync(self._file.fileno())
+                except Exception as e:
+                    log.error("Stats journal write failed: %s", e, exc_info=True)
+            if closing:
+                return
+
+# -----------------------------
+# Settings store: schema-validated, atomic, debounced, diffed
+# -----------------------------
+# top-level key -> (accepted types, clamp/normalise function or None)
+SETTINGS_SCHEMA = {
+    'high_score': ((int, float), None),
+    'total_score': ((int, float), None),
+    'games_played': (int, lambda v: max(0, v)),
+    'token_chance': ((int, float), lambda v: max(0.0, min(1.0, float(v)))),
+    'cooldown': ((int, float), lambda v: max(0.0, float(v))),
+    'funk_every_n_borps': (int, lambda v: max(1, v)),
+    'sound_settings': (dict, None),
+    'paths': (dict, lambda v: {k: p for k, p in v.items() if isinstance(p, (str, dict))}),
+    'borp_stages': (list, None),
+    'key_bindings': (dict, lambda v: {str(k): a for k, a in v.items() if isinstance(a, str)}),
+    'metrics_port': (int, lambda v: max(0, min(65535, v))),
+    'input_port': (int, lambda v: max(0, min(65535, v))),
+    'pcm_cache_mb': (int, lambda v: max(0, min(4096, v))),
+    'station_volume': ((int, float), lambda v: max(0.0, min(1.0, float(v)))),
+    'station_pan': ((int, float), lambda v: max(-1.0, min(1.0, float(v)))),
+    'action_repeat': (dict, lambda v: {a: r for a, r in v.items() if isinstance(r, bool)}),
+    'action_debounce': (dict, lambda v: {a: max(0.0, float(t)) for a, t in v.items()
+                                         if isinstance(t, (int, float)) and not isinstance(t, bool)}),
+}
+
+def validate_settings(raw):
+    """Return (settings, problems): keys with the wrong type are dropped so the
+    caller's defaults apply; unknown keys are kept as-is for forward compatibility."""
+    problems = []
+    if not isinstance(raw, dict):
+        return {}, [f"top level is {type(raw).__name__}, expected object"]
+    clean = dict(raw)
+    for key, (types, normalise) in SETTINGS_SCHEMA.items():
+        if key not in clean:
+            continue
+        value = clean[key]
+        if not isinstance(value, types) or isinstance(value, bool):
+            problems.append(f"{key}: unexpected {type(value).__name__}")
+            del clean[key]
+            continue
+        if normalise is not None:
+            clean[key] = normalise(value)
+    sound = clean.get('sound_settings')
+    if sound:
+        # one cheap shape check per entry; values are clamped where they are used
+        bad = [k for k, v in sound.items() if type(v) is not dict]
+        for k in bad:
+            del sound[k]
+        if bad:
+            problems.append(f"sound_settings: dropped {len(bad)} malformed entries")
+    return clean, problems
+
+
+class SettingsStore:
+    """Persists the settings JSON one top-level section at a time.
+
+    Each section's encoded text is cached; save() only re-encodes sections whose
+    value changed. Small sections are diffed by their encoding; large ones such as
+    sound_settings are flagged with mark_dirty, optionally naming the changed
+    entries so only those rows are re-encoded. Writes go to a temp file that is
+    renamed over the original, and rapid saves are coalesced by a debounce timer.
+    """
+    LAZY_SECTIONS = ('sound_settings',)
+
+    def __init__(self, path, debounce=0.5):
+        self.path = path
+        self.debounce = debounce
+        self._values = {}
+        self._encoded = {}
+        self._rows = {}            # lazy section -> {entry key: encoded row}
+        self._dirty_entries = {}   # lazy section -> set of entry keys (None = all)
+        self._dirty = set()
+        self._lock = threading.RLock()
+        self._timer = None
+        self.last_write_stat = None
+
+    def load(self):
+        """Read and validate the settings file; returns {} when it does not exist."""
+        if not os.path.exists(self.path):
+            return {}
+        t0 = time.perf_counter()
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        raw = orjson.loads(data) if orjson is not None else json.loads(data)
+        settings, problems = validate_settings(raw)
+        for problem in problems:
+            log.warning("Settings %s: %s", os.path.basename(self.path), problem)
+        with self._lock:
+            # the file is the baseline; nothing is dirty until a section changes
+            self._values = dict(settings)
+            self._encoded = {}
+            self._rows = {}
+            self._dirty_entries = {}
+            self._dirty.clear()
+        log.info("Settings loaded in %.1f ms (%d sound entries)", (time.perf_counter() - t0) * 1000.0,
+                 len(settings.get('sound_settings', {})))
+        return settings
+
+    def set(self, key, value):
+        """Stage a section value; returns True when it differs from what is on disk."""
+        with self._lock:
+            self._values[key] = value
+            if key in self.LAZY_SECTIONS:
+                if key not in self._encoded:
+                    self.mark_dirty(key)
+                return key in self._dirty
+            encoded = self._encode(key, value)
+            if self._encoded.get(key) != encoded:
+                self._encoded[key] = encoded
+                self._dirty.add(key)
+                return True
+            return False
+
+    def mark_dirty(self, key, entries=None):
+        """Flag a section as changed; for lazy sections entries limits re-encoding to those keys."""
+        with self._lock:
+            self._dirty.add(key)
+            if key in self.LAZY_SECTIONS:
+                pending = self._dirty_entries.get(key, set())
+                if entries is None or key not in self._rows or pending is None:
+                    self._dirty_entries[key] = None
+                else:
+                    self._dirty_entries[key] = pending | set(entries)
+
+    def save(self, immediate=False):
+        """Write now, or (default) after debounce seconds of no further save() calls."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not immediate:
+                self._timer = threading.Timer(self.debounce, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+                return
+        self.flush()
+
+    def flush(self):
+        """Write pending changes atomically; returns False when nothing was dirty."""
+        with self._lock:
+            self._timer = None
+            if not self._dirty:
+                return False
+            t0 = time.perf_counter()
+            dirty = sorted(self._dirty)
+            for key in dirty:
+                if key not in self._values:
+                    continue
+                if key in self.LAZY_SECTIONS and isinstance(self._values[key], dict):
+                    self._encoded[key] = self._encode_rows(key, self._values[key], self._dirty_entries.pop(key, None))
+                else:
+                    self._encoded[key] = self._encode(key, self._values[key])
+            # sections not staged since load (e.g. keys written by newer builds) are kept
+            for key, value in self._values.items():
+                if key not in self._encoded:
+                    self._encoded[key] = self._encode(key, value)
+            text = "{\n" + ",\n".join(f"  {json.dumps(k)}: {v}" for k, v in self._encoded.items()) + "\n}\n"
+            self._dirty.clear()
+            try:
+                _atomic_write_text(self.path, text)
+                st = os.stat(self.path)
+                self.last_write_stat = (st.st_mtime_ns, st.st_size)
+            except Exception as e:
+                self._dirty.update(dirty)
+                log.error("Error saving settings: %s", e, exc_info=True)
+                return False
+        log.info("Settings saved (%s) in %.1f ms", ", ".join(dirty), (time.perf_counter() - t0) * 1000.0)
+        return True
+
+    def _encode_rows(self, key, value, entries):
+        # one entry per line keeps the file diffable without indent=2's cost
+        def row(k, v):
+            return f"    {json.dumps(k)}: {json.dumps(v, separators=(', ', ': '))}"
+        rows = self._rows.get(key)
+        if rows is None or entries is None:
+            rows = {k: row(k, v) for k, v in value.items()}
+        else:
+            for k in entries:
+                if k in value:
+                    rows[k] = row(k, value[k])
+                else:
+                    rows.pop(k, None)
+        self._rows[key] = rows
+        return "{\n" + ",\n".join(rows.values()) + "\n  }" if rows else "{}"
+
+    @staticmethod
+    def _encode(key, value):
+        if key in SettingsStore.LAZY_SECTIONS and isinstance(value, dict):
+            return "{}" if not value else json.dumps(value)
+        return json.dumps(value, indent=2).replace("\n", "\n  ")
+
+# -----------------------------
+# Audio envelopes (offline analysis for the reactive vignette)
+# -----------------------------
+class EnvelopeStore:
+    """Per-asset loudness envelopes at display frame rate, cached in an .npz file.
+
+    An envelope is a uint8 array of shape (frames, 4): overall amplitude and
+    low/mid/high band energy, each scaled to 0-255 per asset. Entries are keyed by
+    path and go stale when the file's mtime or size changes. Needs numpy; without
+    it, or with an audio backend that does not decode, nothing is analyzed and
+    get() always returns None.
+    """
+    FPS = 60
+    BAND_EDGES_HZ = (250.0, 2000.0)  # low < 250 Hz <= mid < 2 kHz <= high
+    CHUNK_FRAMES = 512               # frames per FFT batch (bounds peak memory)
+
+    def __init__(self, path, audio):
+        self.path = path
+        self.audio = audio
+        self._envelopes = {}  # path -> uint8 array (frames, 4)
+        self._stamps = {}     # path -> (mtime_ns, size)
+        self._lock = threading.Lock()
+        self.update_lock = threading.Lock()  # one analysis pass at a time when stations share the store
+        self.loaded = False
+        self.dirty = False
+
+    def load(self):
+        self.loaded = True
+        if np is None or not os.path.exists(self.path):
+            return
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                index = json.loads(str(data['index']))
+                if index.get('fps') != self.FPS:
+                    return
+                envelopes = {path: data[f"e{i}"] for i, (path, _, _) in enumerate(index['entries'])}
+            with self._lock:
+                self._envelopes.update(envelopes)
+                self._stamps.update({path: (mtime_ns, size) for path, mtime_ns, size in index['entries']})
+            log.info("Loaded %d audio envelopes from %s", len(envelopes), os.path.basename(self.path))
+        except Exception as e:
+            log.warning("Envelope cache unreadable, rebuilding: %s", e)
+
+    def save(self):
+        if np is None or not self.dirty:
+            return
+        with self._lock:
+            items = list(self._envelopes.items())
+            stamps = dict(self._stamps)
+            self.dirty = False
+        index = {'fps': self.FPS, 'entries': [[path, *stamps[path]] for path, _ in items]}
+        arrays = {f"e{i}": env for i, (_, env) in enumerate(items)}
+        tmp = self.path + ".tmp"
+        with open(tmp, 'wb') as fh:
+            np.savez_compressed(fh, index=np.array(json.dumps(index)), **arrays)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, self.path)
+
+    def get(self, path):
+        return self._envelopes.get(path)
+
+    @staticmethod
+    def _stamp(path):
+        st = os.stat(path)
+        return st.st_mtime_ns, st.st_size
+
+    def update(self, paths):
+        """Analyze every path without a current envelope; returns how many were added."""
+        if np is None or not self.audio.decodes:
+            return 0
+        added = 0
+        for path in paths:
+            try:
+                stamp = self._stamp(path)
+                if self._stamps.get(path) == stamp:
+                    continue
+                env = self.analyze(path)
+                with self._lock:
+                    self._envelopes[path] = env
+                    self._stamps[path] = stamp
+                    self.dirty = True
+                added += 1
+            except Exception as e:
+                log.warning("Envelope analysis failed for %s: %s", os.path.basename(path), e)
+        return added
+
+    def analyze(self, path):
+        """Decode a file once through the audio backend and compute its envelope (vectorized)."""
+        freq, size, channels = self.audio.format()
+        dtype = {8: np.uint8, -8: np.int8, 16: np.uint16, -16: np.int16, 32: np.float32}[size]
+        pcm = np.frombuffer(self.audio.pcm(self.audio.load(path)), dtype=dtype)
+        mono = pcm[:len(pcm) - len(pcm) % channels].reshape(-1, channels).mean(axis=1, dtype=np.float32)
+        mono -= mono.mean()  # also removes the offset of unsigned formats
+        hop = max(1, freq // self.FPS)
+        n = len(mono) // hop
+        if n == 0:
+            return np.zeros((1, 4), dtype=np.uint8)
+        frames = mono[:n * hop].reshape(n, hop)
+        out = np.empty((n, 4), dtype=np.float32)
+        out[:, 0] = np.sqrt(np.mean(frames * frames, axis=1))
+        window = np.hanning(hop).astype(np.float32)
+        bins = np.fft.rfftfreq(hop, 1.0 / freq)
+        low_edge, high_edge = self.BAND_EDGES_HZ
+        masks = (bins < low_edge, (bins >= low_edge) & (bins < high_edge), bins >= high_edge)
+        for start in range(0, n, self.CHUNK_FRAMES):
+            power = np.abs(np.fft.rfft(frames[start:start + self.CHUNK_FRAMES] * window, axis=1)) ** 2
+            for col, mask in enumerate(masks, 1):
+                out[start:start + len(power), col] = np.sqrt(power[:, mask].sum(axis=1))
+        # scale each column to its 99.5th percentile so single transients don't flatten the rest
+        peak = np.percentile(out, 99.5, axis=0)
+        peak[peak <= 0] = 1.0
+        return np.clip(out * (255.0 / peak), 0, 255).astype(np.uint8)
+
+# -----------------------------
+# Library walker (one directory pass per reload)
+# -----------------------------
+class LibraryWalker:
+    """Lists the .wav/.ogg files of one reload, opening each directory at most once.
+
+    Libraries share folders (hyperborbs sit inside the hyper funk folder, borp
+    stages inside the shared one, and stage sounds are listed both for hyperborb
+    exclusions and achievement lookups), so each directory's scandir result is
+    kept by path and later listings reuse it. Hidden entries are skipped like glob
+    did; extensions match case-insensitively. One walker per reload (not shared
+    between threads).
+    """
+    EXTENSIONS = ('.wav', '.ogg')
+
+    def __init__(self):
+        self._dirs = {}  # folder -> (mtime_ns, sound files, subfolders), None if unreadable
+        self.files_visited = 0
+        self.dirs_opened = 0
+
+    def _scan(self, folder):
+        if folder in self._dirs:
+            return self._dirs[folder]
+        entry = None
+        try:
+            # stamped before listing, so a file added meanwhile makes a packed copy stale
+            mtime_ns = os.stat(folder).st_mtime_ns
+            files, subdirs = [], []
+            with os.scandir(folder) as it:
+                self.dirs_opened += 1
+                for e in it:
+                    if e.name.startswith('.'):
+                        continue
+                    try:
+                        if e.is_dir():
+                            subdirs.append(e.path)
+                            continue
+                    except OSError:
+                        continue
+                    self.files_visited += 1
+                    if e.name.lower().endswith(self.EXTENSIONS):
+                        files.append(e.path)
+            entry = (mtime_ns, files, subdirs)
+        except (OSError, TypeError, ValueError):
+            pass
+        self._dirs[folder] = entry
+        return entry
+
+    def folders(self, root, recursive=False):
+        """root, plus every readable folder below it when recursive (parents first)."""
+        if not recursive:
+            return [root]
+        out, stack = [], [root]
+        while stack:
+            folder = stack.pop()
+            out.append(folder)
+            entry = self._scan(folder)
+            if entry is not None:
+                stack.extend(reversed(entry[2]))
+        return out
+
+    def files(self, folder, recursive=False):
+        """Sound files in folder (and below it when recursive); [] if it is missing."""
+        if not folder:
+            return []
+        out = []
+        for d in self.folders(folder, recursive):
+            entry = self._scan(d)
+            if entry is not None:
+                out.extend(entry[1])
+        return out
+
+    def stamps(self, folders):
+        """Folder -> mtime_ns as of its listing (None if missing), as SoundPack.folder_stamps."""
+        return {folder: (self._scan(folder) or (None,))[0] for folder in folders}
+
+# -----------------------------
+# Sound pack (every library in one memory-mapped file)
+# -----------------------------
+class SoundPack:
+    """Indexed single-file archive of the sound libraries, memory-mapped for loading.
+
+    Layout: a fixed header (magic, version, index offset, index length), the
+    encoded WAV/OGG bytes of every asset at 16-byte aligned offsets, then a JSON
+    index:
+      categories - owner (station) -> library name -> {source, value, dirs, files}:
+                   the library as built from that source, the mtimes of the folders
+                   it was listed from and the assets it uses
+      assets     - path -> [offset, length, format, mtime_ns, size]
+    The sound folders stay the authoring format. A category is current while its
+    source and folder mtimes match; build() rewrites one owner's categories, copying
+    assets whose mtime and size are unchanged out of the old mapping instead of
+    re-reading them. Assets are stored once however many stations use them.
+    """
+    MAGIC = b"YUJIPACK"
+    VERSION = 2
+    HEADER = struct.Struct("<8sIQQ")
+    ALIGN = 16
+
+    def __init__(self, path):
+        self.path = path
+        self.categories = {}
+        self.assets = {}
+        self._mm = None
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+
+    def open(self):
+        """Map the pack file; returns False (leaving the pack empty) if it is missing or invalid."""
+        self.close()
+        try:
+            with open(self.path, 'rb') as fh:
+                mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):  # missing or empty
+            return False
+        try:
+            magic, version, index_offset, index_length = self.HEADER.unpack_from(mm, 0)
+            if magic != self.MAGIC or version != self.VERSION:
+                raise ValueError("not a version %d sound pack" % self.VERSION)
+            index = json.loads(mm[index_offset:index_offset + index_length])
+        except Exception as e:
+            mm.close()
+            log.warning("Sound pack unreadable, ignoring: %s", e)
+            return False
+        with self._lock:
+            self._mm = mm
+            self.categories = index['categories']
+            self.assets = index['assets']
+        return True
+
+    def close(self):
+        with self._lock:
+            mm, self._mm = self._mm, None
+            self.categories, self.assets = {}, {}
+        if mm is not None:
+            mm.close()
+
+    def has(self, path):
+        return path in self.assets
+
+    def asset_bytes(self, path, stamp=None):
+        """Encoded bytes of a packed asset (copied out of the mapping), or None.
+
+        With stamp ((mtime_ns, size) of the file now), a copy packed from an older
+        version of the file is not returned either.
+        """
+        with self._lock:
+            entry = self.assets.get(path)
+            if entry is None or self._mm is None:
+                return None
+            if stamp is not None and tuple(entry[3:5]) != stamp:
+                return None
+            return self._mm[entry[0]:entry[0] + entry[1]]
+
+    @staticmethod
+    def folder_stamps(folders):
+        """Folder -> mtime_ns (None if missing); adding or removing a file changes its folder's mtime."""
+        stamps = {}
+        for folder in folders:
+            try:
+                stamps[folder] = os.stat(folder).st_mtime_ns
+            except (OSError, TypeError, ValueError):
+                stamps[folder] = None
+        return stamps
+
+    @staticmethod
+    def _plain(value):
+        # what the value reads back as from the JSON index (tuples become lists)
+        return json.loads(json.dumps(value))
+
+    def category(self, name, source, owner="0"):
+        """(value, dirs) of a packed library built from source whose folders are unchanged, else None.
+
+        owner's own entry is tried first, then any other station's built from the same source.
+        """
+        source = self._plain(source)
+        categories = self.categories
+        for key in [owner] + [o for o in categories if o != owner]:
+            entry = categories.get(key, {}).get(name)
+            if entry is not None and entry['source'] == source:
+                if self.folder_stamps(entry['dirs']) == entry['dirs']:
+                    return entry['value'], entry['dirs']
+        return None
+
+    def build(self, categories, owner="0"):
+        """Rewrite owner's libraries from {name: (source, value, dirs, files)}; returns (read, reused) or None if current.
+
+        Other owners' categories and assets are carried over as they are. Only new or
+        modified files are opened; the pack is swapped in atomically and reopened (the
+        old mapping is closed first so the file can be replaced on Windows).
+        """
+        with self._build_lock:
+            return self._build(categories, owner)
+
+    def _build(self, categories, owner):
+        index = {'categories': {o: c for o, c in self.categories.items() if o != owner}, 'assets': {}}
+        plan = []  # (path, (mtime_ns, size), reuse)
+        for other in index['categories'].values():
+            for entry in other.values():
+                for path in entry['files']:
+                    old = self.assets.get(path)
+                    if old is not None and path not in index['assets']:
+                        index['assets'][path] = None
+                        plan.append((path, (old[3], old[4]), True))
+        own = index['categories'][owner] = {}
+        for name, (source, value, dirs, files) in categories.items():
+            own[name] = {'source': self._plain(source), 'value': self._plain(value), 'dirs': dirs, 'files': list(files)}
+            for path in files:
+                if path in index['assets']:
+                    continue
+                try:
+                    st = os.stat(path)
+                except (OSError, TypeError, ValueError):
+                    continue
+                stamp = (st.st_mtime_ns, st.st_size)
+                old = self.assets.get(path)
+                index['assets'][path] = None
+                plan.append((path, stamp, old is not None and tuple(old[3:5]) == stamp))
+        if (self._mm is not None and index['categories'] == self.categories
+                and len(plan) == len(self.assets) and all(reuse for _, _, reuse in plan)):
+            return None
+
+        read = reused = 0
+        tmp = self.path + ".tmp"
+        with open(tmp, 'wb') as out:
+            out.write(b"\0" * self.HEADER.size)
+            for path, stamp, reuse in plan:
+                data = self.asset_bytes(path) if reuse else None
+                if data is None:
+                    try:
+                        with open(path, 'rb') as fh:
+                            data = fh.read()
+                    except OSError as e:
+                        log.warning("Sound pack: skipping %s: %s", os.path.basename(path), e)
+                        del index['assets'][path]
+                        continue
+                    read += 1
+                else:
+                    reused += 1
+                out.write(b"\0" * (-out.tell() % self.ALIGN))
+                fmt = 'wav' if data[:4] == b"RIFF" else 'ogg' if data[:4] == b"OggS" else os.path.splitext(path)[1][1:].lower()
+                index['assets'][path] = [out.tell(), len(data), fmt, *stamp]
+                out.write(data)
+            blob = json.dumps(index, separators=(",", ":")).encode('utf-8')
+            index_offset = out.tell()
+            out.write(blob)
+            out.seek(0)
+            out.write(self.HEADER.pack(self.MAGIC, self.VERSION, index_offset, len(blob)))
+            out.flush()
+            os.fsync(out.fileno())
+        self.close()
+        os.replace(tmp, self.path)
+        self.open()
+        return read, reused
+
+
+class PcmStore:
+    """Decoded PCM of short sounds in one anonymous memory map, so each file is decoded once per process.
+
+    Sounds are rebuilt from memoryview slices of the map with the audio backend's
+    from_pcm() (pygame.mixer.Sound(buffer=...) by default), skipping container
+    parsing and format conversion (the backend still copies the slice). Samples are
+    in the backend's output format and kept until the store is cleared or resized.
+    Backends that keep no samples (the null backend) store nothing.
+    Files over max_asset_bytes (long hyper funk tracks) are not kept; once the map
+    is full, further files decode per play as before.
+
+    Entries carry the file's (mtime_ns, size) stamp, so a file edited in place is
+    decoded again. Space of replaced or discarded entries is reclaimed by starting
+    the map over when it fills up.
+    """
+    def __init__(self, capacity, audio, max_asset_bytes=8 << 20):
+        self.capacity = capacity
+        self.audio = audio
+        self.max_asset_bytes = max_asset_bytes
+        self._mm = None
+        self._view = None
+        self._used = 0
+        self._dead = 0    # bytes of replaced or discarded entries
+        self._index = {}  # path -> (offset, length, stamp)
+        self._lock = threading.Lock()
+
+    @property
+    def used(self):
+        return self._used
+
+    def __len__(self):
+        return len(self._index)
+
+    def resize(self, capacity):
+        """Change the capacity (bytes); drops everything stored if it changed."""
+        with self._lock:
+            if capacity == self.capacity:
+                return
+            # one step, so an add() in between cannot map the old size under the new capacity
+            view, mm = self._drop()
+            self.capacity = capacity
+        self._release(view, mm)
+
+    def clear(self):
+        with self._lock:
+            view, mm = self._drop()
+        self._release(view, mm)
+
+    def _drop(self):
+        """Forget everything; caller holds _lock. Returns the old map for _release()."""
+        view, mm = self._view, self._mm
+        self._view = self._mm = None
+        self._index = {}
+        self._used = self._dead = 0
+        return view, mm
+
+    @staticmethod
+    def _release(view, mm):
+        if view is not None:
+            view.release()
+            mm.close()
+
+    def discard(self, paths):
+        """Forget the given paths (files removed from a library); their space is reclaimed later."""
+        with self._lock:
+            for path in paths:
+                entry = self._index.pop(path, None)
+                if entry is not None:
+                    self._dead += entry[1]
+
+    def add(self, path, sound, stamp=None):
+        """Keep a decoded sound's samples; returns False if not kept (too big, full or already stored)."""
+        raw = self.audio.pcm(sound)
+        n = raw.nbytes
+        if n == 0 or n > self.max_asset_bytes:
+            return False
+        with self._lock:
+            entry = self._index.get(path)
+            if entry is not None:
+                if entry[2] == stamp:
+                    return False
+                del self._index[path]  # older version of the file
+                self._dead += entry[1]
+            if self._used + n > self.capacity:
+                if not self._dead or n > self.capacity:
+                    return False
+                # full of partly stale data: start over, live entries are added again on their next load
+                self._index = {}
+                self._used = self._dead = 0
+            if self._mm is None:
+                # reserved up front; physical pages are only used once written
+                self._mm = mmap.mmap(-1, self.capacity)
+                self._view = memoryview(self._mm)
+            self._view[self._used:self._used + n] = raw
+            self._index[path] = (self._used, n, stamp)
+            self._used += n
+        return True
+
+    def sound(self, path, stamp=None):
+        """A new Sound built from the stored samples, or None if path is not stored with this stamp."""
+        with self._lock:
+            entry = self._index.get(path)
+            if entry is None or entry[2] != stamp:
+                return None
+            offset, n, _ = entry
+            return self.audio.from_pcm(self._view[offset:offset + n], path)
+
+# -----------------------------
+# State snapshot (core -> GUI)
+# -----------------------------
+class StateSnapshot:
+    """Latest-value store for core state read by the GUI once per frame.
+
+    Writers overwrite fields from any thread; readers pull only the fields changed
+    since the version they last saw, so any number of updates between two frames
+    costs the GUI a single read. Listeners are called (on the writer's thread)
+    after an update that changed something, so readers can sleep while idle.
+    """
+    def __init__(self, **fields):
+        self._lock = threading.Lock()
+        self._values = dict(fields)
+        self._versions = dict.fromkeys(fields, 0)
+        self.version = 0
+        self.listeners = []
+
+    def update(self, fields):
+        """Apply fields and return the keys whose value actually changed."""
+        changed = []
+        with self._lock:
+            for key, value in fields.items():
+                if key in self._values and self._values[key] == value:
+                    continue
+                self.version += 1
+                self._values[key] = value
+                self._versions[key] = self.version
+                changed.append(key)
+        if changed:
+            for fn in self.listeners:
+                try:
+                    fn()
+                except Exception:
+                    pass
+        return changed
+
+    def get(self, key, default=None):
+        with self._lock:
+            return self._values.get(key, default)
+
+    def changes_since(self, version):
+        """Return (current_version, {field: value}) for fields newer than version."""
+        with self._lock:
+            if version >= self.version:
+                return self.version, {}
+            return self.version, {k: self._values[k] for k, v in self._versions.items() if v > version}
+
+# -----------------------------
+# Audio backends
+# -----------------------------
+# Every backend offers the same small pygame-style API, so the core only ever
+# deals with sounds and voices (channels):
+#   init(voices)                  make at least `voices` voices available
+#   load(path), load_bytes(data, path=None)
+#                                 decode a WAV/OGG file or its encoded bytes into a sound
+#   from_pcm(buffer, path=None), pcm(sound)
+#                                 sound from / samples of PCM in format() = (freq, size, channels)
+#   voice(i)                      object with play(sound), stop(), get_busy(), get_sound(), set_volume(l[, r])
+#   poll_ended(first, count)      voices in [first, first + count) whose sound ended or was cut since the last poll
+#   stop_all(), shutdown()
+# Sounds have set_volume() and get_length().
+class PygameBackend:
+    """pygame.mixer output: voices are mixer Channels, sounds are mixer Sounds."""
+    name = 'pygame'
+    decodes = True
+
+    def __init__(self):
+        if pygame is None:
+            raise RuntimeError("pygame is not installed")
+        self._seen = {}  # voice -> sound it was playing at the last poll
+
+    def init(self, voices):
+        if not pygame.mixer.get_init():
+            pygame.mixer.init()
+            log.info("Pygame mixer initialized.")
+        if pygame.mixer.get_num_channels() < voices:
+            pygame.mixer.set_num_channels(voices)
+        # stations pick their own free channels; keep pygame's automatic allocation off them
+        pygame.mixer.set_reserved(pygame.mixer.get_num_channels())
+
+    def format(self):
+        return pygame.mixer.get_init()
+
+    def voice(self, index):
+        return pygame.mixer.Channel(index)
+
+    def load(self, path):
+        return pygame.mixer.Sound(path)
+
+    def load_bytes(self, data, path=None):
+        return pygame.mixer.Sound(file=io.BytesIO(data))
+
+    def from_pcm(self, buffer, path=None):
+        return pygame.mixer.Sound(buffer=buffer)
+
+    @staticmethod
+    def pcm(sound):
+        return memoryview(sound).cast('B')
+
+    def poll_ended(self, first, count):
+        ended = []
+        for i in range(first, first + count):
+            current = pygame.mixer.Channel(i).get_sound()
+            previous = self._seen.get(i)
+            if previous is not None and current is not previous:
+                ended.append(i)
+            self._seen[i] = current
+        return ended
+
+    def stop_all(self):
+        pygame.mixer.stop()
+
+    def shutdown(self):
+        pygame.mixer.stop()
+        pygame.quit()
+
+
+class _SimSound:
+    """Sound of the null and callback backends: optional int16 stereo samples plus a volume."""
+    def __init__(self, length, samples=None, path=None):
+        self.length = length
+        self.samples = samples
+        self.path = path
+        self.volume = 1.0
+
+    def set_volume(self, value):
+        self.volume = max(0.0, min(1.0, float(value)))
+
+    def get_volume(self):
+        return self.volume
+
+    def get_length(self):
+        return self.length
+
+
+class _SimVoice:
+    """Voice of the null and callback backends; the backend lock guards its fields."""
+    def __init__(self, backend, index):
+        self.backend = backend
+        self.index = index
+        self.sound = None
+        self.position = 0     # next frame to render (callback backend)
+        self.end = 0.0        # monotonic end time (null backend)
+        self.left = self.right = 1.0
+
+    def play(self, sound, loops=0, maxtime=0, fade_ms=0):
+        self.backend._start(self, sound)
+
+    def stop(self):
+        with self.backend._lock:
+            self.backend._finish(self)
+
+    def get_busy(self):
+        return self.backend._busy(self)
+
+    def get_sound(self):
+        return self.sound if self.get_busy() else None
+
+    def set_volume(self, left, right=None):
+        self.left = max(0.0, min(1.0, float(left)))
+        self.right = self.left if right is None else max(0.0, min(1.0, float(right)))
+
+    def get_volume(self):
+        return max(self.left, self.right)
+
+
+class NullBackend:
+    """No audio output: every play is recorded in `events`, for tests and benchmarks.
+
+    Nothing is decoded. WAV lengths come from the file header (other formats get
+    DEFAULT_LENGTH), and a voice stays busy for that long after play().
+    """
+    name = 'null'
+    decodes = False
+    DEFAULT_LENGTH = 1.0
+
+    def __init__(self, history=10000):
+        self.events = collections.deque(maxlen=history)  # (monotonic time, voice, path, volume, left, right)
+        self._voices = {}
+        self._ended = set()
+        self._lock = threading.Lock()
+
+    def init(self, voices):
+        pass
+
+    def format(self):
+        return None
+
+    def voice(self, index):
+        with self._lock:
+            voice = self._voices.get(index)
+            if voice is None:
+                voice = self._voices[index] = _SimVoice(self, index)
+            return voice
+
+    def _length(self, source):
+        try:
+            with wave.open(source, 'rb') as w:
+                return w.getnframes() / float(w.getframerate())
+        except (wave.Error, EOFError):
+            return self.DEFAULT_LENGTH
+
+    def load(self, path):
+        lower = path.lower()
+        if not (lower.endswith('.wav') or lower.endswith('.ogg')):
+            raise ValueError(f"unsupported format: {path}")
+        if not os.path.isfile(path):
+            raise FileNotFoundError(path)
+        return _SimSound(self._length(path) if lower.endswith('.wav') else self.DEFAULT_LENGTH, path=path)
+
+    def load_bytes(self, data, path=None):
+        return _SimSound(self._length(io.BytesIO(data)) if data[:4] == b"RIFF" else self.DEFAULT_LENGTH, path=path)
+
+    def from_pcm(self, buffer, path=None):
+        raise RuntimeError("the null backend keeps no samples")
+
+    @staticmethod
+    def pcm(sound):
+        return memoryview(b"")
+
+    def _start(self, voice, sound):
+        now = time.monotonic()
+        with self._lock:
+            voice.sound = sound
+            voice.end = now + sound.length
+            self.events.append((now, voice.index, sound.path, sound.volume, voice.left, voice.right))
+
+    def _finish(self, voice):
+        if voice.sound is not None:
+            self._ended.add(voice.index)
+        voice.sound = None
+        voice.end = 0.0
+
+    def _busy(self, voice):
+        if voice.sound is None:
+            return False
+        if time.monotonic() < voice.end:
+            return True
+        with self._lock:
+            self._finish(voice)
+        return False
+
+    def poll_ended(self, first, count):
+        for index in range(first, first + count):
+            self._busy(self.voice(index))
+        with self._lock:
+            ended = sorted(i for i in self._ended if first <= i < first + count)
+            self._ended.difference_update(ended)
+        return ended
+
+    def stop_all(self):
+        with self._lock:
+            for voice in self._voices.values():
+                self._finish(voice)
+
+    def shutdown(self):
+        self.stop_all()
+
+
+class CallbackBackend(NullBackend):
+    """Software mixer for buffer-callback output (int16 stereo at RATE Hz); needs numpy.
+
+    render(frames) mixes every playing voice (sound volume x voice left/right) into
+    one block. It is driven by a sounddevice output stream when that package is
+    installed, otherwise (headless boxes, test rigs) by a thread that renders at
+    the real-time rate and discards the output. Sounds are decoded once to int16
+    stereo at RATE: WAV with the wave module, anything else through pygame.
+    """
+    name = 'callback'
+    decodes = True
+    RATE = 44100
+    BLOCK = 256  # frames per callback (5.8 ms at 44.1 kHz)
+
+    def __init__(self, device=None):
+        if np is None:
+            raise RuntimeError("the callback backend needs numpy")
+        super().__init__(history=1000)
+        self.device = device
+        self._stream = None
+        self._pacer = None
+        self._running = False
+
+    def init(self, voices):
+        if self._running:
+            return
+        self._running = True
+        try:
+            import sounddevice
+            self._stream = sounddevice.RawOutputStream(samplerate=self.RATE, channels=2, dtype='int16',
+                                                       blocksize=self.BLOCK, device=self.device,
+                                                       callback=self._device_callback)
+            self._stream.start()
+            log.info("Callback audio on %s", self._stream.device)
+        except Exception as e:  # no sounddevice / no output device
+            log.info("Callback audio without an output device (%s); rendering on a timer", e)
+            self._pacer = threading.Thread(target=self._pace, name="audio-callback", daemon=True)
+            self._pacer.start()
+
+    def _device_callback(self, outdata, frames, time_info, status):
+        outdata[:] = self.render(frames)
+
+    def _pace(self):
+        period = self.BLOCK / float(self.RATE)
+        deadline = time.perf_counter()
+        while self._running:
+            self.render(self.BLOCK)
+            deadline += period
+            delay = deadline - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                deadline = time.perf_counter()  # fell behind; don't try to catch up
+
+    def format(self):
+        return self.RATE, -16, 2
+
+    def _decode(self, source, lower_name):
+        if lower_name.endswith('.wav') or (isinstance(source, io.BytesIO) and source.getvalue()[:4] == b"RIFF"):
+            with wave.open(source, 'rb') as w:
+                width, channels, rate = w.getsampwidth(), w.getnchannels(), w.getframerate()
+                raw = w.readframes(w.getnframes())
+            if width == 1:
+                data = (np.frombuffer(raw, np.uint8).astype(np.int16) - 128) << 8
+            elif width == 2:
+                data = np.frombuffer(raw, '<i2')
+            else:
+                raise ValueError(f"{8 * width}-bit WAV is not supported")
+            data = data[:len(data) - len(data) % channels].reshape(-1, channels)
+        else:
+            if pygame is None:
+                raise RuntimeError("decoding this format needs pygame")
+            if not pygame.mixer.get_init():
+                os.environ.setdefault("SDL_AUDIODRIVER", "dummy")  # decoder only, never an output
+                pygame.mixer.init(frequency=self.RATE, size=-16, channels=2)
+            freq, _, channels = pygame.mixer.get_init()
+            sound = pygame.mixer.Sound(file=source) if isinstance(source, io.BytesIO) else pygame.mixer.Sound(source)
+            data = np.frombuffer(sound.get_raw(), np.int16).reshape(-1, channels)
+            rate = freq
+        data = np.repeat(data[:, :1], 2, axis=1) if data.shape[1] == 1 else data[:, :2]
+        if rate != self.RATE and len(data):
+            # linear resampling to the output rate
+            t = np.arange(int(len(data) * self.RATE / rate)) * (rate / float(self.RATE))
+            data = np.stack([np.interp(t, np.arange(len(data)), data[:, c]) for c in (0, 1)], axis=1)
+        samples = np.ascontiguousarray(data, dtype=np.int16)
+        return _SimSound(len(samples) / float(self.RATE), samples)
+
+    def load(self, path):
+        lower = path.lower()
+        if not (lower.endswith('.wav') or lower.endswith('.ogg')):
+            raise ValueError(f"unsupported format: {path}")
+        sound = self._decode(path, lower)
+        sound.path = path
+        return sound
+
+    def load_bytes(self, data, path=None):
+        sound = self._decode(io.BytesIO(data), '')
+        sound.path = path
+        return sound
+
+    def from_pcm(self, buffer, path=None):
+        samples = np.frombuffer(buffer, np.int16).reshape(-1, 2).copy()
+        return _SimSound(len(samples) / float(self.RATE), samples, path)
+
+    @staticmethod
+    def pcm(sound):
+        return memoryview(sound.samples).cast('B')
+
+    def _start(self, voice, sound):
+        with self._lock:
+            voice.sound = sound
+            voice.position = 0
+            self.events.append((time.monotonic(), voice.index, sound.path, sound.volume, voice.left, voice.right))
+
+    def _finish(self, voice):
+        if voice.sound is not None:
+            self._ended.add(voice.index)
+        voice.sound = None
+        voice.position = 0
+
+    def _busy(self, voice):
+        return voice.sound is not None
+
+    def render(self, frames):
+        """Mix the next `frames` frames of every playing voice; returns interleaved int16 bytes."""
+        mix = np.zeros((frames, 2), np.float32)
+        with self._lock:
+            for voice in self._voices.values():
+                sound = voice.sound
+                if sound is None:
+                    continue
+                chunk = sound.samples[voice.position:voice.position + frames]
+                gain = np.array((voice.left, voice.right), np.float32) * sound.volume
+                mix[:len(chunk)] += chunk * gain
+                voice.position += len(chunk)
+                if voice.position >= len(sound.samples):
+                    self._finish(voice)
+        return np.clip(mix, -32768, 32767).astype('<i2').tobytes()
+
+    def shutdown(self):
+        self._running = False
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+        self.stop_all()
+
+
+AUDIO_BACKENDS = {'pygame': PygameBackend, 'null': NullBackend, 'callback': CallbackBackend}
+
+# -----------------------------
+# Shared audio (one backend and one asset store for every station in the process)
+# -----------------------------
+# Each station (core instance) owns a block of STATION_CHANNELS voices:
+# its named channels first, then a pool for sounds that may overlap.
+STATION_CHANNELS = 16
+STATION_FIXED_CHANNELS = 6
+_audio_lock = threading.Lock()
+_audio = None
+_audio_users = 0
+
+
+def acquire_audio(voices, backend=None):
+    """The process's audio backend, grown to at least `voices` voices.
+
+    The first station picks it: `backend` (a name from AUDIO_BACKENDS or an
+    instance), else YUJI_AUDIO_BACKEND, else pygame. A backend that fails to
+    start falls back to the null backend so the core still runs without a device.
+    """
+    global _audio, _audio_users
+    with _audio_lock:
+        if _audio is None:
+            backend = backend or os.environ.get("YUJI_AUDIO_BACKEND", "pygame")
+            try:
+                if isinstance(backend, str):
+                    backend = AUDIO_BACKENDS[backend]()
+                backend.init(voices)
+            except Exception as e:
+                log.error("Audio backend %s unavailable (%s); using the null backend", backend, e)
+                backend = NullBackend()
+            _audio = backend
+            log.info("Audio backend: %s", _audio.name)
+        else:
+            _audio.init(voices)
+        _audio_users += 1
+        return _audio
+
+
+def release_audio():
+    """Drop one station's hold on the audio backend; the last one shuts it down. True for the last."""
+    global _audio, _audio_users
+    with _audio_lock:
+        _audio_users = max(0, _audio_users - 1)
+        if _audio_users or _audio is None:
+            return _audio_users == 0
+        audio, _audio = _audio, None
+    try:
+        audio.shutdown()
+    except Exception as e:
+        log.warning("Audio shutdown failed: %s", e)
+    return True
+
+
+class AssetStore:
+    """Sound pack, decoded PCM and audio envelopes, shared by every station in the process.
+
+    base is the sidecar path prefix the files are derived from (the first station's);
+    audio is the process's audio backend, which decodes everything stored here.
+    """
+    def __init__(self, base, pcm_bytes, audio):
+        # YUJI_SOUND_PACK=0 scans and loads from the folders only
+        self.sound_pack = None
+        if os.environ.get("YUJI_SOUND_PACK", "1") != "0":
+            self.sound_pack = SoundPack(base + "_sounds.pack")
+            self.sound_pack.open()
+        self.pcm = PcmStore(pcm_bytes, audio)
+        self.envelopes = EnvelopeStore(base + "_envelopes.npz", audio)
+
 # -----------------------------
 # Core: Yuji Funk Sound / Logic
 # -----------------------------
@@ -22,25 +1452,45 @@ class YujiFunkCore(QtCore.QObject):
     hyper_active_changed = QtCore.pyqtSignal(bool)
     last_sound_changed = QtCore.pyqtSignal(str)
     status_message = QtCore.pyqtSignal(str)
-    score_changed = QtCore.pyqtSignal(int)
-    high_score_changed = QtCore.pyqtSignal(int)
+    score_changed = QtCore.pyqtSignal(float)
+    high_score_changed = QtCore.pyqtSignal(float)
     multiplier_changed = QtCore.pyqtSignal(float)
 
-    def __init__(self, parent=None):
+    # token system sound files (fixed names inside token_folder)
+    TOKEN_SOUNDS = {
+        'token_appeared_sound': "TokenAppeared.wav",
+        'collected_one_sound': "CollectedOneToken.wav",
+        'collected_two_sound': "CollectedTwoTokens.wav",
+        'collected_three_sound': "CollectedThreeTokens.wav",
+        'winner_sound': "Winner.wav",
+        'loser_sound': "Loser.wav",
+    }
+
+    def __init__(self, parent=None, settings_file=None, station=0, assets=None, audio=None):
         super().__init__(parent)
+        # stations share the process audio backend and (when given) another station's AssetStore;
+        # audio (a name from AUDIO_BACKENDS or a backend) only counts for the first station
+        self.station = station
+        self.channel_base = station * STATION_CHANNELS
+
+        # -------- state snapshot polled by the GUI --------
+        self.state = StateSnapshot(score=0, high_score=0, multiplier=1.0, token_count=0,
+                                   token_active=False, hyper_active=False, last_sound='---', reload=None)
+        # the *_changed signals are still emitted for external listeners, but only on change
+        self._state_signals = {
+            'score': self.score_changed,
+            'high_score': self.high_score_changed,
+            'multiplier': self.multiplier_changed,
+            'token_count': self.token_count_changed,
+            'token_active': self.token_active_changed,
+            'hyper_active': self.hyper_active_changed,
+            'last_sound': self.last_sound_changed,
+        }
+        # status text goes straight into the log ring buffer on the emitting thread (no queued hop)
+        self.status_message.connect(self._on_status_message, QtCore.Qt.DirectConnection)
 
         # -------- audio init --------
-        try:
-            pygame.mixer.init()
-            # ensure enough channels
-            try:
-                pygame.mixer.set_num_channels(16)
-            except Exception as e:
-                print("Warning: set_num_channels failed:", e)
-            print("Pygame mixer initialized.")
-        except Exception as e:
-            print("Pygame mixer failed to init:", e)
-            raise
+        self.audio = acquire_audio(self.channel_base + STATION_CHANNELS, audio)
 
         # Input delay & hyper grace
         self.input_delay_start = 0
@@ -58,45 +1508,26 @@ class YujiFunkCore(QtCore.QObject):
         self.token_folder = r"D:\jackpot\JackpotTokens"
         self.stage_sounds_folder = r"D:\jackpot\JackpotTransition"  # achievement sounds folder (configurable)
 
-        # -------- helper loader only for WAV/OGG ----------
-        def load_wav_ogg(folder):
-            if not folder or not os.path.exists(folder):
-                return []
-            wavs = glob.glob(os.path.join(folder, "*.wav"))
-            oggs = glob.glob(os.path.join(folder, "*.ogg"))
-            files = wavs + oggs
-            return files
-
-        # load initial lists
-        self.shared_files = load_wav_ogg(self.shared_folder)
-        self.funk_files = load_wav_ogg(self.funk_folder)
-        self.special_files = load_wav_ogg(self.special_folder)
-        self.hyper_funk_files = load_wav_ogg(self.hyper_funk_folder)
-
-        # ensure hyperborb folder exists
-        try:
-            os.makedirs(self.hyperborb_folder, exist_ok=True)
-        except Exception:
-            pass
+        # -------- sound libraries (filled after settings are loaded) ----------
+        self.shared_files = []
+        self.funk_files = []
+        self.special_files = []
+        self.hyper_funk_files = []
         self.hyperborb_files = []
-        self.reload_hyperborb_files()
-
-        # token system sound files (explicit)
-        self.token_appeared_sound = os.path.join(self.token_folder, "TokenAppeared.wav")
-        self.collected_one_sound = os.path.join(self.token_folder, "CollectedOneToken.wav")
-        self.collected_two_sound = os.path.join(self.token_folder, "CollectedTwoTokens.wav")
-        self.collected_three_sound = os.path.join(self.token_folder, "CollectedThreeTokens.wav")
-        self.winner_sound = os.path.join(self.token_folder, "Winner.wav")
-        self.loser_sound = os.path.join(self.token_folder, "Loser.wav")
+        self._hyperborb_excluded = 0
+        for attr, fname in self.TOKEN_SOUNDS.items():
+            setattr(self, attr, os.path.join(self.token_folder, fname))
+        # library name -> source it was last loaded from (see _library_sources)
+        self._loaded_sources = {}
+        # held while presses are handled and while new libraries are swapped in
+        self._library_lock = threading.RLock()
+        self._reload_guard = threading.Lock()
+        self._reload_thread = None
+        self._reload_again = False
 
         # ---------- borp stages ----------
-        self.borp_stages = {
-            'normal': {'folder': 'Normal', 'points': 1, 'threshold': 0, 'files': [], 'current': 0, 'quota': 0, 'active': True},
-            'super': {'folder': 'Super', 'points': 10, 'threshold': 100, 'files': [], 'current': 0, 'quota': 0, 'active': False},
-            'miracle': {'folder': 'Miracle', 'points': 100, 'threshold': 10000, 'files': [], 'current': 0, 'quota': 0, 'active': False}
-        }
-        # initialize current stage to avoid AttributeError in borp flow
-        self.current_stage = 'normal'
+        # ordered tier table (name -> stage data); replaced from settings in load_settings
+        self.configure_borp_stages(DEFAULT_BORP_STAGES)
 
         # scoring
         self.score = 0
@@ -107,16 +1538,92 @@ class YujiFunkCore(QtCore.QObject):
         self.current_multiplier = 1.0
         self.combo_window = 3.0
 
+        # press-to-audio latency tracing and the on-demand profiler
+        self.latency = LatencyTracer()
+        self.profiler = SamplingProfiler()
+
+        # live counters, served in Prometheus format when metrics_port is set
+        self.metrics = MetricsRegistry()
+        self.metrics_port = 0
+        self.metrics_server = None
+        self._init_metrics()
+        # presses from external controllers over a local socket (off unless input_port is set)
+        self.input_port = 0
+        self.input_server = None
+
+        # key bindings (replaced from settings in load_settings); every station hooks the same
+        # keyboard, so only the first one gets the defaults and the others start unbound
+        self._action_handlers = {'borp': self._action_borp, 'exit': self._action_exit, 'profile': self.toggle_profiler}
+        self._action_last = {}
+        self.configure_key_bindings(DEFAULT_KEY_BINDINGS if station == 0 else {}, DEFAULT_ACTION_DEBOUNCE,
+                                    DEFAULT_ACTION_REPEAT)
+
         # persistence
-        self.settings_file = os.path.join(os.path.dirname(os.path.realpath(__file__)), "yuji_funk_settings.json")
+        # settings_file overrides the default next to this script (benchmarks, extra instances)
+        self.settings_file = settings_file or os.path.join(os.path.dirname(os.path.realpath(__file__)), "yuji_funk_settings.json")
         self.sound_settings = {}
+        self.settings_store = SettingsStore(self.settings_file)
+        self.pcm_cache_mb = 256
+        self.station_volume = 1.0
+        self.station_pan = 0.0
         self.load_settings()
+        if not self.key_actions:
+            self.status_message.emit(f"Station {station + 1} has no key bindings; assign keys in Settings "
+                                     f"({os.path.basename(self.settings_file)})")
+        # the core loop re-applies the file when something else rewrites it (see _check_settings_file)
+        self._settings_seen = self._settings_file_stamp()
+        self._settings_next_check = 0.0
+
+        # sound pack (all libraries in one memory-mapped file, rebuilt in the background after
+        # folder scans), decoded samples of short sounds (filled by validation and first plays)
+        # and the hyper funk / hyperborb envelopes that drive the vignette
+        # the station that builds the store owns its size; the others share it and mirror that size
+        self._owns_assets = assets is None
+        self.assets = assets or AssetStore(self._sidecar_base(""), self.pcm_cache_mb << 20, self.audio)
+        self.sound_pack = self.assets.sound_pack
+        self.pcm = self.assets.pcm
+        self.envelopes = self.assets.envelopes
+        if not self._owns_assets:
+            self.pcm_cache_mb = self.pcm.capacity >> 20
+        self._library_dirs = {}  # library name -> folder stamps taken when it was listed
+        self._stage_sounds_listing = None  # (folder, mtime_ns, files) from the last walk of stage_sounds_folder
+        self.last_walk = (0, 0)  # (files visited, folders opened) by the last library listing
+        self._pack_thread = None
+        self._pack_again = False
+
+        # session statistics: the journal is authoritative for totals once it exists
+        stats_base = self._sidecar_base("_stats")
+        self.session_id = time.strftime("%Y%m%d-%H%M%S")
+        self.game_hyper_count = 0
+        self.game_stage_index = 0
+        self.stats = StatsJournal(stats_base + ".jsonl", stats_base + ".json")
+        try:
+            totals = self.stats.compact(seed={'high_score': self.high_score, 'total_score': self.total_score,
+                                              'games_played': self.games_played})
+            self.high_score = max(self.high_score, totals['high_score'])
+            self.total_score = totals['total_score']
+            self.games_played = totals['games_played']
+        except Exception as e:
+            log.error("Stats compaction failed; the journal is kept for the next start: %s", e, exc_info=True)
+        try:
+            self.stats.open()
+        except Exception as e:
+            log.error("Stats journal unavailable: %s", e, exc_info=True)
+        self._publish(high_score=self.high_score)
 
-        # after load, reload dynamic folders
-        self.reload_borp_stage_files()
-        self.reload_hyper_funk_files()
-        self.reload_hyperborb_files()
-        self.reload_token_sounds()
+        self._active_tracks = ()  # (envelope, start, channel, end, sound) of tracks playing
+        self._envelope_thread = None
+        self._envelope_again = False
+
+        # ensure hyperborb folder exists
+        try:
+            os.makedirs(self.hyperborb_folder, exist_ok=True)
+        except Exception:
+            pass
+        # after load, scan every library from the configured folders
+        self._reload_now(list(self._library_sources()))
+        self._rebuild_pack_async()  # also picks up files modified in place since the last run
+        self.configure_metrics_server(self.metrics_port)
 
         # cooldowns
         self.cooldown = getattr(self, 'cooldown', 0)
@@ -146,13 +1653,14 @@ class YujiFunkCore(QtCore.QObject):
         # mixer channels
         # ensure channels exist (we set number earlier)
         try:
-            self.borp_channel = pygame.mixer.Channel(0)
-            self.sound_channel = pygame.mixer.Channel(1)       # normal funk & misc
-            self.special_channel = pygame.mixer.Channel(2)     # achievements / special
-            self.winner_channel = pygame.mixer.Channel(3)      # winner voice
-            self.hyper_funk_channel = pygame.mixer.Channel(4)  # hyper funk music
+            base = self.channel_base
+            self.borp_channel = self.audio.voice(base)
+            self.sound_channel = self.audio.voice(base + 1)       # normal funk & misc
+            self.special_channel = self.audio.voice(base + 2)     # achievements / special
+            self.winner_channel = self.audio.voice(base + 3)      # winner voice
+            self.hyper_funk_channel = self.audio.voice(base + 4)  # hyper funk music
         except Exception as e:
-            print("Channel creation warning:", e)
+            log.warning("Channel creation warning: %s", e)
             # fallback: access channels lazily later
 
         # volumes: clamp between 0.0 and 1.0
@@ -174,26 +1682,39 @@ class YujiFunkCore(QtCore.QObject):
 
         # dedicated normal-funk channel to avoid collisions with misc sounds
         try:
-            self.normal_funk_channel = pygame.mixer.Channel(5)
+            self.normal_funk_channel = self.audio.voice(self.channel_base + 5)
         except Exception:
             self.normal_funk_channel = getattr(self, 'sound_channel', None)
-
-        # track stage achievement sound playback per run
-        self.stage_sound_played = {'super': False, 'miracle': False}
+        self.configure_mix(self.station_volume, self.station_pan)
 
         # runtime control
         self.running = False
         self.loop_thread = None
 
+    # -------------------------
+    # State publishing
+    # -------------------------
+    def _publish(self, **fields):
+        """Update the state snapshot; changed fields are forwarded to connected *_changed signals."""
+        for key in self.state.update(fields):
+            signal = self._state_signals.get(key)
+            if signal is not None and self.receivers(signal) > 0:
+                signal.emit(fields[key])
+
+    def _on_status_message(self, msg):
+        # tagged so each station's window only shows its own status lines
+        log.info("%s", msg, extra={'station': self.station})
+
     # -------------------------
     # File loaders (wav/ogg only)
     # -------------------------
-    def _filter_loadable(self, files):
-        """Return only files pygame can load (wav or ogg)."""
+    def _filter_loadable(self, files, progress=None):
+        """Return only files the audio backend can load (wav or ogg)."""
         loadable = []
         for f in files:
             try:
-                if not os.path.exists(f):
+                stamp = self._file_stamp(f)
+                if stamp is None:
                     continue
                 # only allow .wav or .ogg
                 lower = f.lower()
@@ -201,130 +1722,475 @@ class YujiFunkCore(QtCore.QObject):
                     continue
                 # attempt to create a Sound object to verify loadable
                 try:
-                    _ = pygame.mixer.Sound(f)
+                    self.pcm.add(f, self.audio.load(f), stamp)
                     loadable.append(f)
                 except Exception as e:
                     # skip but log
                     self.status_message.emit(f"Unplayable (skipped): {os.path.basename(f)} -> {e}")
             except Exception:
                 continue
+            finally:
+                if progress is not None:
+                    progress()
         return loadable
 
-    def reload_hyperborb_files(self):
-        """Populate hyperborb_files from hyperborb_folder, numeric sort when possible."""
-        folder = self.hyperborb_folder
-        self.hyperborb_files = []
-        if not folder or not os.path.exists(folder):
-            self.status_message.emit(f"Hyperborb folder missing: {folder}")
-            return
+    def _library_sources(self):
+        """Library name -> source it is loaded from; a library is rescanned only when this changes."""
+        sources = {
+            'shared': self.shared_folder,
+            'funk': self.funk_folder,
+            'special': self.special_folder,
+            'hyper_funk': self.hyper_funk_folder,
+            # hyperborbs exclude stage achievement sounds, so those locations count too
+            'hyperborb': (self.hyperborb_folder, self.stage_sounds_folder,
+                          tuple(sorted(s['sound'] for s in self.borp_stages.values() if s.get('sound')))),
+            'token': self.token_folder,
+        }
+        for name, stage in self.borp_stages.items():
+            sources['stage:' + name] = self._stage_folder_path(stage)
+        return sources
+
+    def _list_library(self, name, source, walker):
+        """Candidate files of a library (directory listing only, nothing is decoded)."""
+        if name in ('shared', 'funk', 'special'):
+            return walker.files(source)
+        if name == 'hyper_funk':
+            if not source or not os.path.exists(source):
+                self.status_message.emit(f"Hyper Funk folder missing: {source}")
+                return None
+            return walker.files(source, recursive=True)
+        if name == 'hyperborb':
+            if not source[0] or not os.path.exists(source[0]):
+                self.status_message.emit(f"Hyperborb folder missing: {source[0]}")
+                return None
+            return walker.files(source[0], recursive=True)
+        if name.startswith('stage:'):
+            return walker.files(source)
+        return []
+
+    def _build_library(self, name, source, candidates, progress=None, walker=None):
+        """Validate and order a library's candidates; returns the value swapped in by _apply_library."""
+        if name in ('shared', 'funk', 'special'):
+            return candidates
+        if name == 'token':
+            return {attr: os.path.join(source, fname) for attr, fname in self.TOKEN_SOUNDS.items()}
+        if candidates is None:
+            return None
+        files = self._filter_loadable(candidates, progress)
+        if name == 'hyperborb':
+            return self._order_hyperborbs(files, walker)
+        if name.startswith('stage:'):
+            files.sort(key=lambda p: os.path.basename(p).lower())
+        return files
+
+    def _order_hyperborbs(self, files, walker=None):
+        """Drop stage-related sounds from the hyperborb list and sort it numerically."""
+        # Exclude any stage achievement sounds from hyperborbs
+        # 1) Anything present in stage_sounds_folder by basename
+        # 2) Any filename that includes 'unlock'/'unlocked' to avoid stage unlock VO/SFX
+        stage_basenames = set()
         try:
-            wavs = glob.glob(os.path.join(folder, "**", "*.wav"), recursive=True)
-            oggs = glob.glob(os.path.join(folder, "**", "*.ogg"), recursive=True)
-            files = self._filter_loadable(wavs + oggs)
-
-            # Exclude any stage achievement sounds from hyperborbs
-            # 1) Anything present in stage_sounds_folder by basename
-            # 2) Any filename that includes 'unlock'/'unlocked' to avoid stage unlock VO/SFX
-            stage_basenames = set()
+            stage_basenames = {os.path.basename(p).lower() for p in self._stage_sound_candidates(walker)}
+        except Exception:
+            pass
+        # explicitly configured tier achievement sounds may live elsewhere
+        stage_basenames.update(os.path.basename(s['sound']).lower() for s in self.borp_stages.values() if s.get('sound'))
+        filtered = []
+        excluded = 0
+        for p in files:
+            base = os.path.basename(p).lower()
+            if base in stage_basenames or ('unlock' in base or 'unlocked' in base):
+                excluded += 1
+                continue
+            filtered.append(p)
+
+        # numeric-ish sort where possible
+        def _extract_num(path):
+            name = os.path.basename(path)
+            digits = ''.join(ch for ch in name if ch.isdigit())
             try:
-                if self.stage_sounds_folder and os.path.isdir(self.stage_sounds_folder):
-                    st_wavs = glob.glob(os.path.join(self.stage_sounds_folder, "*.wav"))
-                    st_oggs = glob.glob(os.path.join(self.stage_sounds_folder, "*.ogg"))
-                    stage_basenames = {os.path.basename(p).lower() for p in (st_wavs + st_oggs)}
+                return int(digits) if digits else float('inf')
             except Exception:
-                pass
-            filtered = []
-            excluded = 0
-            for p in files:
-                base = os.path.basename(p).lower()
-                if base in stage_basenames or ('unlock' in base or 'unlocked' in base):
-                    excluded += 1
-                    continue
-                filtered.append(p)
-            files = filtered
-
-            # numeric-ish sort where possible
-            def _extract_num(path):
-                name = os.path.basename(path)
-                digits = ''.join(ch for ch in name if ch.isdigit())
-                try:
-                    return int(digits) if digits else float('inf')
-                except Exception:
-                    return float('inf')
-            files.sort(key=lambda p: (_extract_num(p), os.path.basename(p).lower()))
+                return float('inf')
+        filtered.sort(key=lambda p: (_extract_num(p), os.path.basename(p).lower()))
+        return filtered, excluded
+
+    def _apply_library(self, name, source, value):
+        """Swap a freshly built library in. Callers hold _library_lock."""
+        if name in self._loaded_sources:
+            # decoded samples of files that left the library are not needed any more
+            removed = set(self._value_files(name, self._library_value(name))) - set(self._value_files(name, value))
+            self.pcm.discard(removed)
+        if name in ('shared', 'funk', 'special'):
+            setattr(self, name + '_files', value)
+            self.status_message.emit(f"{name.capitalize()} loaded: {len(value)} from {source}")
+        elif name == 'hyper_funk':
+            self.hyper_funk_files = value or []
+            if value is not None:
+                self.status_message.emit(f"Hyper Funk loaded: {len(value)} from {source}")
+        elif name == 'hyperborb':
+            files, excluded = value or ([], 0)
             self.hyperborb_files = files
-            extra = f" (excluded {excluded} stage-related)" if excluded else ""
-            self.status_message.emit(f"Hyperborbs loaded: {len(self.hyperborb_files)} from {folder}{extra}")
-        except Exception as e:
-            self.hyperborb_files = []
-            self.status_message.emit(f"Error loading Hyperborbs: {e}")
+            self._hyperborb_excluded = excluded
+            if value is not None:
+                extra = f" (excluded {excluded} stage-related)" if excluded else ""
+                self.status_message.emit(f"Hyperborbs loaded: {len(files)} from {source[0]}{extra}")
+        elif name == 'token':
+            for attr, path in value.items():
+                setattr(self, attr, path)
+            self.status_message.emit(f"Token sounds reloaded from {source}")
+        elif name.startswith('stage:'):
+            key = name[len('stage:'):]
+            stage = self.borp_stages.get(key)
+            if stage is None:  # tier removed while scanning
+                return
+            stage['files'] = value
+            stage['current'] = 0
+            # configured quota wins; otherwise one pass through the stage's files
+            stage['quota'] = stage['quota_override'] if stage['quota_override'] > 0 else len(value)
+            self.status_message.emit(f"Loaded {len(value)} files for {key} stage from {source}")
+        self._loaded_sources[name] = source
+        if name in self.ENVELOPE_LIBRARIES:
+            self._analyze_envelopes_async()
+
+    def _reload_now(self, names):
+        """Rescan the named libraries on the calling thread (from the sound pack when it is current)."""
+        sources = self._library_sources()
+        scanned = False
+        walker = LibraryWalker()
+        for name in names:
+            try:
+                built = self._packed_library(name, sources[name])
+                if built is None:
+                    self._stamp_library_dirs(name, sources[name], walker)
+                    built = self._build_library(name, sources[name], self._list_library(name, sources[name], walker),
+                                                walker=walker)
+                    scanned = True
+                with self._library_lock:
+                    self._apply_library(name, sources[name], built)
+            except Exception as e:
+                self.status_message.emit(f"Error loading {name}: {e}")
+        if scanned:
+            self._log_walk(walker)
+            self._rebuild_pack_async()
 
-    def reload_hyper_funk_files(self):
-        folder = self.hyper_funk_folder
-        self.hyper_funk_files = []
-        if not folder or not os.path.exists(folder):
-            self.status_message.emit(f"Hyper Funk folder missing: {folder}")
+    def _log_walk(self, walker):
+        self.last_walk = (walker.files_visited, walker.dirs_opened)
+        log.info("Library listing: %d files visited, %d folders opened", *self.last_walk)
+
+    # -------------------------
+    # Sound pack
+    # -------------------------
+    def _library_folders(self, name, source, walker):
+        """Folders a library's listing depends on (every subfolder for recursive libraries)."""
+        if name in ('hyper_funk', 'hyperborb'):
+            root = source if name == 'hyper_funk' else source[0]
+            folders = walker.folders(root, recursive=True) if root and os.path.isdir(root) else [root]
+            return folders + [source[1]] if name == 'hyperborb' else folders
+        return [source]
+
+    def _stamp_library_dirs(self, name, source, walker):
+        # the walker stamps each folder as it lists it, so files added during a scan make the packed copy stale
+        if self.sound_pack is not None:
+            self._library_dirs[name] = walker.stamps(self._library_folders(name, source, walker))
+
+    def _packed_library(self, name, source):
+        """A library's value from the sound pack if it was packed from source and is current, else None."""
+        if self.sound_pack is None:
+            return None
+        packed = self.sound_pack.category(name, source, str(self.station))
+        if packed is None:
+            return None
+        value, dirs = packed
+        self._library_dirs[name] = dirs
+        if name == 'hyperborb':
+            return list(value[0]), value[1]
+        return dict(value) if isinstance(value, dict) else list(value)
+
+    def _library_value(self, name):
+        """Current contents of a loaded library, in the form _build_library returns."""
+        if name in ('shared', 'funk', 'special', 'hyper_funk'):
+            return list(getattr(self, name + '_files'))
+        if name == 'hyperborb':
+            return list(self.hyperborb_files), self._hyperborb_excluded
+        if name == 'token':
+            return {attr: getattr(self, attr) for attr in self.TOKEN_SOUNDS}
+        stage = self.borp_stages.get(name[len('stage:'):])
+        return None if stage is None else list(stage['files'])
+
+    @staticmethod
+    def _value_files(name, value):
+        """Files of a library value as returned by _build_library / _library_value."""
+        if not value:
+            return []
+        if name == 'hyperborb':
+            return list(value[0])
+        if name == 'token':
+            return list(value.values())
+        return list(value)
+
+    def _rebuild_pack_async(self):
+        """Rewrite the sound pack from the loaded libraries on a worker thread."""
+        if self.sound_pack is None:
             return
+        with self._reload_guard:
+            if self._pack_thread is not None:
+                self._pack_again = True
+                return
+            self._pack_thread = threading.Thread(target=self._pack_worker, name="sound-pack", daemon=True)
+            self._pack_thread.start()
+
+    def _pack_worker(self):
+        while True:
+            try:
+                self.rebuild_sound_pack()
+            except Exception as e:
+                log.error("Sound pack rebuild failed: %s", e, exc_info=True)
+            with self._reload_guard:
+                if not self._pack_again:
+                    self._pack_thread = None
+                    return
+                self._pack_again = False
+
+    def rebuild_sound_pack(self):
+        """Write every loaded library into the sound pack (unchanged assets are reused)."""
+        if self.sound_pack is None:
+            return
+        categories = {}
+        with self._library_lock:
+            for name, source in self._loaded_sources.items():
+                value = self._library_value(name)
+                if value is None or name not in self._library_dirs:
+                    continue
+                categories[name] = (source, value, self._library_dirs[name], self._value_files(name, value))
+        t0 = time.perf_counter()
+        result = self.sound_pack.build(categories, str(self.station))
+        if result is not None:
+            read, reused = result
+            log.info("Sound pack rebuilt in %.1f s: %d assets (%d read, %d reused) -> %s",
+                     time.perf_counter() - t0, read + reused, read, reused, os.path.basename(self.sound_pack.path))
+
+    @staticmethod
+    def _file_stamp(path):
+        """(mtime_ns, size) of a file, or None if it is missing."""
         try:
-            wavs = glob.glob(os.path.join(folder, "**", "*.wav"), recursive=True)
-            oggs = glob.glob(os.path.join(folder, "**", "*.ogg"), recursive=True)
-            files = self._filter_loadable(wavs + oggs)
-            self.hyper_funk_files = files
-            self.status_message.emit(f"Hyper Funk loaded: {len(self.hyper_funk_files)} from {folder}")
-        except Exception as e:
-            self.hyper_funk_files = []
-            self.status_message.emit(f"Error loading Hyper Funk: {e}")
+            st = os.stat(path)
+            return st.st_mtime_ns, st.st_size
+        except OSError:
+            return None
+
+    def _load_sound(self, path):
+        """Sound for path: from the decoded PCM store, else decoded from the pack mapping or its file.
+
+        Stored samples and packed bytes are only used while they match the file's
+        current (mtime_ns, size), so files edited in place play their new version.
+        """
+        stamp = self._file_stamp(path)
+        sound = self.pcm.sound(path, stamp)
+        if sound is not None:
+            self.m_pcm_lookups.inc('hit')
+            return sound
+        self.m_pcm_lookups.inc('miss')
+        data = None
+        if self.sound_pack is not None:
+            # a file missing on disk may still be packed; use the packed copy then
+            data = self.sound_pack.asset_bytes(path, stamp)
+        if data is None:
+            sound = self.audio.load(path)
+        else:
+            sound = self.audio.load_bytes(data, path)
+        self.pcm.add(path, sound, stamp)
+        return sound
+
+    def configure_pcm_cache(self, mb):
+        """Resize the decoded PCM store (MB, 0 = off); a new size starts it empty.
+
+        The store is shared by every station, so only the station that created it sets the size.
+        """
+        if not getattr(self, '_owns_assets', True):
+            self.pcm_cache_mb = self.pcm.capacity >> 20
+            return
+        self.pcm_cache_mb = max(0, int(mb or 0))
+        self.pcm.resize(self.pcm_cache_mb << 20)
+
+    # -------------------------
+    # Audio envelopes
+    # -------------------------
+    ENVELOPE_LIBRARIES = ('hyper_funk', 'hyperborb')
+
+    def _analyze_envelopes_async(self):
+        """Analyze new or changed hyper funk / hyperborb files on a worker thread."""
+        if np is None:
+            return
+        with self._reload_guard:
+            if self._envelope_thread is not None:
+                self._envelope_again = True
+                return
+            self._envelope_thread = threading.Thread(target=self._envelope_worker, name="envelopes", daemon=True)
+            self._envelope_thread.start()
+
+    def _envelope_worker(self):
+        while True:
+            try:
+                with self.envelopes.update_lock:
+                    if not self.envelopes.loaded:
+                        self.envelopes.load()
+                    t0 = time.perf_counter()
+                    added = self.envelopes.update(list(self.hyper_funk_files) + list(self.hyperborb_files))
+                    if added:
+                        self.envelopes.save()
+                        log.info("Analyzed %d audio envelopes in %.1f s", added, time.perf_counter() - t0)
+            except Exception as e:
+                log.error("Envelope analysis failed: %s", e, exc_info=True)
+            with self._reload_guard:
+                if not self._envelope_again:
+                    self._envelope_thread = None
+                    return
+                self._envelope_again = False
+
+    def _track_envelope(self, path, sound, channel):
+        """Remember when an analyzed file started playing so its envelope can be sampled."""
+        env = self.envelopes.get(path)
+        if env is None:
+            return
+        now = time.monotonic()
+        tracks = [t for t in self._active_tracks if t[3] > now]
+        tracks.append((env, now, channel, now + len(env) / EnvelopeStore.FPS, sound))
+        self._active_tracks = tuple(tracks)  # replaced, never mutated: read lock-free by the GUI
+
+    def sample_envelope(self):
+        """Envelope of everything playing now as 4 floats 0..1 (amp, low, mid, high), or None.
+
+        Layered tracks combine by per-band maximum.
+        """
+        tracks = self._active_tracks
+        if not tracks:
+            return None
+        now = time.monotonic()
+        level = None
+        for env, start, channel, end, sound in tracks:
+            if now >= end:
+                continue
+            try:
+                if channel.get_sound() is not sound:  # stopped or replaced on its channel
+                    continue
+            except Exception:
+                continue
+            row = env[int((now - start) * EnvelopeStore.FPS)]
+            level = row if level is None else np.maximum(level, row)
+        return None if level is None else level / 255.0
+
+    def reload_hyperborb_files(self):
+        """Populate hyperborb_files from hyperborb_folder, numeric sort when possible."""
+        self._reload_now(['hyperborb'])
+
+    def reload_hyper_funk_files(self):
+        self._reload_now(['hyper_funk'])
 
     def reload_borp_stage_files(self):
-        """Load borp stage files for normal/super/miracle. Accept absolute path or join with shared_folder."""
-        for key, stage in self.borp_stages.items():
-            folder = stage['folder'] if os.path.isabs(stage['folder']) else os.path.join(self.shared_folder, stage['folder'])
-            files = []
-            if os.path.exists(folder):
-                wavs = glob.glob(os.path.join(folder, "*.wav"))
-                oggs = glob.glob(os.path.join(folder, "*.ogg"))
-                files = self._filter_loadable(wavs + oggs)
-                files.sort(key=lambda p: os.path.basename(p).lower())
-            stage['files'] = files
-            stage['current'] = 0
-            stage['quota'] = len(files)
-            self.status_message.emit(f"Loaded {len(files)} files for {key} stage from {folder}")
+        """Load borp files for every stage tier. Accept absolute path or join with shared_folder."""
+        self._reload_now(['stage:' + name for name in self.borp_stages])
 
     def reload_token_sounds(self):
-        self.token_appeared_sound = os.path.join(self.token_folder, "TokenAppeared.wav")
-        self.collected_one_sound = os.path.join(self.token_folder, "CollectedOneToken.wav")
-        self.collected_two_sound = os.path.join(self.token_folder, "CollectedTwoTokens.wav")
-        self.collected_three_sound = os.path.join(self.token_folder, "CollectedThreeTokens.wav")
-        self.winner_sound = os.path.join(self.token_folder, "Winner.wav")
-        self.loser_sound = os.path.join(self.token_folder, "Loser.wav")
-        self.status_message.emit(f"Token sounds reloaded from {self.token_folder}")
+        self._reload_now(['token'])
+
+    def reload_libraries_async(self):
+        """Rescan, on a worker thread, every library whose source changed since it was loaded.
+
+        Presses keep using the old lists while scanning; the new ones are swapped in
+        together at the end. Progress is published as state['reload'] = (done, total, label)
+        and cleared to None when finished. A request made while a reload is running is
+        picked up by that worker once it finishes.
+        """
+        with self._reload_guard:
+            if self._reload_thread is not None:
+                self._reload_again = True
+                return
+            self._reload_thread = threading.Thread(target=self._reload_worker, name="library-reload", daemon=True)
+            self._reload_thread.start()
+
+    def _reload_worker(self):
+        while True:
+            t0 = time.perf_counter()
+            try:
+                sources = self._library_sources()
+                changed = [n for n, src in sources.items() if self._loaded_sources.get(n) != src]
+                if changed:
+                    built = {}
+                    listed = {}
+                    walker = LibraryWalker()
+                    for name in changed:
+                        packed = self._packed_library(name, sources[name])
+                        if packed is not None:
+                            built[name] = packed
+                            continue
+                        self._publish(reload=(0, 0, name))
+                        self._stamp_library_dirs(name, sources[name], walker)
+                        listed[name] = self._list_library(name, sources[name], walker)
+                    # only decode-validated libraries count towards progress
+                    validated = [n for n in listed if n not in ('shared', 'funk', 'special', 'token')]
+                    total = sum(len(listed[n] or ()) for n in validated)
+                    done = [0]
+                    for name in listed:
+                        def progress(label=name):
+                            done[0] += 1
+                            self._publish(reload=(done[0], total, label))
+                        built[name] = self._build_library(name, sources[name], listed[name], progress, walker)
+                    with self._library_lock:
+                        for name in changed:
+                            self._apply_library(name, sources[name], built[name])
+                    self.status_message.emit(f"Reloaded {len(changed)} libraries in {time.perf_counter() - t0:.1f}s")
+                    if listed:
+                        self._log_walk(walker)
+                        self._rebuild_pack_async()
+                else:
+                    self.status_message.emit("Sound folders unchanged; nothing to reload.")
+            except Exception as e:
+                log.error("Library reload failed: %s", e, exc_info=True)
+            with self._reload_guard:
+                if not self._reload_again:
+                    self._reload_thread = None
+                    self._publish(reload=None)
+                    return
+                self._reload_again = False
+
+    def _stage_folder_path(self, stage):
+        folder = stage['folder']
+        return folder if os.path.isabs(folder) else os.path.join(self.shared_folder, folder)
 
     # -------------------------
     # Sound playback (safe)
     # -------------------------
-    def _play_file(self, file_path, channel, priority=False):
-        """Play a WAV/OGG file on a given channel. Priority stops currently-playing sound on that channel."""
+    def _play_file(self, file_path, channel, priority=False, kind=None):
+        """Play a WAV/OGG file on a given channel. Priority stops currently-playing sound on that channel.
+        kind ('borp', 'funk', ...) records the press-to-play latency when called inside a press."""
+        self.latency.mark('logic')
         if not file_path:
             self.status_message.emit("Play called with None path")
-            self.last_sound_changed.emit("MISSING")
+            self._publish(last_sound="MISSING")
             return
-        if not os.path.exists(file_path):
+        if not (self.sound_pack is not None and self.sound_pack.has(file_path)) and not os.path.exists(file_path):
             self.status_message.emit(f"Sound not found: {file_path}")
-            self.last_sound_changed.emit("MISSING")
+            self._publish(last_sound="MISSING")
             return
         # ensure allowed extensions
         lower = file_path.lower()
         if not (lower.endswith('.wav') or lower.endswith('.ogg')):
             self.status_message.emit(f"Unsupported format (only WAV/OGG): {file_path}")
-            self.last_sound_changed.emit("MISSING")
+            self._publish(last_sound="MISSING")
             return
 
         # ensure channel exists
         try:
             if priority and channel.get_busy():
                 channel.stop()
+            self.latency.mark('channel')
             try:
-                sound = pygame.mixer.Sound(file_path)
+                t_decode = time.perf_counter()
+                sound = self._load_sound(file_path)
+                self.m_decodes.inc()
+                self.m_decode_time.observe(time.perf_counter() - t_decode)
+                self.latency.mark('decode')
                 # per-sound volume
                 vol = 1.0
                 try:
@@ -334,35 +2200,80 @@ class YujiFunkCore(QtCore.QObject):
                 vol = max(0.0, min(1.0, vol))
                 sound.set_volume(vol)
                 channel.play(sound)
-                self.last_sound_changed.emit(os.path.basename(file_path))
-                self.status_message.emit(f"Played: {os.path.basename(file_path)}")
+                channel.set_volume(*self.channel_mix)  # station mix, reset by SDL_mixer when a sound ends
+                self.latency.play(kind)
+                self.m_plays.inc(kind or 'other')
+                self._track_envelope(file_path, sound, channel)
+                self._publish(last_sound=os.path.basename(file_path))
+                log.debug("Played: %s", file_path)
             except Exception as e:
                 # loading as Sound failed - log traceback
-                tb = traceback.format_exc()
-                self.status_message.emit(f"Error loading sound {file_path}: {e}")
-                print("Traceback while loading sound:", tb)
-                self.last_sound_changed.emit("MISSING")
+                self.m_play_errors.inc()
+                log.error("Error loading sound %s: %s", file_path, e, exc_info=True)
+                self._publish(last_sound="MISSING")
         except Exception as e:
-            self.status_message.emit(f"Channel play error: {e}")
-            print("Channel play exception:", traceback.format_exc())
-            self.last_sound_changed.emit("MISSING")
+            log.error("Channel play error: %s", e, exc_info=True)
+            self._publish(last_sound="MISSING")
 
-    def play_sound(self, file_path, channel, priority=False):
+    def play_sound(self, file_path, channel, priority=False, kind=None):
         # wrapper (kept for potential thread-safety later)
-        self._play_file(file_path, channel, priority=priority)
+        self._play_file(file_path, channel, priority=priority, kind=kind)
+
+    def _station_channels(self):
+        return [self.audio.voice(i) for i in range(self.channel_base, self.channel_base + STATION_CHANNELS)]
+
+    def _find_channel(self):
+        """A free channel from this station's pool, or None when all are busy."""
+        for i in range(self.channel_base + STATION_FIXED_CHANNELS, self.channel_base + STATION_CHANNELS):
+            channel = self.audio.voice(i)
+            if not channel.get_busy():
+                return channel
+        return None
+
+    def configure_mix(self, volume, pan):
+        """Station output level (0..1) and stereo position (-1 left .. 1 right) on all of its channels.
+
+        pygame implements a left/right channel volume as a panning effect that
+        SDL_mixer drops when the channel's sound ends, so _play_file re-applies
+        self.channel_mix after every play.
+        """
+        self.station_volume = max(0.0, min(1.0, float(volume)))
+        self.station_pan = max(-1.0, min(1.0, float(pan)))
+        left = self.station_volume * min(1.0, 1.0 - self.station_pan)
+        right = self.station_volume * min(1.0, 1.0 + self.station_pan)
+        self.channel_mix = (left, right)
+        try:
+            for channel in self._station_channels():
+                channel.set_volume(left, right)
+        except Exception as e:
+            log.warning("Station mix not applied: %s", e)
 
     # -------------------------
     # Stage achievement lookup & progression
     # -------------------------
+    def _stage_sound_candidates(self, walker=None):
+        """Sound files in stage_sounds_folder; without a walker the last listing is reused while
+        the folder's mtime is unchanged (adding or removing a file changes it)."""
+        folder = self.stage_sounds_folder
+        cached = self._stage_sounds_listing
+        if walker is None and cached is not None and cached[0] == folder:
+            try:
+                if os.stat(folder).st_mtime_ns == cached[1]:
+                    return cached[2]
+            except (OSError, TypeError, ValueError):
+                pass
+        walker = walker or LibraryWalker()
+        files = walker.files(folder)
+        self._stage_sounds_listing = (folder, walker.stamps([folder])[folder], files)
+        return files
+
     def _find_stage_sound(self, stage_name):
         """Search stage_sounds_folder for a file that likely matches stage_name (case-insensitive)."""
         folder = self.stage_sounds_folder
         if not folder or not os.path.isdir(folder):
             self.status_message.emit(f"Stage sounds folder invalid: {folder}")
             return None
-        candidates = []
-        for ext in ('.wav', '.ogg'):
-            candidates += glob.glob(os.path.join(folder, f"*{ext}"))
+        candidates = self._stage_sound_candidates()
         if not candidates:
             return None
         key = stage_name.lower()
@@ -378,73 +2289,124 @@ class YujiFunkCore(QtCore.QObject):
         fav.sort(key=lambda x: (x[0], x[1]))
         return fav[0][1] if fav else None
 
-    # ---- NEW ----
-    # Consolidated and corrected stage advancement logic.
+    def _stage_sound_file(self, stage_name):
+        """Configured achievement sound for a tier, else best match in stage_sounds_folder."""
+        stage = self.borp_stages.get(stage_name, {})
+        configured = stage.get('sound')
+        if configured:
+            path = configured if os.path.isabs(configured) else os.path.join(self.stage_sounds_folder or '', configured)
+            if os.path.exists(path):
+                return path
+            self.status_message.emit(f"Configured stage sound missing for {stage_name}: {path}")
+        return self._find_stage_sound(stage_name)
+
+    def configure_borp_stages(self, tiers):
+        """Build the ordered stage table from a list of tier dicts and precompute thresholds."""
+        stages = {}
+        for i, tier in enumerate(tiers):
+            try:
+                name = str(tier.get('name') or f"stage{i + 1}").lower()
+                if name in stages:
+                    raise ValueError(f"duplicate stage name '{name}'")
+                stages[name] = {
+                    'folder': str(tier.get('folder', name.capitalize())),
+                    'points': float(tier.get('points', 1)),
+                    'threshold': float(tier.get('threshold', 0)),
+                    'quota_override': max(0, int(tier.get('quota', 0))),
+                    'sound': str(tier.get('sound') or ''),
+                    'files': [], 'current': 0, 'quota': 0, 'active': False,
+                }
+            except Exception as e:
+                self.status_message.emit(f"Invalid borp stage #{i + 1} skipped: {e}")
+        if not stages:
+            return self.configure_borp_stages(DEFAULT_BORP_STAGES)
+        # keep loaded files when a tier's folder did not change
+        old = getattr(self, 'borp_stages', {})
+        for name, stage in stages.items():
+            prev = old.get(name)
+            if prev and prev['folder'] == stage['folder']:
+                stage['files'] = prev['files']
+                stage['quota'] = stage['quota_override'] if stage['quota_override'] > 0 else len(prev['files'])
+        self.borp_stages = stages
+        self.stage_names = list(stages)
+        self._stage_index = {name: i for i, name in enumerate(self.stage_names)}
+        # running max keeps the list sorted even if a tier is configured with a lower
+        # threshold than its predecessor, so bisect stays valid
+        thresholds = []
+        for stage in stages.values():
+            thresholds.append(max(stage['threshold'], thresholds[-1]) if thresholds else stage['threshold'])
+        self._stage_thresholds = thresholds
+        self.current_stage = self.stage_names[0]
+        stages[self.current_stage]['active'] = True
+        # track stage achievement sound playback per run
+        self.stage_sound_played = {name: False for name in self.stage_names[1:]}
+
+    def borp_stage_config(self):
+        """Tier list in settings format (inverse of configure_borp_stages)."""
+        return [
+            {'name': name, 'folder': s['folder'], 'points': s['points'], 'threshold': s['threshold'],
+             'quota': s['quota_override'], 'sound': s['sound']}
+            for name, s in self.borp_stages.items()
+        ]
+
     def check_and_advance_stage(self):
         """Checks for stage advancement by both quota and score threshold and handles the transition."""
         if self.hyper_active:
             return
 
-        # Defensive check
-        if not hasattr(self, 'current_stage'):
-            self.current_stage = 'normal'
-
-        current_stage_key = self.current_stage
-        current_stage_data = self.borp_stages[current_stage_key]
-        next_stage_key = None
-
-        # Determine potential next stage based on current stage
-        if current_stage_key == 'normal':
-            super_stage_data = self.borp_stages['super']
-            quota_met = (current_stage_data.get('quota', 0) > 0 and
-                         current_stage_data.get('current', 0) >= current_stage_data.get('quota', 0))
-            threshold_met = self.score >= super_stage_data['threshold']
-            if quota_met or threshold_met:
-                next_stage_key = 'super'
-        elif current_stage_key == 'super':
-            miracle_stage_data = self.borp_stages['miracle']
-            quota_met = (current_stage_data.get('quota', 0) > 0 and
-                         current_stage_data.get('current', 0) >= current_stage_data.get('quota', 0))
-            threshold_met = self.score >= miracle_stage_data['threshold']
-            if quota_met or threshold_met:
-                next_stage_key = 'miracle'
-
-        # If a stage advancement is determined, execute it
-        if next_stage_key and self.current_stage != next_stage_key:
-            self.borp_stages[current_stage_key]['active'] = False
-            self.borp_stages[next_stage_key]['active'] = True
-            self.current_stage = next_stage_key
-            self.borp_stages[next_stage_key]['current'] = 0  # Reset counter for the new stage
-
-            self.status_message.emit(f"Advanced to {next_stage_key.upper()} stage!")
-
-            # Play achievement sound only once per run
-            if not self.stage_sound_played.get(next_stage_key, False):
-                sound_file = self._find_stage_sound(next_stage_key)
-                if sound_file:
-                    self.play_sound(sound_file, self.special_channel, priority=True)
-                    self.status_message.emit(f"Played stage sound: {os.path.basename(sound_file)}")
-                else:
-                    self.status_message.emit(f"No stage sound found for {next_stage_key} in {self.stage_sounds_folder}")
-                self.stage_sound_played[next_stage_key] = True  # Mark as played
+        current_index = self._stage_index.get(self.current_stage, 0)
+        current_stage_data = self.borp_stages[self.stage_names[current_index]]
+
+        # highest tier whose threshold the score has reached (may skip several tiers)
+        target_index = bisect.bisect_right(self._stage_thresholds, self.score) - 1
+        # quota completion always unlocks at least the next tier
+        quota = current_stage_data.get('quota', 0)
+        if quota > 0 and current_stage_data.get('current', 0) >= quota:
+            target_index = max(target_index, current_index + 1)
+        target_index = min(target_index, len(self.stage_names) - 1)
+        if target_index <= current_index:
+            return
+
+        next_stage_key = self.stage_names[target_index]
+        current_stage_data['active'] = False
+        self.borp_stages[next_stage_key]['active'] = True
+        self.current_stage = next_stage_key
+        self.borp_stages[next_stage_key]['current'] = 0  # Reset counter for the new stage
+
+        self.game_stage_index = max(self.game_stage_index, target_index)
+        self.status_message.emit(f"Advanced to {next_stage_key.upper()} stage!")
+
+        # Play achievement sound only once per run; when jumping several tiers only
+        # the highest one is played, the skipped ones are marked as played
+        skipped = self.stage_names[current_index + 1:target_index]
+        if not self.stage_sound_played.get(next_stage_key, False):
+            sound_file = self._stage_sound_file(next_stage_key)
+            if sound_file:
+                self.play_sound(sound_file, self.special_channel, priority=True, kind='stage')
+                self.status_message.emit(f"Played stage sound: {os.path.basename(sound_file)}")
+            else:
+                self.status_message.emit(f"No stage sound found for {next_stage_key} in {self.stage_sounds_folder}")
+        for key in skipped + [next_stage_key]:
+            self.stage_sound_played[key] = True  # Mark as played
 
     def reset_to_stage_one(self):
-        """Reset progression to normal stage."""
-        self.current_stage = 'normal'
+        """Reset progression to the first stage tier."""
+        first = self.stage_names[0]
+        self.current_stage = first
         for stage in self.borp_stages.values():
             stage['current'] = 0
             stage['active'] = False
-        self.borp_stages['normal']['active'] = True
+        self.borp_stages[first]['active'] = True
         # allow stage achievement sounds to play again on next progression
-        self.stage_sound_played = {'super': False, 'miracle': False}
-        # optionally play a 'normal' stage sound when restarting
+        self.stage_sound_played = {name: False for name in self.stage_names[1:]}
+        # optionally play the first stage's sound when restarting
         try:
-            sf = self._find_stage_sound('normal')
+            sf = self._stage_sound_file(first)
             if sf:
-                self.play_sound(sf, self.special_channel, priority=True)
+                self.play_sound(sf, self.special_channel, priority=True, kind='stage')
         except Exception:
             pass
-        self.status_message.emit("Stage reset to NORMAL")
+        self.status_message.emit(f"Stage reset to {first.upper()}")
 
     # -------------------------
     # Scoring & borp selection
@@ -454,8 +2416,8 @@ class YujiFunkCore(QtCore.QObject):
         if self.hyper_active:
             return None
         # defensive: ensure current_stage exists
-        if not hasattr(self, 'current_stage'):
-            self.current_stage = 'normal'
+        if self.current_stage not in self.borp_stages:
+            self.current_stage = self.stage_names[0]
 
         # --- REVISED LOGIC ---
         # 1. Update score and time based on the press
@@ -465,10 +2427,11 @@ class YujiFunkCore(QtCore.QObject):
         self.score += points
         if self.score > self.high_score:
             self.high_score = self.score
-            self.high_score_changed.emit(self.high_score)
-        self.score_changed.emit(self.score)
+            self._publish(high_score=self.high_score)
+            self.stats.note_high_score({'t': 'high', 'ts': round(current_time, 3), 'session': self.session_id, 'score': self.score})
+        self._publish(score=self.score)
         self.last_press_time = current_time
-        self.status_message.emit(f"Score: {self.score} (x{self.current_multiplier})")
+        log.debug("Score: %s (x%s)", self.score, self.current_multiplier)
         
         # 2. Increment counter for the current stage *before* checking for advancement.
         self.borp_stages[self.current_stage]['current'] += 1
@@ -477,8 +2440,7 @@ class YujiFunkCore(QtCore.QObject):
         try:
             self.check_and_advance_stage()
         except Exception as e:
-            self.status_message.emit(f"Error checking stage advancement: {e}")
-            print(traceback.format_exc())
+            log.error("Error checking stage advancement: %s", e, exc_info=True)
 
         # 4. Get the sound from the current stage (which may have just changed).
         stage = self.borp_stages[self.current_stage]
@@ -512,7 +2474,7 @@ class YujiFunkCore(QtCore.QObject):
         if file:
             self.status_message.emit(f"Playing Hyper Funk: {os.path.basename(file)}")
             self.hyper_state = 'funk'
-            self.play_sound(file, self.hyper_funk_channel, priority=True)
+            self.play_sound(file, self.hyper_funk_channel, priority=True, kind='hyper_funk')
             self.hyperfunk_start_time = time.time()
         else:
             self.status_message.emit("No Hyper Funk files found")
@@ -528,28 +2490,29 @@ class YujiFunkCore(QtCore.QObject):
         f = self._select_weighted_random(files)
         try:
             # prefer a free channel; else fall back to dedicated normal_funk_channel
+            self.latency.mark('logic')
             ch = None
             try:
-                ch = pygame.mixer.find_channel()
+                ch = self._find_channel()
             except Exception:
                 ch = None
             if ch is None:
                 ch = getattr(self, 'normal_funk_channel', None)
             if ch is None:
                 ch = getattr(self, 'sound_channel', None)
+            self.latency.mark('channel')
             if ch is not None:
-                self.play_sound(f, ch, priority=True)
+                self.play_sound(f, ch, priority=True, kind='funk')
                 # per-user spec: each normal funk increases multiplier by 0.2
                 try:
                     self.current_multiplier += 0.2
-                    self.multiplier_changed.emit(self.current_multiplier)
+                    self._publish(multiplier=self.current_multiplier)
                 except Exception:
                     pass
             else:
                 self.status_message.emit("No available channel for funk")
         except Exception as e:
-            self.status_message.emit(f"Error playing funk: {e}")
-            print(traceback.format_exc())
+            log.error("Error playing funk: %s", e, exc_info=True)
 
     def handle_borp_sequence(self):
         """Main borp sequence (non-hyper)."""
@@ -562,11 +2525,9 @@ class YujiFunkCore(QtCore.QObject):
             self.borp_play_count += 1
             # play borp
             try:
-                self.play_sound(borp_file, self.borp_channel)
+                self.play_sound(borp_file, self.borp_channel, kind='borp')
             except Exception as e:
-                self.status_message.emit(f"Error playing borp: {e}")
-                print(traceback.format_exc())
-            self.score_changed.emit(self.score)
+                log.error("Error playing borp: %s", e, exc_info=True)
             # normal funk scheduling
             try:
                 if (self.borp_play_count % self.funk_every_n_borps) == 0:
@@ -585,7 +2546,7 @@ class YujiFunkCore(QtCore.QObject):
         self.token_start_time = 0.0
         self.priority_active = False
         self.key_input_allowed = True
-        self.token_active_changed.emit(self.token_active)
+        self._publish(token_active=self.token_active)
         self.status_message.emit("Token system reset (ready).")
         self.delayed_input = False
 
@@ -595,10 +2556,10 @@ class YujiFunkCore(QtCore.QObject):
         if not self.token_active and not self.priority_active and random.random() < self.token_chance:
             self.status_message.emit("Token appeared!")
             if self.token_appeared_sound and os.path.exists(self.token_appeared_sound):
-                self.play_sound(self.token_appeared_sound, self.sound_channel, priority=True)
+                self.play_sound(self.token_appeared_sound, self.sound_channel, priority=True, kind='token_appeared')
             self.token_active = True
             self.token_start_time = time.time()
-            self.token_active_changed.emit(True)
+            self._publish(token_active=True)
             self.key_input_allowed = True
 
     def handle_token_timeout(self):
@@ -607,18 +2568,19 @@ class YujiFunkCore(QtCore.QObject):
         current_time = time.time()
         if self.token_active and (current_time - self.token_start_time > 2.0):
             self.status_message.emit("Token timed out. Resetting...")
+            self.m_token_timeouts.inc()
+            self._end_game('token_timeout')
             if self.loser_sound and os.path.exists(self.loser_sound):
-                self.play_sound(self.loser_sound, self.sound_channel, priority=True)
+                self.play_sound(self.loser_sound, self.sound_channel, priority=True, kind='loser')
             self.token_active = False
             self.token_start_time = 0.0
             self.priority_active = False
             self.key_input_allowed = True
-            self.token_active_changed.emit(False)
+            self._publish(token_active=False)
             self.score = 0
             self.current_multiplier = 1.0
             self.borp_play_count = 0  # <-- FIX: Reset funk counter
-            self.score_changed.emit(self.score)
-            self.multiplier_changed.emit(self.current_multiplier)
+            self._publish(score=self.score, multiplier=self.current_multiplier)
             self.reset_to_stage_one()
             self.delayed_input = True
             self.input_delay_start = current_time
@@ -628,11 +2590,12 @@ class YujiFunkCore(QtCore.QObject):
             self.status_message.emit("Cannot collect token now.")
             return
         self.token_active = False
-        self.token_active_changed.emit(False)
+        self._publish(token_active=False)
         self.priority_active = True
         self.key_input_allowed = False
         self.token_count += 1
-        self.token_count_changed.emit(self.token_count)
+        self.m_tokens.inc()
+        self._publish(token_count=self.token_count)
         self.status_message.emit(f"Token collected: {self.token_count}")
         if self.token_count == 1:
             sound_file = self.collected_one_sound
@@ -641,7 +2604,7 @@ class YujiFunkCore(QtCore.QObject):
         else:
             sound_file = self.collected_three_sound
         if sound_file and os.path.exists(sound_file):
-            self.play_sound(sound_file, self.special_channel, priority=True)
+            self.play_sound(sound_file, self.special_channel, priority=True, kind='token')
         else:
             self.status_message.emit(f"Token sound missing: {sound_file}")
         if self.token_count >= 3:
@@ -652,18 +2615,20 @@ class YujiFunkCore(QtCore.QObject):
             self.key_input_allowed = True
             self.delayed_input = False
             self.token_active = False
-            self.token_active_changed.emit(False)
+            self._publish(token_active=False)
 
     # -------------------------
     # Hyper flow (isolated)
     # -------------------------
     def enter_hyper_mode(self):
         self.status_message.emit("ENTERING HYPER MODE")
+        self.m_hyper_entries.inc()
+        self.game_hyper_count += 1
         self.hyper_active = True
-        self.hyper_active_changed.emit(True)
+        self._publish(hyper_active=True)
         self.priority_active = True
         self.token_active = False
-        self.token_active_changed.emit(False)
+        self._publish(token_active=False)
         self.delayed_input = False
         self.key_input_allowed = True
         self.hyperborb_index = 0
@@ -673,13 +2638,13 @@ class YujiFunkCore(QtCore.QObject):
         try:
             if self.special_files:
                 special_file = random.choice(self.special_files)
-                self.play_sound(special_file, self.special_channel, priority=True)
+                self.play_sound(special_file, self.special_channel, priority=True, kind='special')
         except Exception:
             pass
 
         def _play_winner_and_start():
             if self.winner_sound and os.path.exists(self.winner_sound):
-                self.play_sound(self.winner_sound, self.winner_channel, priority=True)
+                self.play_sound(self.winner_sound, self.winner_channel, priority=True, kind='winner')
             threading.Timer(0.3, self.start_hyper_mode).start()
 
         threading.Timer(0.05, _play_winner_and_start).start()
@@ -690,7 +2655,7 @@ class YujiFunkCore(QtCore.QObject):
         self.key_input_allowed = True
         self.delayed_input = False
         self.token_count = 0
-        self.token_count_changed.emit(0)
+        self._publish(token_count=0)
         # ensure latest hyperborb list (filtered to exclude stage-related sounds)
         try:
             self.reload_hyperborb_files()
@@ -720,18 +2685,20 @@ class YujiFunkCore(QtCore.QObject):
             f = self.hyperborb_files[self.hyperborb_index]
             self.status_message.emit(f"Hyperborb {self.hyperborb_index + 1}/{len(self.hyperborb_files)}: {os.path.basename(f)}")
             # Play on a free channel to allow overlap (no priority to avoid cutting existing audio)
+            self.latency.mark('logic')
             try:
-                ch = pygame.mixer.find_channel()
+                ch = self._find_channel()
             except Exception:
                 ch = None
             if ch is None:
                 # fallback to a stable channel if needed
                 ch = getattr(self, 'sound_channel', None)
+            self.latency.mark('channel')
             if ch is None:
                 self.status_message.emit("No free channel for hyperborb")
                 return
             try:
-                self.play_sound(f, ch, priority=False)
+                self.play_sound(f, ch, priority=False, kind='hyperborb')
             except Exception:
                 pass
             self.hyperborb_index += 1
@@ -741,40 +2708,190 @@ class YujiFunkCore(QtCore.QObject):
             self.play_hyper_funk_sound()
             self.hyperborb_index = 0
 
-    def on_key_event_name(self, key_name):
-        key = key_name.lower() if isinstance(key_name, str) else str(key_name)
-        current_time = time.time()
-        self.last_press_time = current_time
+    def configure_key_bindings(self, bindings, debounce=None, repeat=None):
+        """Compile the key -> action table; unknown actions are skipped.
+
+        debounce and repeat (per action) fall back to the defaults when not given.
+        """
+        actions = {}
+        for key, action in bindings.items():
+            key = str(key).strip().lower()
+            if not key:
+                continue
+            if action not in self._action_handlers:
+                self.status_message.emit(f"Key '{key}' bound to unknown action '{action}' (ignored)")
+                continue
+            actions[key] = action
+        self.key_actions = actions
+        merged = dict(DEFAULT_ACTION_DEBOUNCE)
+        merged.update(debounce or {})
+        self.action_debounce = {a: float(merged.get(a, 0.0)) for a in self._action_handlers}
+        merged = dict(DEFAULT_ACTION_REPEAT)
+        merged.update(repeat or {})
+        self.action_repeat = {a: bool(merged.get(a, False)) for a in self._action_handlers}
+
+    def action_for_key(self, key_name):
+        """Bound action for a key name, or None."""
+        if not isinstance(key_name, str):
+            return None
+        return self.key_actions.get(key_name.lower())
+
+    def on_key_event_name(self, key_name, t_input=None):
+        """Run the action bound to a key name; True if a press was accepted."""
+        action = self.action_for_key(key_name)
+        if action is None:
+            return False
+        return self.perform_action(action, t_input)
+
+    def on_key_events(self, keys, t_input=None):
+        """Deliver a batch of key names (input server) under one library lock; returns how many ran."""
+        self.m_input_events.inc(amount=len(keys))
+        accepted = 0
+        with self._library_lock:
+            for key in keys:
+                if self.on_key_event_name(key, t_input):
+                    accepted += 1
+        return accepted
+
+    def perform_action(self, action, t_input=None):
+        """Run a bound action unless it is inside its debounce window; True if it ran.
+
+        t_input is the perf_counter() time the press arrived, the start of its latency trace.
+        """
+        handler = self._action_handlers.get(action)
+        if handler is None:
+            return False
+        now = time.monotonic()
+        if now - self._action_last.get(action, float('-inf')) < self.action_debounce.get(action, 0.0):
+            self.m_presses_dropped.inc(action)
+            return False
+        self._action_last[action] = now
+        self.m_presses.inc(action)
+        self.last_press_time = time.time()
+        self.latency.begin(t_input)
+        try:
+            # a library reload swaps its lists in between presses, never during one
+            with self._library_lock:
+                handler()
+        finally:
+            self.latency.end()
+        return True
+
+    # -------------------------
+    # Metrics
+    # -------------------------
+    def _init_metrics(self):
+        m = self.metrics
+        self.m_presses = m.counter("presses_total", "Accepted presses by action.", "action")
+        self.m_presses_dropped = m.counter("presses_debounced_total", "Presses dropped by the action debounce.", "action")
+        self.m_plays = m.counter("plays_total", "Sounds started by category.", "kind")
+        self.m_play_errors = m.counter("play_errors_total", "Sounds that failed to load or play.")
+        self.m_decodes = m.counter("sound_decodes_total", "Sound objects built for playback.")
+        self.m_decode_time = m.histogram("sound_decode_seconds", "Time to build a Sound for playback.",
+                                         (0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1))
+        self.m_input_events = m.counter("input_events_total", "Key events received by the input server.")
+        self.m_sounds_ended = m.counter("sounds_ended_total", "Sounds that finished or were cut off on this station.")
+        self.m_hyper_entries = m.counter("hyper_entries_total", "Times hyper mode was entered.")
+        self.m_tokens = m.counter("tokens_collected_total", "Tokens collected.")
+        self.m_token_timeouts = m.counter("token_timeouts_total", "Tokens that timed out.")
+        self.m_inactivity = m.counter("inactivity_resets_total", "Score resets after inactivity.")
+        self.m_games = m.counter("games_ended_total", "Finished games by reason.", "reason")
+        self.m_loop_time = m.histogram("loop_iteration_seconds", "Core loop work per iteration (sleep excluded).",
+                                       (0.0001, 0.0002, 0.0005, 0.001, 0.002, 0.005, 0.01, 0.05))
+        self.m_pcm_lookups = m.counter("pcm_cache_lookups_total", "Decoded PCM store lookups by result.", "result")
+        m.gauge("pcm_cache_bytes", "Bytes of decoded PCM held.", lambda: self.pcm.used)
+        m.gauge("channels_busy", "Station mixer channels currently playing.", self._busy_channels)
+        m.gauge("channels", "Mixer channels owned by this station.", lambda: STATION_CHANNELS)
+        m.gauge("score", "Current score.", lambda: self.score)
+        m.gauge("hyper_active", "1 while hyper mode runs.", lambda: 1 if self.hyper_active else 0)
+
+    def _busy_channels(self):
+        return sum(1 for channel in self._station_channels() if channel.get_busy())
+
+    def configure_metrics_server(self, port):
+        """(Re)start the /metrics endpoint on 127.0.0.1:port; 0 disables it."""
+        port = int(port or 0)
+        if self.metrics_server is not None:
+            if self.metrics_server.port == port:
+                return
+            self.metrics_server.close()
+            self.metrics_server = None
+        self.metrics_port = port
+        if not port:
+            return
+        try:
+            self.metrics_server = MetricsServer(self.metrics, port)
+            self.status_message.emit(f"Metrics at http://127.0.0.1:{self.metrics_server.port}/metrics")
+        except OSError as e:
+            self.status_message.emit(f"Metrics endpoint unavailable on port {port}: {e}")
+
+    def configure_input_server(self, port):
+        """(Re)start the local input server on 127.0.0.1:port; 0 disables it."""
+        port = int(port or 0)
+        if self.input_server is not None:
+            if self.input_server.port == port:
+                return
+            self.input_server.close()
+            self.input_server = None
+        self.input_port = port
+        if not port:
+            return
+        try:
+            self.input_server = InputServer(self.on_key_events, port)
+            self.status_message.emit(f"Input server listening on 127.0.0.1:{self.input_server.port}")
+        except OSError as e:
+            self.status_message.emit(f"Input server unavailable on port {port}: {e}")
+
+    def toggle_profiler(self):
+        """Start the sampling profiler, or stop it and write profile-<timestamp>.txt/.folded."""
+        if not self.profiler.running:
+            self.profiler.start()
+            self.status_message.emit("Profiler started; trigger again to stop.")
+            return
+        # actions run under _library_lock: hand the finished run to a worker that joins the
+        # sampler and writes the files, and start the next run on a fresh profiler
+        run = self.profiler
+        self.profiler = SamplingProfiler(run.interval, run.max_depth)
+        base = os.path.join(os.path.dirname(self.settings_file), time.strftime("profile-%Y%m%d-%H%M%S"))
+        threading.Thread(target=self._profile_worker, args=(run, base), name="profile-writer", daemon=True).start()
+
+    def _profile_worker(self, run, base):
+        run.stop()
+        try:
+            txt_path, _ = run.write(base)
+        except Exception as e:
+            log.error("Profile write failed: %s", e, exc_info=True)
+            return
+        total = max(1, run.samples)
+        top = "; ".join(f"{label.split(' (')[0]} [{thread}] {100.0 * own / total:.0f}%"
+                        for thread, label, own, _ in run.top(3)) or "all threads idle"
+        self.status_message.emit(f"Profile saved: {os.path.basename(txt_path)} ({run.samples} samples)")
+        self.status_message.emit(f"Profile top: {top}")
 
+    def _action_exit(self):
         # exit key passthrough
-        if key in ['numpad 9', 'num 9', 'numpad9', '9']:
-            self.status_message.emit("Exit key pressed.")
-            return
+        self.status_message.emit("Exit key pressed.")
 
+    def _action_borp(self):
         # end hyper grace early on key
         if self.hyper_grace_active:
             self.hyper_grace_active = False
             self.status_message.emit("Grace period ended early due to input.")
 
-        # Hyper mode: only borp keys advance hyper sequence (no cooldown, allow overlap)
+        # Hyper mode: borp keys advance hyper sequence (no cooldown, allow overlap)
         if self.hyper_active:
-            if key not in ['r', '1', '2', '3', '4']:
-                # ignore other keys in hyper
-                return
-            self.status_message.emit("Hyper active: advancing hyperborb now")
+            log.debug("Hyper active: advancing hyperborb now")
             self.handle_hyperborb_sequence()
             return
 
-        # normal keys: R 1 2 3 4 map to borp sequences
-        if key in ['r', '1', '2', '3', '4']:
-            if self.token_active:
-                self.status_message.emit("Collecting token...")
-                self.collect_token()
-            elif self.key_input_allowed:
-                self.status_message.emit("Playing borp...")
-                self.handle_borp_sequence()
-            else:
-                self.status_message.emit("Input not allowed right now.")
+        if self.token_active:
+            self.status_message.emit("Collecting token...")
+            self.collect_token()
+        elif self.key_input_allowed:
+            log.debug("Playing borp...")
+            self.handle_borp_sequence()
+        else:
+            self.status_message.emit("Input not allowed right now.")
         # refresh input allowed state
         self.key_input_allowed = not (self.token_active or self.priority_active or self.delayed_input)
 
@@ -802,7 +2919,9 @@ class YujiFunkCore(QtCore.QObject):
     # -------------------------
     # Settings persistence
     # -------------------------
-    def save_settings(self):
+    def save_settings(self, immediate=False):
+        """Stage all sections in the settings store; only changed ones are re-encoded.
+        The write is debounced unless immediate is set."""
         settings = {
             'high_score': self.high_score,
             'total_score': self.total_score,
@@ -817,28 +2936,49 @@ class YujiFunkCore(QtCore.QObject):
                 'hyper': self.hyper_funk_folder,
                 'hyperborb': self.hyperborb_folder,
                 'token': self.token_folder,
-                'borp_stages': {
-                    'normal': self.borp_stages['normal']['folder'],
-                    'super': self.borp_stages['super']['folder'],
-                    'miracle': self.borp_stages['miracle']['folder']
-                },
+                # legacy name -> folder map, kept for older builds reading this file
+                'borp_stages': {name: stage['folder'] for name, stage in self.borp_stages.items()},
                 'stage_sounds': self.stage_sounds_folder
             },
-            'funk_every_n_borps': self.funk_every_n_borps
+            'borp_stages': self.borp_stage_config(),
+            'funk_every_n_borps': self.funk_every_n_borps,
+            'metrics_port': self.metrics_port,
+            'input_port': self.input_port,
+            'pcm_cache_mb': self.pcm_cache_mb,
+            'station_volume': self.station_volume,
+            'station_pan': self.station_pan,
+            'key_bindings': dict(self.key_actions),
+            'action_debounce': dict(self.action_debounce),
+            'action_repeat': dict(self.action_repeat),
         }
         try:
-            with open(self.settings_file, 'w') as f:
-                json.dump(settings, f, indent=2)
-            self.status_message.emit("Settings saved.")
+            for key, value in settings.items():
+                self.settings_store.set(key, value)
+            self.settings_store.save(immediate=immediate)
         except Exception as e:
-            self.status_message.emit(f"Error saving settings: {e}")
-            print(traceback.format_exc())
+            log.error("Error saving settings: %s", e, exc_info=True)
+
+    def update_sound_settings(self, changes):
+        """Merge per-file {'chance', 'volume'} entries; returns how many actually changed."""
+        # the store encodes this same dict on its flush timer, so edit it under the store's lock
+        with self.settings_store._lock:
+            changed = [path for path, entry in changes.items() if self.sound_settings.get(path) != entry]
+            for path in changed:
+                self.sound_settings[path] = changes[path]
+            if changed:
+                self.settings_store.mark_dirty('sound_settings', changed)
+        return len(changed)
+
+    def _sidecar_base(self, suffix):
+        """Path next to the settings file with '_settings' swapped for suffix (no extension)."""
+        stem = os.path.splitext(os.path.basename(self.settings_file))[0]
+        stem = stem.replace("_settings", suffix) if "_settings" in stem else stem + suffix
+        return os.path.join(os.path.dirname(self.settings_file), stem)
 
     def load_settings(self):
         try:
-            if os.path.exists(self.settings_file):
-                with open(self.settings_file, 'r') as f:
-                    settings = json.load(f)
+            settings = self.settings_store.load()
+            if settings:
                 self.high_score = settings.get('high_score', 0)
                 self.total_score = settings.get('total_score', 0)
                 self.games_played = settings.get('games_played', 0)
@@ -853,16 +2993,140 @@ class YujiFunkCore(QtCore.QObject):
                     self.hyper_funk_folder = paths.get('hyper', self.hyper_funk_folder)
                     self.hyperborb_folder = paths.get('hyperborb', self.hyperborb_folder)
                     self.token_folder = paths.get('token', self.token_folder)
-                    borp_paths = paths.get('borp_stages', {})
-                    if borp_paths:
-                        self.borp_stages['normal']['folder'] = borp_paths.get('normal', self.borp_stages['normal']['folder'])
-                        self.borp_stages['super']['folder'] = borp_paths.get('super', self.borp_stages['super']['folder'])
-                        self.borp_stages['miracle']['folder'] = borp_paths.get('miracle', self.borp_stages['miracle']['folder'])
                     self.stage_sounds_folder = paths.get('stage_sounds', self.stage_sounds_folder)
+                tiers = settings.get('borp_stages')
+                if not isinstance(tiers, list):
+                    # legacy files only carry per-stage folders for the default tiers
+                    borp_paths = settings.get('paths', {}).get('borp_stages', {}) or {}
+                    tiers = [dict(t, folder=borp_paths.get(t['name'], t['folder'])) for t in DEFAULT_BORP_STAGES]
+                self.configure_borp_stages(tiers)
+                if any(k in settings for k in ('key_bindings', 'action_debounce', 'action_repeat')):
+                    self.configure_key_bindings(settings.get('key_bindings', self.key_actions),
+                                                settings.get('action_debounce'), settings.get('action_repeat'))
                 self.funk_every_n_borps = settings.get('funk_every_n_borps', getattr(self, 'funk_every_n_borps', 2))
+                self.metrics_port = settings.get('metrics_port', self.metrics_port)
+                self.input_port = settings.get('input_port', self.input_port)
+                self.pcm_cache_mb = settings.get('pcm_cache_mb', self.pcm_cache_mb)
+                self.station_volume = settings.get('station_volume', self.station_volume)
+                self.station_pan = settings.get('station_pan', self.station_pan)
+        except Exception as e:
+            log.error("Error loading settings: %s", e, exc_info=True)
+
+    # -------------------------
+    # Settings hot reload
+    # -------------------------
+    SETTINGS_POLL_INTERVAL = 1.0  # seconds between stats of the settings file (core loop)
+    # runtime-owned sections: the running core is authoritative, a pushed file never rolls them back
+    RUNTIME_SETTINGS = ('high_score', 'total_score', 'games_played')
+
+    def _settings_file_stamp(self):
+        try:
+            st = os.stat(self.settings_file)
+            return st.st_mtime_ns, st.st_size
+        except OSError:
+            return None
+
+    def _check_settings_file(self):
+        """Apply the settings file if it changed since it was last seen and we did not write it."""
+        stamp = self._settings_file_stamp()
+        if stamp is None or stamp == self._settings_seen:
+            return
+        self._settings_seen = stamp
+        if stamp == self.settings_store.last_write_stat:
+            return
+        self.apply_settings_file()
+
+    def apply_settings_file(self):
+        """Re-read the settings file and apply only what differs from the running core.
+
+        Scores, the current stage and hyper/token state are kept; libraries whose
+        folders changed are rescanned in the background. Returns the applied parts.
+        """
+        t0 = time.perf_counter()
+        try:
+            settings = self.settings_store.load()
         except Exception as e:
-            self.status_message.emit(f"Error loading settings: {e}")
-            print(traceback.format_exc())
+            log.warning("Settings hot reload skipped, file unreadable: %s", e)
+            return []
+        applied = []
+        with self._library_lock:
+            for key in ('token_chance', 'cooldown', 'funk_every_n_borps'):
+                if key in settings and settings[key] != getattr(self, key):
+                    setattr(self, key, settings[key])
+                    applied.append(key)
+            sound = settings.get('sound_settings')
+            if sound is not None:
+                changed = sum(1 for k in set(sound) | set(self.sound_settings)
+                              if sound.get(k) != self.sound_settings.get(k))
+                if changed:
+                    self.sound_settings = sound
+                    applied.append(f"sound_settings ({changed} entries)")
+            if any(k in settings for k in ('key_bindings', 'action_debounce', 'action_repeat')):
+                before = (self.key_actions, self.action_debounce, self.action_repeat)
+                self.configure_key_bindings(settings.get('key_bindings', self.key_actions),
+                                            settings.get('action_debounce', self.action_debounce),
+                                            settings.get('action_repeat', self.action_repeat))
+                if (self.key_actions, self.action_debounce, self.action_repeat) != before:
+                    applied.append('key_bindings')
+            if self._apply_settings_paths(settings):
+                applied.append('paths')
+        if self._owns_assets and settings.get('pcm_cache_mb', self.pcm_cache_mb) != self.pcm_cache_mb:
+            self.configure_pcm_cache(settings['pcm_cache_mb'])
+            applied.append('pcm_cache_mb')
+        mix = (settings.get('station_volume', self.station_volume), settings.get('station_pan', self.station_pan))
+        if mix != (self.station_volume, self.station_pan):
+            self.configure_mix(*mix)
+            applied.append('mix')
+        if settings.get('metrics_port', self.metrics_port) != self.metrics_port:
+            self.configure_metrics_server(settings['metrics_port'])
+            applied.append('metrics_port')
+        if settings.get('input_port', self.input_port) != self.input_port:
+            if self.running:
+                self.configure_input_server(settings['input_port'])
+            else:
+                self.input_port = settings['input_port']
+            applied.append('input_port')
+        # the store now mirrors the file; restage runtime sections the file is behind on
+        runtime = [key for key in self.RUNTIME_SETTINGS if settings.get(key) != getattr(self, key)]
+        for key in runtime:
+            self.settings_store.set(key, getattr(self, key))
+        if runtime:
+            self.settings_store.save()
+        if 'paths' in applied:
+            self.reload_libraries_async()
+        if applied:
+            self.status_message.emit(f"Settings hot reload: {', '.join(applied)} in "
+                                     f"{(time.perf_counter() - t0) * 1000.0:.1f} ms")
+        else:
+            log.info("Settings file changed; nothing to apply")
+        return applied
+
+    def _apply_settings_paths(self, settings):
+        """Library folders and borp tiers from settings; True if any changed (caller holds the library lock)."""
+        paths = settings.get('paths', {})
+        changed = False
+        for key, attr in (('shared', 'shared_folder'), ('funk', 'funk_folder'), ('special', 'special_folder'),
+                          ('hyper', 'hyper_funk_folder'), ('hyperborb', 'hyperborb_folder'),
+                          ('token', 'token_folder'), ('stage_sounds', 'stage_sounds_folder')):
+            if key in paths and paths[key] != getattr(self, attr):
+                setattr(self, attr, paths[key])
+                changed = True
+        tiers = settings.get('borp_stages')
+        if isinstance(tiers, list) and tiers != self.borp_stage_config():
+            # configure_borp_stages starts a fresh run; carry the current one over by stage name
+            counts = {name: stage['current'] for name, stage in self.borp_stages.items()}
+            current, played = self.current_stage, self.stage_sound_played
+            self.configure_borp_stages(tiers)
+            for name, count in counts.items():
+                if name in self.borp_stages:
+                    self.borp_stages[name]['current'] = count
+            if current in self.borp_stages:
+                self.borp_stages[self.current_stage]['active'] = False
+                self.borp_stages[current]['active'] = True
+                self.current_stage = current
+            self.stage_sound_played.update({k: v for k, v in played.items() if k in self.stage_sound_played})
+            changed = True
+        return changed
 
     # -------------------------
     # Debug dumping
@@ -871,12 +3135,32 @@ class YujiFunkCore(QtCore.QObject):
         try:
             self.status_message.emit(f"DEBUG: shared_folder={self.shared_folder}")
             self.status_message.emit(f"DEBUG: stage_sounds_folder={self.stage_sounds_folder}")
-            self.status_message.emit(f"DEBUG: normal_quota={self.borp_stages['normal'].get('quota')} files={len(self.borp_stages['normal'].get('files',[]))}")
+            for name, stage in self.borp_stages.items():
+                self.status_message.emit(f"DEBUG: stage {name}: threshold={stage['threshold']} quota={stage.get('quota')} points={stage['points']} files={len(stage.get('files',[]))}")
+            self.status_message.emit(f"DEBUG: current_stage={self.current_stage}")
             self.status_message.emit(f"DEBUG: hyperborb_count={len(getattr(self,'hyperborb_files',[]))} hyper_funk_count={len(getattr(self,'hyper_funk_files',[]))}")
+            self.status_message.emit(f"DEBUG: games_played={self.games_played} total_score={self.total_score} high_score={self.high_score} session={self.session_id}")
             self.status_message.emit(f"DEBUG: funk_every_n_borps={self.funk_every_n_borps} borp_play_count={self.borp_play_count}")
+            for line in self.latency.report_lines():
+                self.status_message.emit(f"DEBUG: latency {line}")
         except Exception as e:
-            self.status_message.emit(f"Debug dump failed: {e}")
-            print(traceback.format_exc())
+            log.error("Debug dump failed: %s", e, exc_info=True)
+
+    # -------------------------
+    # Session statistics
+    # -------------------------
+    def _end_game(self, reason):
+        """Account the finished game (score > 0) in totals and append it to the stats journal."""
+        if self.score <= 0 and self.game_hyper_count == 0:
+            return
+        self.m_games.inc(reason)
+        self.games_played += 1
+        self.total_score += self.score
+        stage = self.stage_names[min(self.game_stage_index, len(self.stage_names) - 1)]
+        self.stats.append({'t': 'game', 'ts': round(time.time(), 3), 'session': self.session_id,
+                           'score': self.score, 'stage': stage, 'hyper': self.game_hyper_count, 'reason': reason})
+        self.game_hyper_count = 0
+        self.game_stage_index = 0
 
     # -------------------------
     # Loop / lifecycle
@@ -884,30 +3168,41 @@ class YujiFunkCore(QtCore.QObject):
     def start(self):
         if not self.running:
             self.running = True
-            self.loop_thread = threading.Thread(target=self._loop, daemon=True)
+            self.loop_thread = threading.Thread(target=self._loop, name="core-loop", daemon=True)
             self.loop_thread.start()
+            self.configure_input_server(self.input_port)
             self.status_message.emit("Core loop started.")
 
     def stop(self):
         self.running = False
-        self.total_score += self.score
+        self._end_game('quit')
+        self.configure_metrics_server(0)
+        if self.input_server is not None:
+            self.input_server.close()
+            self.input_server = None
         try:
-            self.save_settings()
+            self.stats.close()
         except Exception:
             pass
         try:
-            keyboard.unhook_all()
+            self.save_settings(immediate=True)
         except Exception:
             pass
         try:
-            pygame.mixer.stop()
-            pygame.quit()
+            for channel in self._station_channels():
+                channel.stop()
         except Exception:
             pass
+        if release_audio():  # last station in the process; shuts the backend down
+            try:
+                keyboard.unhook_all()
+            except Exception:
+                pass
         self.status_message.emit("Core stopped.")
 
     def _loop(self):
         while self.running:
+            t_iter = time.perf_counter()
             try:
                 # delayed input reset
                 if self.delayed_input:
@@ -916,6 +3211,16 @@ class YujiFunkCore(QtCore.QObject):
                         self.delayed_input = False
                         self.key_input_allowed = True
 
+                # settings pushed to the file while running
+                if t_iter >= self._settings_next_check:
+                    self._settings_next_check = t_iter + self.SETTINGS_POLL_INTERVAL
+                    self._check_settings_file()
+
+                # end events from the audio backend (played out or stopped)
+                ended = self.audio.poll_ended(self.channel_base, STATION_CHANNELS)
+                if ended:
+                    self.m_sounds_ended.inc(amount=len(ended))
+
                 # --- FIX: Safer channel check ---
                 hyper_channel = getattr(self, 'hyper_funk_channel', None)
                 hyper_channel_busy = hyper_channel.get_busy() if hyper_channel else False
@@ -950,18 +3255,19 @@ class YujiFunkCore(QtCore.QObject):
                             inactivity_threshold = self.hyper_grace_period
                     if time_since_last > inactivity_threshold and (self.score > 0 or self.current_multiplier > 1):
                         self.status_message.emit(f"Inactivity reset from score {self.score}")
+                        self.m_inactivity.inc()
+                        self._end_game('inactivity')
                         if self.loser_sound and os.path.exists(self.loser_sound):
-                            self.play_sound(self.loser_sound, self.sound_channel, priority=True)
+                            self.play_sound(self.loser_sound, self.sound_channel, priority=True, kind='loser')
                         self.score = 0
                         self.current_multiplier = 1.0
                         self.borp_play_count = 0  # <-- FIX: Reset funk counter
-                        self.score_changed.emit(self.score)
-                        self.multiplier_changed.emit(self.current_multiplier)
+                        self._publish(score=self.score, multiplier=self.current_multiplier)
                         self.reset_to_stage_one()
                         self.last_press_time = current_time
             except Exception as e:
-                self.status_message.emit(f"Error in main loop: {e}")
-                print(traceback.format_exc())
+                log.error("Error in main loop: %s", e, exc_info=True)
+            self.m_loop_time.observe(time.perf_counter() - t_iter)
             time.sleep(0.01)
 
     def end_hyper_mode(self):
@@ -981,7 +3287,7 @@ class YujiFunkCore(QtCore.QObject):
             pass
         # reset state
         self.hyper_active = False
-        self.hyper_active_changed.emit(False)
+        self._publish(hyper_active=False)
         self.hyper_state = 'idle'
         self.hyperborb_index = 0
         self.await_hyperfunk = False
@@ -996,18 +3302,736 @@ class YujiFunkCore(QtCore.QObject):
         self.status_message.emit("Exited HYPER MODE")
 
 # -----------------------------
-# Vignette Overlay (unchanged styling but kept stable)
+# Frame instrumentation
 # -----------------------------
-class VignetteOverlay(QtWidgets.QWidget):
+class FrameStats:
+    """Per-frame timing series for the GUI thread (milliseconds).
+
+    Each series keeps a fixed-bucket histogram since the last reset plus a window of
+    recent samples for exact percentiles. Recording is a bisect and two appends, so
+    it stays on permanently.
+    """
+    BUCKETS_MS = (1, 2, 4, 8, 12, 16, 20, 25, 33, 50, 100, float('inf'))
+
+    def __init__(self, target_ms=16.0, window=600):
+        self.target_ms = target_ms
+        self.window = window
+        self._series = {}
+        self.started = time.time()
+
+    def record(self, name, ms):
+        series = self._series.get(name)
+        if series is None:
+            series = self._series[name] = {'counts': [0] * len(self.BUCKETS_MS), 'n': 0, 'sum': 0.0, 'max': 0.0,
+                                           'recent': collections.deque(maxlen=self.window)}
+        series['counts'][bisect.bisect_left(self.BUCKETS_MS, ms)] += 1
+        series['n'] += 1
+        series['sum'] += ms
+        if ms > series['max']:
+            series['max'] = ms
+        series['recent'].append(ms)
+
+    def reset(self):
+        self._series.clear()
+        self.started = time.time()
+
+    @staticmethod
+    def _percentile(sorted_values, q):
+        if not sorted_values:
+            return 0.0
+        return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+    def summary(self):
+        """{series: {count, mean, max, p50, p95, p99 (recent window), over_target, histogram}}"""
+        out = {}
+        for name, series in sorted(self._series.items()):
+            recent = sorted(series['recent'])
+            over = sum(1 for v in recent if v > self.target_ms)
+            out[name] = {
+                'count': series['n'],
+                'mean': series['sum'] / series['n'] if series['n'] else 0.0,
+                'max': series['max'],
+                'p50': self._percentile(recent, 0.50),
+                'p95': self._percentile(recent, 0.95),
+                'p99': self._percentile(recent, 0.99),
+                'over_target_pct': 100.0 * over / len(recent) if recent else 0.0,
+                'histogram': {('inf' if b == float('inf') else f"<={b}"): c for b, c in zip(self.BUCKETS_MS, series['counts'])},
+            }
+        return out
+
+    def export(self, base_path):
+        """Write <base>.json (full summary) and <base>.csv (one row per series); returns both paths."""
+        summary = self.summary()
+        meta = {'target_ms': self.target_ms, 'since': self.started, 'exported': time.time(),
+                'platform': sys.platform, 'qt': QtCore.QT_VERSION_STR}
+        screen = QtWidgets.QApplication.primaryScreen()
+        if screen is not None:
+            meta['screen'] = f"{screen.geometry().width()}x{screen.geometry().height()}@{screen.refreshRate():.0f}Hz"
+        json_path = base_path + ".json"
+        csv_path = base_path + ".csv"
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump({'meta': meta, 'series': summary}, f, indent=2)
+        buckets = list(next(iter(summary.values()))['histogram']) if summary else []
+        with open(csv_path, 'w', encoding='utf-8') as f:
+            f.write(",".join(['series', 'count', 'mean', 'max', 'p50', 'p95', 'p99', 'over_target_pct'] + buckets) + "\n")
+            for name, st in summary.items():
+                row = [name] + [f"{st[k]:.3f}" if isinstance(st[k], float) else str(st[k])
+                                for k in ('count', 'mean', 'max', 'p50', 'p95', 'p99', 'over_target_pct')]
+                f.write(",".join(row + [str(st['histogram'][b]) for b in buckets]) + "\n")
+        return json_path, csv_path
+
+    def hud_text(self):
+        lines = [f"{'series':<18}{'p50':>7}{'p95':>7}{'max':>7}{'>16ms':>7}"]
+        for name, st in self.summary().items():
+            lines.append(f"{name:<18}{st['p50']:7.2f}{st['p95']:7.2f}{st['max']:7.1f}{st['over_target_pct']:6.1f}%")
+        return "\n".join(lines)
+
+
+FRAME_STATS = FrameStats()
+
+class LatencyTracer:
+    """Input-to-audio latency per action kind, split into press-path stages (ms).
+
+    begin() starts a trace when a press arrives; traces are thread-local, so the
+    keyboard hook and the on-screen buttons never mix. mark(stage) charges the time
+    since the previous mark to that stage, and play(kind) closes the trace for one
+    channel.play and records it. A press that plays several sounds (borp then funk)
+    records one sample per sound, each measured from the press. Samples land in a
+    FrameStats, which provides the rolling percentiles, histograms and export.
+    """
+    STAGES = ('logic', 'channel', 'decode', 'play')
+    KINDS = ('borp', 'funk', 'token', 'hyperborb')
+
+    def __init__(self, window=1000):
+        self.stats = FrameStats(target_ms=10.0, window=window)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def begin(self, t_input=None):
+        loc = self._local
+        loc.start = t_input if t_input is not None else time.perf_counter()
+        loc.last = loc.start
+        loc.stages = {}
+
+    def end(self):
+        self._local.start = None
+
+    def mark(self, stage):
+        loc = self._local
+        if getattr(loc, 'start', None) is None:
+            return
+        now = time.perf_counter()
+        loc.stages[stage] = loc.stages.get(stage, 0.0) + (now - loc.last) * 1000.0
+        loc.last = now
+
+    def play(self, kind):
+        """channel.play returned: record total and per-stage times for kind."""
+        loc = self._local
+        if getattr(loc, 'start', None) is None or kind is None:
+            return
+        self.mark('play')
+        with self._lock:
+            self.stats.record(f"{kind}.total", (loc.last - loc.start) * 1000.0)
+            for stage in self.STAGES:
+                self.stats.record(f"{kind}.{stage}", loc.stages.get(stage, 0.0))
+        loc.stages = {}
+
+    def report_lines(self):
+        """One line per kind: total p50/p95/p99 plus the p50 of each stage."""
+        with self._lock:
+            summary = self.stats.summary()
+        lines = []
+        for kind in self.KINDS:
+            total = summary.get(f"{kind}.total")
+            if total is None:
+                continue
+            stages = " ".join(f"{stage}={summary[f'{kind}.{stage}']['p50']:.2f}" for stage in self.STAGES)
+            lines.append(f"{kind}: n={total['count']} p50={total['p50']:.2f} p95={total['p95']:.2f} "
+                         f"p99={total['p99']:.2f} max={total['max']:.1f} ms (stage p50: {stages})")
+        return lines
+
+    def export(self, base_path):
+        with self._lock:
+            return self.stats.export(base_path)
+
+class SamplingProfiler:
+    """Statistical profiler over every Python thread: Qt main thread, core loop,
+    keyboard hook handlers and workers.
+
+    cProfile only instruments the thread that enables it, so instead a daemon thread
+    snapshots sys._current_frames() every `interval` seconds and counts identical
+    stacks. Overhead is bounded by the interval and independent of call counts.
+    """
+    def __init__(self, interval=0.005, max_depth=64):
+        self.interval = interval
+        self.max_depth = max_depth
+        self._stacks = collections.Counter()  # (thread name, (frame, ...) root first) -> samples
+        self._thread = None
+        self._stop = threading.Event()
+        self.samples = 0
+        self.started = 0.0
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stacks.clear()
+        self.samples = 0
+        self.started = time.time()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self):
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < self.max_depth:
+                    code = frame.f_code
+                    stack.append((code.co_name, os.path.basename(code.co_filename), code.co_firstlineno))
+                    frame = frame.f_back
+                stack.reverse()
+                self._stacks[(names.get(ident, str(ident)), tuple(stack))] += 1
+            self.samples += 1
+
+    @staticmethod
+    def _label(frame):
+        return f"{frame[0]} ({frame[1]}:{frame[2]})"
+
+    def _idle_depths(self):
+        # a thread's shallowest stack is where it parks in C (event loop, sleep, queue
+        # wait); samples taken there count as idle
+        depths = {}
+        for thread, stack in self._stacks:
+            depths[thread] = min(depths.get(thread, len(stack)), len(stack))
+        return depths
+
+    def busy(self):
+        """{thread: fraction of samples not parked at its idle stack}."""
+        idle = self._idle_depths()
+        busy = collections.Counter()
+        for (thread, stack), count in self._stacks.items():
+            if len(stack) > idle[thread]:
+                busy[thread] += count
+        return {thread: busy[thread] / max(1, self.samples) for thread in idle}
+
+    def top(self, n=10):
+        """[(thread, function, self samples, cumulative samples)] by self samples, idle excluded."""
+        idle = self._idle_depths()
+        own = collections.Counter()
+        cumulative = collections.Counter()
+        for (thread, stack), count in self._stacks.items():
+            if len(stack) <= idle[thread]:
+                continue
+            own[(thread, stack[-1])] += count
+            for frame in set(stack):
+                cumulative[(thread, frame)] += count
+        return [(thread, self._label(frame), count, cumulative[(thread, frame)])
+                for (thread, frame), count in own.most_common(n)]
+
+    def write(self, base_path, n=40):
+        """Write <base>.txt (busy time per thread, top functions) and <base>.folded
+        (collapsed stacks for flame graph tools); returns both paths."""
+        elapsed = time.time() - self.started
+        txt_path = base_path + ".txt"
+        folded_path = base_path + ".folded"
+        total = max(1, self.samples)
+        lines = [f"{self.samples} samples every {self.interval * 1000:.1f} ms over {elapsed:.1f} s", "", "busy%  thread"]
+        for thread, fraction in sorted(self.busy().items(), key=lambda kv: -kv[1]):
+            lines.append(f"{100.0 * fraction:5.1f}  {thread}")
+        lines += ["", f"{'self%':>6} {'cum%':>6}  thread / function"]
+        for thread, label, own, cum in self.top(n):
+            lines.append(f"{100.0 * own / total:6.1f} {100.0 * cum / total:6.1f}  [{thread}] {label}")
+        _atomic_write_text(txt_path, "\n".join(lines) + "\n")
+        folded = [";".join([thread] + [self._label(f) for f in stack]) + f" {count}"
+                  for (thread, stack), count in self._stacks.most_common()]
+        _atomic_write_text(folded_path, "\n".join(folded) + "\n")
+        return txt_path, folded_path
+
+
+class MetricsRegistry:
+    """Counters, gauges and histograms rendered in the Prometheus text format.
+
+    Counters and histograms are updated from the keyboard hook, input-server
+    connections, timer threads and the core loop, so each guards its updates and
+    renders with its own lock (uncontended at press rates). Gauges are callables
+    evaluated only when scraped.
+    """
+    def __init__(self, prefix="yuji_"):
+        self.prefix = prefix
+        self._metrics = {}  # name -> metric, in registration order
+
+    def counter(self, name, help_text, label=None):
+        return self._metrics.setdefault(name, _Counter(self.prefix + name, help_text, label))
+
+    def histogram(self, name, help_text, buckets):
+        return self._metrics.setdefault(name, _Histogram(self.prefix + name, help_text, buckets))
+
+    def gauge(self, name, help_text, fn):
+        return self._metrics.setdefault(name, _Gauge(self.prefix + name, help_text, fn))
+
+    def render(self):
+        lines = []
+        for metric in list(self._metrics.values()):
+            try:
+                lines.extend(metric.render())
+            except Exception as e:
+                lines.append(f"# {metric.name} unavailable: {e}")
+        return "\n".join(lines) + "\n"
+
+
+class _Counter:
+    def __init__(self, name, help_text, label=None):
+        self.name = name
+        self.help = help_text
+        self.label = label
+        self.values = {None: 0.0} if label is None else {}
+        self._lock = threading.Lock()
+
+    def inc(self, label_value=None, amount=1):
+        with self._lock:
+            self.values[label_value] = self.values.get(label_value, 0.0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = list(self.values.items())
+        for value, count in sorted(values, key=lambda kv: str(kv[0])):
+            labels = "" if self.label is None else f'{{{self.label}="{value}"}}'
+            lines.append(f"{self.name}{labels} {count:g}")
+        return lines
+
+
+class _Histogram:
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+            self.count += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            counts, total, count = list(self.counts), self.sum, self.count
+        running = 0
+        for bound, count_le in zip(self.buckets + (float('inf'),), counts):
+            running += count_le
+            le = "+Inf" if bound == float('inf') else f"{bound:g}"
+            lines.append(f'{self.name}_bucket{{le="{le}"}} {running}')
+        lines.append(f"{self.name}_sum {total:g}")
+        lines.append(f"{self.name}_count {count}")
+        return lines
+
+
+class _Gauge:
+    def __init__(self, name, help_text, fn):
+        self.name = name
+        self.help = help_text
+        self.fn = fn
+
+    def render(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge", f"{self.name} {float(self.fn()):g}"]
+
+
+class MetricsServer:
+    """Serves a MetricsRegistry at http://127.0.0.1:<port>/metrics from a daemon thread."""
+    def __init__(self, registry, port, host="127.0.0.1"):
+        registry_ref = registry
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/metrics', '/'):
+                    self.send_error(404)
+                    return
+                body = registry_ref.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, fmt, *args):
+                pass  # scrapes are not worth a log line
+
+        self.httpd = http.server.ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="metrics-http", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+# -----------------------------
+# Input server (presses from external controllers)
+# -----------------------------
+class InputServer:
+    """Accepts press events on 127.0.0.1:<port>, one daemon thread per connection.
+
+    A connection speaks one of two protocols, chosen by its first byte:
+      line   - one key name per line, as the keyboard hook names keys ("r", "numpad 9").
+               Everything received in one read is delivered as a batch and acked
+               with "ok <received> <accepted> <server_us>\n" (reads may merge or
+               split the client's own batches, hence the received count).
+      binary - frames of <B 0xB5><H count>, then count x (<B length><key bytes>).
+               Each frame is a batch, acked with <B 0xB6><H accepted><I server_us>.
+    deliver(keys, t_input) runs a batch and returns how many presses were accepted.
+    server_us is the time from receiving a batch to the end of its delivery.
+    """
+    MAGIC = 0xB5
+    ACK_MAGIC = 0xB6
+    FRAME = struct.Struct("<BH")
+    ACK = struct.Struct("<BHI")
+    MAX_PENDING = 1 << 16  # bytes buffered without a complete line/frame before the client is dropped
+
+    def __init__(self, deliver, port, host="127.0.0.1"):
+        server = self
+        self.deliver = deliver
+        self._connections = set()
+        self._lock = threading.Lock()
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                server._serve(self.request)
+
+        self.tcp = socketserver.ThreadingTCPServer((host, port), Handler, bind_and_activate=False)
+        self.tcp.daemon_threads = True
+        self.tcp.allow_reuse_address = False
+        try:
+            self.tcp.server_bind()
+            self.tcp.server_activate()
+        except OSError:
+            self.tcp.server_close()
+            raise
+        self.port = self.tcp.server_address[1]
+        self._thread = threading.Thread(target=self.tcp.serve_forever, name="input-server", daemon=True)
+        self._thread.start()
+
+    def _serve(self, sock):
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        with self._lock:
+            self._connections.add(sock)
+        buf = b""
+        binary = None
+        try:
+            while True:
+                data = sock.recv(65536)
+                if not data:
+                    return
+                t_input = time.perf_counter()
+                buf += data
+                if binary is None:
+                    binary = buf[0] == self.MAGIC
+                buf = self._serve_binary(sock, buf, t_input) if binary else self._serve_lines(sock, buf, t_input)
+                if buf is None or len(buf) > self.MAX_PENDING:
+                    log.warning("Input client sent malformed data; closing the connection")
+                    return
+        except OSError:
+            pass  # client went away (or close() shut the socket)
+        finally:
+            with self._lock:
+                self._connections.discard(sock)
+
+    def _serve_lines(self, sock, buf, t_input):
+        end = buf.rfind(b"\n")
+        if end < 0:
+            return buf
+        keys = [line.strip().decode('utf-8', 'replace') for line in buf[:end].split(b"\n")]
+        keys = [k for k in keys if k]
+        accepted = self.deliver(keys, t_input) if keys else 0
+        server_us = int((time.perf_counter() - t_input) * 1e6)
+        sock.sendall(b"ok %d %d %d\n" % (len(keys), accepted, server_us))
+        return buf[end + 1:]
+
+    def _serve_binary(self, sock, buf, t_input):
+        pos = 0
+        while len(buf) - pos >= self.FRAME.size:
+            magic, count = self.FRAME.unpack_from(buf, pos)
+            if magic != self.MAGIC:
+                return None
+            keys = []
+            p = pos + self.FRAME.size
+            for _ in range(count):
+                if p >= len(buf) or p + 1 + buf[p] > len(buf):
+                    return buf[pos:]  # frame not complete yet
+                keys.append(buf[p + 1:p + 1 + buf[p]].decode('utf-8', 'replace'))
+                p += 1 + buf[p]
+            pos = p
+            accepted = self.deliver(keys, t_input) if keys else 0
+            server_us = int((time.perf_counter() - t_input) * 1e6)
+            sock.sendall(self.ACK.pack(self.ACK_MAGIC, min(accepted, 0xFFFF), min(server_us, 0xFFFFFFFF)))
+        return buf[pos:]
+
+    def close(self):
+        self.tcp.shutdown()
+        self.tcp.server_close()
+        with self._lock:
+            connections = list(self._connections)
+        for sock in connections:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+class FrameStatsHud(QtWidgets.QLabel):
+    """Small on-screen table of FRAME_STATS, refreshed twice a second while shown."""
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.setFont(QtGui.QFont("Consolas", 9))
+        self.setStyleSheet("QLabel{ color:#9effa0; background: rgba(0,0,0,0.75); border:1px solid #0ea5ff; padding:4px; }")
+        self.setAttribute(QtCore.Qt.WA_TransparentForMouseEvents)
+        self.refresh_timer = QtCore.QTimer(self)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.hide()
+
+    def toggle(self):
+        if self.isVisible():
+            self.refresh_timer.stop()
+            self.hide()
+        else:
+            self.refresh()
+            self.show()
+            self.raise_()
+            self.refresh_timer.start(500)
+
+    def refresh(self):
+        self.setText(FRAME_STATS.hud_text())
+        self.adjustSize()
+
+# -----------------------------
+# Vignette sprite cache
+# -----------------------------
+class VignetteSpriteCache:
+    """Pre-rendered vignette pieces keyed by (screen size, zoom bucket, colour bucket).
+
+    Edge gradients are stored as 1-pixel strips that are stretched along each edge,
+    and the corner glow as one reduced-resolution radial sprite that is scaled and
+    mirrored into the four corners, so a frame costs eight blits instead of eight
+    full-size gradient fills.
+    """
+    ZOOM_STEP = 0.025
+    COLOR_STEP = 16
+    CORNER_DOWNSCALE = 4
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self._entries = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, w, h, zoom, color):
+        zoom_bucket = int(round(zoom / self.ZOOM_STEP))
+        rgb = tuple(min(255, int(round(c / self.COLOR_STEP)) * self.COLOR_STEP) for c in (color.red(), color.green(), color.blue()))
+        key = (w, h, zoom_bucket, rgb)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry
+        self.misses += 1
+        entry = self._render(w, h, zoom_bucket * self.ZOOM_STEP, QtGui.QColor(*rgb))
+        self._entries[key] = entry
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    def clear(self):
+        self._entries.clear()
+
+    @staticmethod
+    def _gradient_image(width, height, gradient):
+        img = QtGui.QImage(max(1, width), max(1, height), QtGui.QImage.Format_ARGB32_Premultiplied)
+        img.fill(QtCore.Qt.transparent)
+        p = QtGui.QPainter(img)
+        p.fillRect(img.rect(), gradient)
+        p.end()
+        return img
+
+    def _render(self, w, h, zoom, color):
+        color_with_alpha = QtGui.QColor(color)
+        scale_factor = (zoom - 0.9) / 0.4
+        color_with_alpha.setAlpha(max(0, min(120, 40 + int(scale_factor * 80))))
+        clear = QtGui.QColor(0, 0, 0, 0)
+        edge = max(1, int(min(w, h) * 0.3 * zoom))
+
+        vertical = QtGui.QLinearGradient(0, 0, 0, edge)
+        vertical.setColorAt(0.0, color_with_alpha)
+        vertical.setColorAt(1.0, clear)
+        top = self._gradient_image(1, edge, vertical)
+        horizontal = QtGui.QLinearGradient(0, 0, edge, 0)
+        horizontal.setColorAt(0.0, color_with_alpha)
+        horizontal.setColorAt(1.0, clear)
+        left = self._gradient_image(edge, 1, horizontal)
+
+        radius = max(1, int(min(w, h) * 0.5 * zoom))
+        size = max(1, radius // self.CORNER_DOWNSCALE)
+        corner_color = QtGui.QColor(color)
+        corner_color.setAlpha(50)
+        radial = QtGui.QRadialGradient(0, 0, size)
+        radial.setColorAt(0.0, corner_color)
+        radial.setColorAt(0.5, QtGui.QColor(color.red(), color.green(), color.blue(), 20))
+        radial.setColorAt(1.0, clear)
+        corner = self._gradient_image(size, size, radial)
+
+        return {
+            'edge': edge,
+            'radius': radius,
+            'top': QtGui.QPixmap.fromImage(top),
+            'bottom': QtGui.QPixmap.fromImage(top.mirrored(False, True)),
+            'left': QtGui.QPixmap.fromImage(left),
+            'right': QtGui.QPixmap.fromImage(left.mirrored(True, False)),
+            'corner': QtGui.QPixmap.fromImage(corner),
+        }
+
+# -----------------------------
+# Vignette Overlay (unchanged styling but kept stable)
+# -----------------------------
+class VignetteOverlay(QtWidgets.QWidget):
+    """Full-screen vignette window for one QScreen; all animation state lives in its VignetteController."""
+    def __init__(self, controller, screen):
+        super().__init__(None)
+        self.controller = controller
         self.setAttribute(QtCore.Qt.WA_TranslucentBackground)
         self.setAttribute(QtCore.Qt.WA_TransparentForMouseEvents)
         self.setWindowFlags(QtCore.Qt.FramelessWindowHint | QtCore.Qt.WindowStaysOnTopHint | QtCore.Qt.Tool)
+        self.target_screen = screen
+        screen.geometryChanged.connect(self._fit_screen)
+        self._fit_screen()
+
+    def _fit_screen(self, *args):
+        self.setGeometry(self.target_screen.geometry())
+        handle = self.windowHandle()
+        if handle is not None:
+            handle.setScreen(self.target_screen)
+
+    def showEvent(self, event):
+        self._fit_screen()
+        super().showEvent(event)
+
+    def paintEvent(self, event):
+        t0 = time.perf_counter()
+        painter = QtGui.QPainter(self)
+        rect = self.rect()
+        w = rect.width()
+        h = rect.height()
+        if self.controller.envelope_level is not None:
+            # audio-reactive: global opacity keeps the cached sprites reusable
+            painter.setOpacity(0.55 + 0.45 * self.controller.envelope_level)
+        if self.controller.use_sprite_cache:
+            self._paint_cached(painter, w, h)
+        else:
+            painter.setRenderHint(QtGui.QPainter.Antialiasing)
+            self._paint_direct(painter, w, h)
+        painter.end()
+        paint_ms = (time.perf_counter() - t0) * 1000.0
+        self.controller.paint_times.append(paint_ms)
+        FRAME_STATS.record('overlay.paint', paint_ms)
+
+    def _paint_cached(self, painter, w, h):
+        # same geometry as _paint_direct, composited from pre-rendered sprites shared by all screens
+        sprites = self.controller.sprite_cache.get(w, h, self.controller.zoom_scale, self.controller.current_color)
+        edge = sprites['edge']
+        painter.drawPixmap(QtCore.QRect(0, 0, w, edge), sprites['top'])
+        painter.drawPixmap(QtCore.QRect(0, h - edge, w, edge), sprites['bottom'])
+        painter.drawPixmap(QtCore.QRect(0, 0, edge, h), sprites['left'])
+        painter.drawPixmap(QtCore.QRect(w - edge, 0, edge, h), sprites['right'])
+        # corner sprite is stored at reduced resolution and mirrored into place
+        painter.setRenderHint(QtGui.QPainter.SmoothPixmapTransform)
+        r = sprites['radius']
+        corner = sprites['corner']
+        for sx, sy in ((1, 1), (-1, 1), (1, -1), (-1, -1)):
+            painter.save()
+            painter.translate(0 if sx > 0 else w, 0 if sy > 0 else h)
+            painter.scale(sx, sy)
+            painter.drawPixmap(QtCore.QRect(0, 0, r, r), corner)
+            painter.restore()
+
+    def _paint_direct(self, painter, w, h):
+        current_color = self.controller.current_color
+        zoom_scale = self.controller.zoom_scale
+        color_with_alpha = QtGui.QColor(current_color)
+        scale_factor = (zoom_scale - 0.9)/0.4
+        base_alpha = 40 + int(scale_factor * 80)
+        color_with_alpha.setAlpha(min(120, base_alpha))
+        edge_size = int(min(w,h) * 0.3 * zoom_scale)
+
+        top_rect = QtCore.QRect(0,0,w,edge_size)
+        gradient = QtGui.QLinearGradient(0,0,0,edge_size)
+        gradient.setColorAt(0.0, color_with_alpha)
+        gradient.setColorAt(1.0, QtGui.QColor(0,0,0,0))
+        painter.fillRect(top_rect, gradient)
+
+        bottom_rect = QtCore.QRect(0,h-edge_size,w,edge_size)
+        gradient = QtGui.QLinearGradient(0,h,0,h-edge_size)
+        gradient.setColorAt(0.0, color_with_alpha)
+        gradient.setColorAt(1.0, QtGui.QColor(0,0,0,0))
+        painter.fillRect(bottom_rect, gradient)
+
+        left_rect = QtCore.QRect(0,0,edge_size,h)
+        gradient = QtGui.QLinearGradient(0,0,edge_size,0)
+        gradient.setColorAt(0.0, color_with_alpha)
+        gradient.setColorAt(1.0, QtGui.QColor(0,0,0,0))
+        painter.fillRect(left_rect, gradient)
+
+        right_rect = QtCore.QRect(w-edge_size,0,edge_size,h)
+        gradient = QtGui.QLinearGradient(w,0,w-edge_size,0)
+        gradient.setColorAt(0.0, color_with_alpha)
+        gradient.setColorAt(1.0, QtGui.QColor(0,0,0,0))
+        painter.fillRect(right_rect, gradient)
+
+        corner_radius = int(min(w,h) * 0.5 * zoom_scale)
+        color_with_alpha.setAlpha(50)
+        corner_rect = QtCore.QRect(0,0,w,h)
+        corners = [(0,0),(w,0),(0,h),(w,h)]
+        for cx,cy in corners:
+            gradient = QtGui.QRadialGradient(cx,cy,corner_radius)
+            gradient.setColorAt(0.0, color_with_alpha)
+            gradient.setColorAt(0.5, QtGui.QColor(current_color.red(), current_color.green(), current_color.blue(), 20))
+            gradient.setColorAt(1.0, QtGui.QColor(0,0,0,0))
+            painter.fillRect(corner_rect, gradient)
+
 
-        self.fade_animation = QtCore.QPropertyAnimation(self, b"windowOpacity")
+class VignetteController(QtCore.QObject):
+    """Drives one VignetteOverlay per screen from a single animation state.
+
+    Colour cycle, zoom spring, fade and the on-demand animation clock are shared;
+    the sprite cache is shared too, so screens with the same resolution reuse the
+    same pre-rendered frames. Screens added or removed at runtime get or lose
+    their overlay immediately.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._opacity = 0.0
+        self.fade_animation = QtCore.QPropertyAnimation(self, b"opacity")
         self.time_offset = time.time()
-        self.current_opacity = 0.0
+        self.active = False
 
         self.zoom_scale = 1.0
         self.zoom_velocity = 0.0
@@ -1016,9 +4040,19 @@ class VignetteOverlay(QtWidgets.QWidget):
         self.spring_constant = 800.0
         self.damping = 20.0
 
+        # animation clock runs on demand: while visible or while the zoom spring moves
         self.update_timer = QtCore.QTimer(self)
+        self.update_timer.setTimerType(QtCore.Qt.PreciseTimer)
         self.update_timer.timeout.connect(self.update_animation)
-        self.update_timer.start(16)
+        self.frame_interval_ms = 16
+        self.rest_epsilon = 1e-3
+        self._last_tick = None
+
+        # optional callable returning the playing audio's (amp, low, mid, high) in 0..1;
+        # while it yields values the bass drives the zoom and the amplitude the opacity
+        self.envelope_source = None
+        self.envelope_level = None
+        self.rest_zoom = 1.15
 
         self.base_colors = [
             QtGui.QColor(0,255,255),
@@ -1028,21 +4062,102 @@ class VignetteOverlay(QtWidgets.QWidget):
         ]
         self.current_color = self.base_colors[0]
 
-    def showEvent(self, event):
-        screen = QtWidgets.QApplication.primaryScreen()
-        if screen:
-            self.setGeometry(screen.geometry())
-        super().showEvent(event)
+        # pre-rendered sprites; YUJI_VIGNETTE_CACHE=0 falls back to per-frame gradients for comparison
+        self.sprite_cache = VignetteSpriteCache()
+        self.use_sprite_cache = os.environ.get("YUJI_VIGNETTE_CACHE", "1") != "0"
+        self.paint_times = collections.deque(maxlen=240)
+
+        # one overlay per screen, kept in sync with hot-plug events
+        self.overlays = {}
+        app = QtWidgets.QApplication.instance()
+        for screen in app.screens():
+            self._add_screen(screen)
+        app.screenAdded.connect(self._add_screen)
+        app.screenRemoved.connect(self._remove_screen)
+
+    def _get_opacity(self):
+        return self._opacity
+
+    def _set_opacity(self, value):
+        self._opacity = value
+        for overlay in self.overlays.values():
+            overlay.setWindowOpacity(value)
+
+    opacity = QtCore.pyqtProperty(float, fget=_get_opacity, fset=_set_opacity)
+
+    def _add_screen(self, screen):
+        if screen in self.overlays:
+            return
+        overlay = VignetteOverlay(self, screen)
+        overlay.setWindowOpacity(self._opacity)
+        self.overlays[screen] = overlay
+        self._resize_cache()
+        log.info("Vignette overlay added for screen %s (%dx%d)", screen.name(), screen.geometry().width(), screen.geometry().height())
+        if self.active:
+            overlay.show()
+            self._ensure_clock()
+
+    def _remove_screen(self, screen):
+        overlay = self.overlays.pop(screen, None)
+        if overlay is None:
+            return
+        overlay.close()
+        overlay.deleteLater()
+        self._resize_cache()
+        log.info("Vignette overlay removed for screen %s", screen.name())
+
+    def _resize_cache(self):
+        # keep the per-resolution working set when screens differ in size
+        sizes = {(o.target_screen.geometry().width(), o.target_screen.geometry().height()) for o in self.overlays.values()}
+        self.sprite_cache.max_entries = 64 * max(1, len(sizes))
+
+    def isVisible(self):
+        return any(o.isVisible() for o in self.overlays.values())
+
+    def close(self):
+        self.update_timer.stop()
+        for overlay in self.overlays.values():
+            overlay.close()
+
+    def _refresh_interval_ms(self):
+        """Frame interval matching the fastest refresh rate among the screens."""
+        rates = [s.refreshRate() for s in self.overlays] or [0.0]
+        rate = max(rates)
+        if not rate or rate <= 0:
+            return 16
+        return max(4, int(round(1000.0 / rate)))
+
+    @QtCore.pyqtSlot()
+    def _ensure_clock(self):
+        """Start the animation clock if it is idle, paced to the screen refresh."""
+        interval = self._refresh_interval_ms()
+        if self.update_timer.isActive():
+            if interval != self.frame_interval_ms:
+                self.frame_interval_ms = interval
+                self.update_timer.setInterval(interval)
+            return
+        self.frame_interval_ms = interval
+        self.last_update_time = time.time()
+        self._last_tick = None
+        self.update_timer.start(interval)
+
+    def spring_at_rest(self):
+        return (abs(self.zoom_velocity) < self.rest_epsilon
+                and abs(self.zoom_scale - self.zoom_target) < self.rest_epsilon)
 
     def start_effect(self):
+        self.active = True
         self.fade_animation.setDuration(500)
         self.fade_animation.setStartValue(0.0)
         self.fade_animation.setEndValue(1.0)
         self.fade_animation.start()
         self.time_offset = time.time()
-        self.show()
+        for overlay in self.overlays.values():
+            overlay.show()
+        self._ensure_clock()
 
     def stop_effect(self):
+        self.active = False
         self.fade_animation.setDuration(500)
         self.fade_animation.setStartValue(1.0)
         self.fade_animation.setEndValue(0.0)
@@ -1050,18 +4165,83 @@ class VignetteOverlay(QtWidgets.QWidget):
         self.fade_animation.start()
 
     def _on_fade_out_finished(self):
-        self.hide()
+        for overlay in self.overlays.values():
+            overlay.hide()
+        frames, mean_ms, max_ms = self.paint_stats()
+        if frames:
+            log.info("Vignette paint (%s, %d screens): mean %.2f ms, max %.2f ms over %d frames; sprite cache %d hits / %d misses",
+                     "sprites" if self.use_sprite_cache else "direct", len(self.overlays), mean_ms, max_ms, frames,
+                     self.sprite_cache.hits, self.sprite_cache.misses)
+            self.paint_times.clear()
         try:
             self.fade_animation.finished.disconnect(self._on_fade_out_finished)
         except TypeError:
             pass # Already disconnected
 
+    def paint_stats(self):
+        """(frames, mean ms, max ms) over the recent paint window, all screens."""
+        times = list(self.paint_times)
+        if not times:
+            return 0, 0.0, 0.0
+        return len(times), sum(times) / len(times), max(times)
+
     def trigger_zoom(self):
-        self.zoom_target = 1.15
+        """Kick the zoom spring; safe to call from the keyboard hook thread."""
+        self.zoom_target = self.rest_zoom
         self.zoom_velocity += 15.0
+        if QtCore.QThread.currentThread() == self.thread():
+            self._ensure_clock()
+        elif not self.update_timer.isActive():
+            # timers can only be started from their own thread
+            QtCore.QMetaObject.invokeMethod(self, "_ensure_clock", QtCore.Qt.QueuedConnection)
 
     def update_animation(self):
+        t0 = time.perf_counter()
+        if self._last_tick is not None:
+            FRAME_STATS.record('overlay.jitter', abs((t0 - self._last_tick) * 1000.0 - self.frame_interval_ms))
+        self._last_tick = t0
         current_time = time.time()
+        visible = [o for o in self.overlays.values() if o.isVisible()]
+        if visible:
+            self._update_color(current_time)
+            self._apply_envelope()
+
+        # zoom physics: fixed sub-steps so low refresh rates integrate the same spring
+        dt = min(current_time - self.last_update_time, 0.1)
+        self.last_update_time = current_time
+        steps = max(1, int(dt / 0.008 + 0.999))
+        step = dt / steps
+        for _ in range(steps):
+            displacement = self.zoom_scale - self.zoom_target
+            spring_force = -self.spring_constant * displacement
+            damping_force = -self.damping * self.zoom_velocity
+            self.zoom_velocity += (spring_force + damping_force) * step
+            self.zoom_scale += self.zoom_velocity * step
+            self.zoom_scale = max(0.9, min(1.3, self.zoom_scale))
+        resting = self.spring_at_rest()
+        if resting:
+            # settle exactly so the next frames (and sprite cache keys) stop changing
+            self.zoom_scale = self.zoom_target
+            self.zoom_velocity = 0.0
+
+        if visible:
+            for overlay in visible:
+                overlay.update()
+        elif resting:
+            self.update_timer.stop()
+        FRAME_STATS.record('overlay.animate', (time.perf_counter() - t0) * 1000.0)
+
+    def _apply_envelope(self):
+        env = self.envelope_source() if self.active and self.envelope_source is not None else None
+        if env is None:
+            if self.envelope_level is not None:
+                self.envelope_level = None
+                self.zoom_target = self.rest_zoom
+            return
+        self.envelope_level = float(env[0])
+        self.zoom_target = self.rest_zoom + 0.12 * float(env[1])
+
+    def _update_color(self, current_time):
         t = (current_time - self.time_offset) * 2.0
         idx = int(t) % len(self.base_colors)
         next_idx = (idx + 1) % len(self.base_colors)
@@ -1073,63 +4253,195 @@ class VignetteOverlay(QtWidgets.QWidget):
         b = int(c1.blue() * (1-fraction) + c2.blue() * fraction)
         self.current_color = QtGui.QColor(r,g,b)
 
-        # zoom physics
-        dt = min(current_time - self.last_update_time, 0.016)
-        self.last_update_time = current_time
-        displacement = self.zoom_scale - self.zoom_target
-        spring_force = -self.spring_constant * displacement
-        damping_force = -self.damping * self.zoom_velocity
-        self.zoom_velocity += (spring_force + damping_force) * dt
-        self.zoom_scale += self.zoom_velocity * dt
-        self.zoom_scale = max(0.9, min(1.3, self.zoom_scale))
-        self.update()
+# -----------------------------
+# Sound settings table (model/view)
+# -----------------------------
+class SoundSettingsModel(QtCore.QAbstractTableModel):
+    """Per-file chance/volume rows backed by core.sound_settings.
 
-    def paintEvent(self, event):
-        painter = QtGui.QPainter(self)
-        painter.setRenderHint(QtGui.QPainter.Antialiasing)
-        rect = self.rect()
-        w = rect.width()
-        h = rect.height()
-        color_with_alpha = QtGui.QColor(self.current_color)
-        scale_factor = (self.zoom_scale - 0.9)/0.4
-        base_alpha = 40 + int(scale_factor * 80)
-        color_with_alpha.setAlpha(min(120, base_alpha))
-        edge_size = int(min(w,h) * 0.3 * self.zoom_scale)
+    Edits are kept in a side table until pending_changes() is taken on save, so the
+    core's settings are untouched while the dialog is open.
+    """
+    NAME_COL, CATEGORY_COL, CHANCE_COL, VOLUME_COL = range(4)
+    HEADERS = ("Name", "Category", "Chance", "Volume")
+    _KEYS = {CHANCE_COL: 'chance', VOLUME_COL: 'volume'}
 
-        top_rect = QtCore.QRect(0,0,w,edge_size)
-        gradient = QtGui.QLinearGradient(0,0,0,edge_size)
-        gradient.setColorAt(0.0, color_with_alpha)
-        gradient.setColorAt(1.0, QtGui.QColor(0,0,0,0))
-        painter.fillRect(top_rect, gradient)
+    def __init__(self, core, parent=None):
+        super().__init__(parent)
+        self.core = core
+        self._rows = []     # (path, basename, category)
+        self._blocks = []   # [(category, [files])] in row order
+        self._edits = {}    # path -> {'chance': x, 'volume': y}
+
+    def set_rows(self, categories):
+        """Replace all rows from [(category, files), ...]."""
+        self.beginResetModel()
+        self._blocks = [(title, list(files)) for title, files in categories]
+        self._rows = [(f, os.path.basename(f), title) for title, files in self._blocks for f in files]
+        self.endResetModel()
+
+    def sync_rows(self, categories):
+        """Bring rows up to date with the current libraries.
+
+        Only categories whose file list changed are removed and re-inserted, so the
+        view keeps its selection and scroll position everywhere else.
+        """
+        if [title for title, _ in categories] != [title for title, _ in self._blocks]:
+            self.set_rows(categories)
+            return
+        start = 0
+        for i, (title, files) in enumerate(categories):
+            old = self._blocks[i][1]
+            if files != old:
+                files = list(files)
+                if old:
+                    self.beginRemoveRows(QtCore.QModelIndex(), start, start + len(old) - 1)
+                    del self._rows[start:start + len(old)]
+                    self.endRemoveRows()
+                if files:
+                    self.beginInsertRows(QtCore.QModelIndex(), start, start + len(files) - 1)
+                    self._rows[start:start] = [(f, os.path.basename(f), title) for f in files]
+                    self.endInsertRows()
+                self._blocks[i] = (title, files)
+            start += len(files)
+        if self._edits:
+            present = {row[0] for row in self._rows}
+            self._edits = {path: edit for path, edit in self._edits.items() if path in present}
+        # stored values may have changed underneath (saved elsewhere or reloaded)
+        if self._rows:
+            self.dataChanged.emit(self.index(0, self.CHANCE_COL), self.index(len(self._rows) - 1, self.VOLUME_COL))
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if orientation == QtCore.Qt.Horizontal and role == QtCore.Qt.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def flags(self, index):
+        flags = QtCore.Qt.ItemIsEnabled | QtCore.Qt.ItemIsSelectable
+        if index.column() in self._KEYS:
+            flags |= QtCore.Qt.ItemIsEditable
+        return flags
+
+    def value(self, path, key):
+        edit = self._edits.get(path)
+        if edit is not None:
+            return edit[key]
+        try:
+            return float(self.core.sound_settings.get(path, {}).get(key, 1.0))
+        except (TypeError, ValueError):
+            return 1.0
 
-        bottom_rect = QtCore.QRect(0,h-edge_size,w,edge_size)
-        gradient = QtGui.QLinearGradient(0,h,0,h-edge_size)
-        gradient.setColorAt(0.0, color_with_alpha)
-        gradient.setColorAt(1.0, QtGui.QColor(0,0,0,0))
-        painter.fillRect(bottom_rect, gradient)
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        path, name, category = self._rows[index.row()]
+        col = index.column()
+        if role == QtCore.Qt.ToolTipRole:
+            return path
+        if role in (QtCore.Qt.DisplayRole, QtCore.Qt.EditRole):
+            if col == self.NAME_COL:
+                return name
+            if col == self.CATEGORY_COL:
+                return category
+            value = self.value(path, self._KEYS[col])
+            return value if role == QtCore.Qt.EditRole else f"{value:.2f}"
+        if role == QtCore.Qt.TextAlignmentRole and col in self._KEYS:
+            return int(QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter)
+        if role == QtCore.Qt.FontRole and col in self._KEYS and path in self._edits:
+            font = QtGui.QFont()
+            font.setBold(True)
+            return font
+        return None
+
+    def _store(self, row, column, value):
+        path = self._rows[row][0]
+        edit = self._edits.get(path)
+        if edit is None:
+            edit = self._edits[path] = {'chance': self.value(path, 'chance'), 'volume': self.value(path, 'volume')}
+        edit[self._KEYS[column]] = round(max(0.0, min(1.0, float(value))), 2)
+
+    def setData(self, index, value, role=QtCore.Qt.EditRole):
+        if role != QtCore.Qt.EditRole or index.column() not in self._KEYS:
+            return False
+        try:
+            self._store(index.row(), index.column(), value)
+        except (TypeError, ValueError):
+            return False
+        self.dataChanged.emit(index, index)
+        return True
+
+    def set_values(self, rows, column, value):
+        """Bulk-set one column for many rows with a single dataChanged."""
+        rows = sorted(rows)
+        if not rows or column not in self._KEYS:
+            return
+        for row in rows:
+            self._store(row, column, value)
+        self.dataChanged.emit(self.index(rows[0], self.CHANCE_COL), self.index(rows[-1], self.VOLUME_COL))
 
-        left_rect = QtCore.QRect(0,0,edge_size,h)
-        gradient = QtGui.QLinearGradient(0,0,edge_size,0)
-        gradient.setColorAt(0.0, color_with_alpha)
-        gradient.setColorAt(1.0, QtGui.QColor(0,0,0,0))
-        painter.fillRect(left_rect, gradient)
+    def pending_changes(self):
+        """Edited entries that differ from what the core currently stores."""
+        defaults = {'chance': 1.0, 'volume': 1.0}
+        return {path: dict(edit) for path, edit in self._edits.items()
+                if self.core.sound_settings.get(path, defaults) != edit}
 
-        right_rect = QtCore.QRect(w-edge_size,0,edge_size,h)
-        gradient = QtGui.QLinearGradient(w,0,w-edge_size,0)
-        gradient.setColorAt(0.0, color_with_alpha)
-        gradient.setColorAt(1.0, QtGui.QColor(0,0,0,0))
-        painter.fillRect(right_rect, gradient)
+    def discard_edits(self):
+        if self._edits:
+            self._edits = {}
+            if self._rows:
+                self.dataChanged.emit(self.index(0, self.CHANCE_COL), self.index(len(self._rows) - 1, self.VOLUME_COL))
 
-        corner_radius = int(min(w,h) * 0.5 * self.zoom_scale)
-        color_with_alpha.setAlpha(50)
-        corner_rect = QtCore.QRect(0,0,w,h)
-        corners = [(0,0),(w,0),(0,h),(w,h)]
-        for cx,cy in corners:
-            gradient = QtGui.QRadialGradient(cx,cy,corner_radius)
-            gradient.setColorAt(0.0, color_with_alpha)
-            gradient.setColorAt(0.5, QtGui.QColor(self.current_color.red(), self.current_color.green(), self.current_color.blue(), 20))
-            gradient.setColorAt(1.0, QtGui.QColor(0,0,0,0))
-            painter.fillRect(corner_rect, gradient)
+
+class SoundFilterProxy(QtCore.QSortFilterProxyModel):
+    """Filters sound rows by case-insensitive name substring and category."""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._text = ""
+        self._category = None
+
+    def set_filter(self, text, category=None):
+        text = text.strip().lower()
+        if text == self._text and category == self._category:
+            return
+        self._text = text
+        self._category = category
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        path, name, category = self.sourceModel()._rows[source_row]
+        if self._category is not None and category != self._category:
+            return False
+        return not self._text or self._text in name.lower()
+
+
+class UnitSpinDelegate(QtWidgets.QStyledItemDelegate):
+    """0.00-1.00 spin box editor, created only for the cell being edited."""
+    def createEditor(self, parent, option, index):
+        if index.column() not in SoundSettingsModel._KEYS:
+            return super().createEditor(parent, option, index)
+        editor = SettingsDialog._make_unit_spin()
+        editor.setParent(parent)
+        editor.setFrame(False)
+        return editor
+
+    def setEditorData(self, editor, index):
+        if isinstance(editor, QtWidgets.QDoubleSpinBox):
+            editor.setValue(float(index.data(QtCore.Qt.EditRole)))
+        else:
+            super().setEditorData(editor, index)
+
+    def setModelData(self, editor, model, index):
+        if isinstance(editor, QtWidgets.QDoubleSpinBox):
+            editor.interpretText()
+            model.setData(index, editor.value(), QtCore.Qt.EditRole)
+        else:
+            super().setModelData(editor, model, index)
 
 # -----------------------------
 # Settings Dialog (exposes stage_sounds path)
@@ -1167,6 +4479,45 @@ class SettingsDialog(QtWidgets.QDialog):
         self.funk_every_spin.setValue(self.core.funk_every_n_borps)
         gl.addRow("Normal Funk every N borps:", self.funk_every_spin)
 
+        self.metrics_port = QtWidgets.QSpinBox()
+        self.metrics_port.setRange(0, 65535)
+        self.metrics_port.setSpecialValueText("off")
+        self.metrics_port.setValue(self.core.metrics_port)
+        gl.addRow("Metrics port (127.0.0.1):", self.metrics_port)
+
+        self.input_port = QtWidgets.QSpinBox()
+        self.input_port.setRange(0, 65535)
+        self.input_port.setSpecialValueText("off")
+        self.input_port.setValue(self.core.input_port)
+        gl.addRow("Input server port (127.0.0.1):", self.input_port)
+
+        self.pcm_cache_spin = QtWidgets.QSpinBox()
+        self.pcm_cache_spin.setRange(0, 4096)
+        self.pcm_cache_spin.setSuffix(" MB")
+        self.pcm_cache_spin.setSpecialValueText("off")
+        self.pcm_cache_spin.setValue(self.core.pcm_cache_mb)
+        if not getattr(self.core, '_owns_assets', True):
+            self.pcm_cache_spin.setEnabled(False)
+            self.pcm_cache_spin.setToolTip("Shared by all stations; set it in Station 1's settings")
+        gl.addRow("Decoded sound cache:", self.pcm_cache_spin)
+
+        # this station's output mix (several stations can share one sound card)
+        self.station_volume = QtWidgets.QDoubleSpinBox()
+        self.station_volume.setRange(0.0, 1.0)
+        self.station_volume.setSingleStep(0.05)
+        self.station_volume.setValue(self.core.station_volume)
+        gl.addRow("Station volume:", self.station_volume)
+        self.station_pan = QtWidgets.QDoubleSpinBox()
+        self.station_pan.setRange(-1.0, 1.0)
+        self.station_pan.setSingleStep(0.1)
+        self.station_pan.setValue(self.core.station_pan)
+        gl.addRow("Station pan (left -1 .. right 1):", self.station_pan)
+
+        self.profile_btn = QtWidgets.QPushButton()
+        self.profile_btn.clicked.connect(self._toggle_profiler)
+        self._update_profile_btn()
+        gl.addRow("Profiler:", self.profile_btn)
+
         tabs.addTab(general_tab, "General")
 
         # Paths
@@ -1176,12 +4527,11 @@ class SettingsDialog(QtWidgets.QDialog):
         pl.addRow("Shared Folder:", self.shared_folder)
 
         pl.addRow(QtWidgets.QLabel("\nBorp Stage Folders:"))
-        self.normal_folder = self._make_path_edit(os.path.join(self.core.shared_folder, self.core.borp_stages['normal']['folder']), "Normal Stage")
-        pl.addRow("Normal Stage:", self.normal_folder)
-        self.super_folder = self._make_path_edit(os.path.join(self.core.shared_folder, self.core.borp_stages['super']['folder']), "Super Stage")
-        pl.addRow("Super Stage:", self.super_folder)
-        self.miracle_folder = self._make_path_edit(os.path.join(self.core.shared_folder, self.core.borp_stages['miracle']['folder']), "Miracle Stage")
-        pl.addRow("Miracle Stage:", self.miracle_folder)
+        self.stage_folders = {}
+        for name, stage in self.core.borp_stages.items():
+            edit = self._make_path_edit(os.path.join(self.core.shared_folder, stage['folder']), f"{name.capitalize()} Stage")
+            pl.addRow(f"{name.capitalize()} Stage:", edit)
+            self.stage_folders[name] = edit
 
         self.stage_sounds = self._make_path_edit(self.core.stage_sounds_folder, "Stage Achievement Sounds")
         pl.addRow("Stage Sounds:", self.stage_sounds)
@@ -1199,55 +4549,103 @@ class SettingsDialog(QtWidgets.QDialog):
 
         tabs.addTab(paths_tab, "Paths")
 
-        # Sound Settings tab (per-sound chance/volume)
+        # Sound Settings tab (per-sound chance/volume): a virtualized table; spin box
+        # editors are only created for the cell being edited
         sound_tab = QtWidgets.QWidget()
         sl = QtWidgets.QVBoxLayout(sound_tab)
-        scroll = QtWidgets.QScrollArea()
-        scroll.setWidgetResizable(True)
-        container = QtWidgets.QWidget()
-        cont_l = QtWidgets.QVBoxLayout(container)
-        cont_l.setContentsMargins(0,0,0,0)
-        self._sound_rows = {}
-
-        def add_section(title, files):
-            group = QtWidgets.QGroupBox(title)
-            form = QtWidgets.QFormLayout(group)
-            for f in files:
-                row = QtWidgets.QWidget()
-                hl = QtWidgets.QHBoxLayout(row)
-                hl.setContentsMargins(0,0,0,0)
-                name = QtWidgets.QLabel(os.path.basename(f))
-                name.setToolTip(f)
-                name.setMinimumWidth(180)
-                hl.addWidget(name, 1)
-                chance = QtWidgets.QDoubleSpinBox()
-                chance.setRange(0.0,1.0)
-                chance.setSingleStep(0.05)
-                chance.setDecimals(2)
-                chance.setValue(float(self.core.sound_settings.get(f, {}).get('chance', 1.0)))
-                hl.addWidget(QtWidgets.QLabel("Chance"))
-                hl.addWidget(chance)
-                vol = QtWidgets.QDoubleSpinBox()
-                vol.setRange(0.0,1.0)
-                vol.setSingleStep(0.05)
-                vol.setDecimals(2)
-                vol.setValue(float(self.core.sound_settings.get(f, {}).get('volume', 1.0)))
-                hl.addWidget(QtWidgets.QLabel("Volume"))
-                hl.addWidget(vol)
-                form.addRow(row)
-                self._sound_rows[f] = (chance, vol)
-            cont_l.addWidget(group)
-
-        add_section("Shared", getattr(self.core,'shared_files',[]))
-        add_section("Funk", getattr(self.core,'funk_files',[]))
-        # Include Hyper Funk files so their chance/volume can be tuned and saved
-        add_section("Hyper Funk", getattr(self.core,'hyper_funk_files',[]))
-        add_section("Special", getattr(self.core,'special_files',[]))
-        cont_l.addStretch(1)
-        scroll.setWidget(container)
-        sl.addWidget(scroll)
+        self.sound_model = SoundSettingsModel(self.core)
+        self.sound_model.set_rows(self._sound_categories())
+        self.sound_proxy = SoundFilterProxy(self)
+        self.sound_proxy.setSourceModel(self.sound_model)
+
+        filter_row = QtWidgets.QHBoxLayout()
+        self.sound_filter = QtWidgets.QLineEdit()
+        self.sound_filter.setPlaceholderText("Filter by name...")
+        self.sound_filter.setClearButtonEnabled(True)
+        filter_row.addWidget(self.sound_filter, 1)
+        self.sound_category = QtWidgets.QComboBox()
+        self.sound_category.addItem("All")
+        self.sound_category.addItems([title for title, _ in self._sound_categories()])
+        filter_row.addWidget(self.sound_category)
+        sl.addLayout(filter_row)
+        # typing refilters after a short pause instead of on every keystroke
+        self._filter_timer = QtCore.QTimer(self)
+        self._filter_timer.setSingleShot(True)
+        self._filter_timer.setInterval(150)
+        self._filter_timer.timeout.connect(self._apply_sound_filter)
+        self.sound_filter.textChanged.connect(self._filter_timer.start)
+        self.sound_category.currentIndexChanged.connect(self._apply_sound_filter)
+
+        self.sound_view = QtWidgets.QTableView()
+        self.sound_view.setModel(self.sound_proxy)
+        self.sound_view.setItemDelegate(UnitSpinDelegate(self.sound_view))
+        self.sound_view.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
+        self.sound_view.setSelectionMode(QtWidgets.QAbstractItemView.ExtendedSelection)
+        self.sound_view.setEditTriggers(QtWidgets.QAbstractItemView.DoubleClicked | QtWidgets.QAbstractItemView.EditKeyPressed
+                                        | QtWidgets.QAbstractItemView.AnyKeyPressed)
+        self.sound_view.verticalHeader().hide()
+        self.sound_view.verticalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Fixed)
+        self.sound_view.verticalHeader().setDefaultSectionSize(24)
+        header = self.sound_view.horizontalHeader()
+        header.setSectionResizeMode(0, QtWidgets.QHeaderView.Stretch)
+        # fixed widths: ResizeToContents would measure every row
+        for col, width in ((1, 90), (2, 70), (3, 70)):
+            header.setSectionResizeMode(col, QtWidgets.QHeaderView.Fixed)
+            header.resizeSection(col, width)
+        sl.addWidget(self.sound_view, 1)
+
+        bulk_row = QtWidgets.QHBoxLayout()
+        self.bulk_chance = self._make_unit_spin()
+        bulk_row.addWidget(QtWidgets.QLabel("Chance"))
+        bulk_row.addWidget(self.bulk_chance)
+        chance_btn = QtWidgets.QPushButton("Set on selected")
+        chance_btn.clicked.connect(lambda: self._bulk_set(SoundSettingsModel.CHANCE_COL, self.bulk_chance.value()))
+        bulk_row.addWidget(chance_btn)
+        self.bulk_volume = self._make_unit_spin()
+        bulk_row.addWidget(QtWidgets.QLabel("Volume"))
+        bulk_row.addWidget(self.bulk_volume)
+        volume_btn = QtWidgets.QPushButton("Set on selected")
+        volume_btn.clicked.connect(lambda: self._bulk_set(SoundSettingsModel.VOLUME_COL, self.bulk_volume.value()))
+        bulk_row.addWidget(volume_btn)
+        sl.addLayout(bulk_row)
         tabs.addTab(sound_tab, "Sound Settings")
 
+        # Keys tab: key -> action table plus per-action debounce
+        keys_tab = QtWidgets.QWidget()
+        kl = QtWidgets.QVBoxLayout(keys_tab)
+        self.key_table = QtWidgets.QTableWidget(0, 2)
+        self.key_table.setHorizontalHeaderLabels(["Key", "Action"])
+        self.key_table.horizontalHeader().setSectionResizeMode(0, QtWidgets.QHeaderView.Stretch)
+        self.key_table.verticalHeader().hide()
+        kl.addWidget(self.key_table, 1)
+        key_btns = QtWidgets.QHBoxLayout()
+        add_key_btn = QtWidgets.QPushButton("Add")
+        add_key_btn.clicked.connect(lambda: self._add_key_row("", KEY_ACTIONS[0], edit=True))
+        key_btns.addWidget(add_key_btn)
+        remove_key_btn = QtWidgets.QPushButton("Remove")
+        remove_key_btn.clicked.connect(self._remove_key_rows)
+        key_btns.addWidget(remove_key_btn)
+        key_btns.addStretch()
+        kl.addLayout(key_btns)
+        debounce_form = QtWidgets.QFormLayout()
+        self.debounce_spins = {}
+        self.repeat_checks = {}
+        for action in KEY_ACTIONS:
+            spin = QtWidgets.QDoubleSpinBox()
+            spin.setRange(0.0, 5.0)
+            spin.setSingleStep(0.05)
+            spin.setSuffix(" s")
+            repeat = QtWidgets.QCheckBox("repeat while held")
+            row = QtWidgets.QHBoxLayout()
+            row.addWidget(spin)
+            row.addWidget(repeat)
+            debounce_form.addRow(f"{action.capitalize()} debounce:", row)
+            self.debounce_spins[action] = spin
+            self.repeat_checks[action] = repeat
+        kl.addLayout(debounce_form)
+        self._load_key_bindings()
+        tabs.addTab(keys_tab, "Keys")
+
         # Visuals tab (simple)
         visuals_tab = QtWidgets.QWidget()
         vl = QtWidgets.QFormLayout(visuals_tab)
@@ -1276,6 +4674,124 @@ class SettingsDialog(QtWidgets.QDialog):
         layout.addLayout(btns)
         self.apply_styles()
 
+    def refresh_from_core(self):
+        """Re-read core values and libraries into an already built dialog.
+
+        Returns False when the stage tiers changed, in which case the dialog has to
+        be rebuilt.
+        """
+        if list(self.stage_folders) != list(self.core.borp_stages):
+            return False
+        self.token_chance.setValue(self.core.token_chance)
+        self.cooldown.setValue(self.core.cooldown)
+        self.funk_every_spin.setValue(self.core.funk_every_n_borps)
+        self.metrics_port.setValue(self.core.metrics_port)
+        self.input_port.setValue(self.core.input_port)
+        self.pcm_cache_spin.setValue(self.core.pcm_cache_mb)
+        self.station_volume.setValue(self.core.station_volume)
+        self.station_pan.setValue(self.core.station_pan)
+        self._set_path(self.shared_folder, self.core.shared_folder)
+        for name, edit in self.stage_folders.items():
+            self._set_path(edit, os.path.join(self.core.shared_folder, self.core.borp_stages[name]['folder']))
+        self._set_path(self.stage_sounds, self.core.stage_sounds_folder)
+        self._set_path(self.funk_folder, self.core.funk_folder)
+        self._set_path(self.special_folder, self.core.special_folder)
+        self._set_path(self.hyper_folder, self.core.hyper_funk_folder)
+        self._set_path(self.hyperborb_folder, self.core.hyperborb_folder)
+        self._set_path(self.token_folder, self.core.token_folder)
+        self.sound_model.sync_rows(self._sound_categories())
+        self._load_key_bindings()
+        self._update_profile_btn()
+        colors = self.parent().vignette.base_colors
+        if [self.color_list.item(i).background().color() for i in range(self.color_list.count())] != colors:
+            self.color_list.clear()
+            for color in colors:
+                item = QtWidgets.QListWidgetItem()
+                item.setBackground(color)
+                self.color_list.addItem(item)
+        return True
+
+    def _toggle_profiler(self):
+        self.core.perform_action('profile')
+        self._update_profile_btn()
+
+    def _update_profile_btn(self):
+        self.profile_btn.setText("Stop profiling" if self.core.profiler.running else "Start profiling")
+
+    def _load_key_bindings(self):
+        self.key_table.setRowCount(0)
+        for key, action in sorted(self.core.key_actions.items(), key=lambda kv: (KEY_ACTIONS.index(kv[1]), kv[0])):
+            self._add_key_row(key, action)
+        for action, spin in self.debounce_spins.items():
+            spin.setValue(self.core.action_debounce.get(action, 0.0))
+        for action, check in self.repeat_checks.items():
+            check.setChecked(self.core.action_repeat.get(action, False))
+
+    def _add_key_row(self, key, action, edit=False):
+        row = self.key_table.rowCount()
+        self.key_table.insertRow(row)
+        self.key_table.setItem(row, 0, QtWidgets.QTableWidgetItem(key))
+        combo = QtWidgets.QComboBox()
+        combo.addItems(KEY_ACTIONS)
+        combo.setCurrentText(action)
+        self.key_table.setCellWidget(row, 1, combo)
+        if edit:
+            self.key_table.editItem(self.key_table.item(row, 0))
+
+    def _remove_key_rows(self):
+        for row in sorted({idx.row() for idx in self.key_table.selectedIndexes()}, reverse=True):
+            self.key_table.removeRow(row)
+
+    def key_bindings(self):
+        """Bindings as currently shown in the Keys tab."""
+        bindings = {}
+        for row in range(self.key_table.rowCount()):
+            item = self.key_table.item(row, 0)
+            key = item.text().strip().lower() if item is not None else ""
+            if key:
+                bindings[key] = self.key_table.cellWidget(row, 1).currentText()
+        return bindings
+
+    @staticmethod
+    def _set_path(container, text):
+        edit = container.findChild(QtWidgets.QLineEdit)
+        if edit.text() != text:
+            edit.setText(text)
+
+    def _sound_categories(self):
+        return [
+            ("Shared", getattr(self.core, 'shared_files', [])),
+            ("Funk", getattr(self.core, 'funk_files', [])),
+            # Include Hyper Funk files so their chance/volume can be tuned and saved
+            ("Hyper Funk", getattr(self.core, 'hyper_funk_files', [])),
+            ("Special", getattr(self.core, 'special_files', [])),
+        ]
+
+    @staticmethod
+    def _make_unit_spin():
+        spin = QtWidgets.QDoubleSpinBox()
+        spin.setRange(0.0, 1.0)
+        spin.setSingleStep(0.05)
+        spin.setDecimals(2)
+        spin.setValue(1.0)
+        return spin
+
+    def _apply_sound_filter(self):
+        category = self.sound_category.currentText()
+        self.sound_proxy.set_filter(self.sound_filter.text(), None if category == "All" else category)
+
+    def _bulk_set(self, column, value):
+        rows = {self.sound_proxy.mapToSource(idx).row() for idx in self.sound_view.selectionModel().selectedRows()}
+        if not rows:
+            self.core.status_message.emit("Select rows in the sound list first.")
+            return
+        self.sound_model.set_values(rows, column, value)
+
+    def reject(self):
+        # unsaved per-sound edits do not survive Cancel
+        self.sound_model.discard_edits()
+        super().reject()
+
     def _make_path_edit(self, initial, title):
         container = QtWidgets.QWidget()
         hl = QtWidgets.QHBoxLayout(container)
@@ -1315,6 +4831,13 @@ class SettingsDialog(QtWidgets.QDialog):
         self.core.token_chance = self.token_chance.value()
         self.core.cooldown = self.cooldown.value()
         self.core.funk_every_n_borps = int(self.funk_every_spin.value())
+        self.core.configure_metrics_server(self.metrics_port.value())
+        if self.core.running:
+            self.core.configure_input_server(self.input_port.value())
+        else:
+            self.core.input_port = self.input_port.value()
+        self.core.configure_pcm_cache(self.pcm_cache_spin.value())
+        self.core.configure_mix(self.station_volume.value(), self.station_pan.value())
 
         self.core.shared_folder = self.shared_folder.findChild(QtWidgets.QLineEdit).text()
         self.core.funk_folder = self.funk_folder.findChild(QtWidgets.QLineEdit).text() if hasattr(self,'funk_folder') else self.core.funk_folder
@@ -1324,50 +4847,49 @@ class SettingsDialog(QtWidgets.QDialog):
         self.core.token_folder = self.token_folder.findChild(QtWidgets.QLineEdit).text() if hasattr(self,'token_folder') else self.core.token_folder
 
         # borp stage folder entries: accept absolute path or store basename
-        normal_text = self.normal_folder.findChild(QtWidgets.QLineEdit).text()
-        super_text = self.super_folder.findChild(QtWidgets.QLineEdit).text()
-        miracle_text = self.miracle_folder.findChild(QtWidgets.QLineEdit).text()
-        self.core.borp_stages['normal']['folder'] = normal_text if os.path.isabs(normal_text) else os.path.basename(normal_text)
-        self.core.borp_stages['super']['folder'] = super_text if os.path.isabs(super_text) else os.path.basename(super_text)
-        self.core.borp_stages['miracle']['folder'] = miracle_text if os.path.isabs(miracle_text) else os.path.basename(miracle_text)
+        for name, edit in self.stage_folders.items():
+            if name in self.core.borp_stages:
+                text = edit.findChild(QtWidgets.QLineEdit).text()
+                self.core.borp_stages[name]['folder'] = text if os.path.isabs(text) else os.path.basename(text)
+
+        self.core.configure_key_bindings(self.key_bindings(),
+                                         {action: spin.value() for action, spin in self.debounce_spins.items()},
+                                         {action: check.isChecked() for action, check in self.repeat_checks.items()})
 
         # stage achievement sounds path
         self.core.stage_sounds_folder = self.stage_sounds.findChild(QtWidgets.QLineEdit).text()
 
-        # reload file lists using core methods (no duplicate code)
-        self.core.reload_borp_stage_files()
-        self.core.reload_hyper_funk_files()
-        self.core.reload_hyperborb_files()
-        self.core.reload_token_sounds()
+        # rescan changed folders in the background; presses keep using the old lists meanwhile
+        self.core.reload_libraries_async()
 
-        # persist per-sound settings
-        updated = {}
-        for f, (chance_widget, volume_widget) in self._sound_rows.items():
-            updated[f] = {'chance': float(chance_widget.value()), 'volume': float(volume_widget.value())}
-        self.core.sound_settings = updated
+        # persist per-sound settings: only edited rows whose values differ from the stored entry
+        self.core.update_sound_settings(self.sound_model.pending_changes())
+        self.sound_model.discard_edits()
 
         try:
             self.core.save_settings()
             self.core.status_message.emit("Settings saved & reloaded.")
             self.core.dump_debug_info()
         except Exception as e:
-            self.core.status_message.emit(f"Error saving settings: {e}")
-            print(traceback.format_exc())
+            log.error("Error saving settings: %s", e, exc_info=True)
         self.accept()
 
 # -----------------------------
 # GUI
 # -----------------------------
 class YujiFunkGUI(QtWidgets.QMainWindow):
+    _wake = QtCore.pyqtSignal()  # new core state or log lines; queued to the GUI thread
+
     def __init__(self, core: YujiFunkCore):
         super().__init__()
         self.core = core
-        self.setWindowTitle("Yuji Funk")
+        self.setWindowTitle("Yuji Funk" + (f" - Station {core.station + 1}" if core.station else ""))
         self.resize(880, 480)
         self.setWindowFlags(self.windowFlags() | QtCore.Qt.WindowStaysOnTopHint)
 
-        # vignette overlay
-        self.vignette = VignetteOverlay()
+        # vignette overlays (one per screen, shared animation state)
+        self.vignette = VignetteController(self)
+        self.vignette.envelope_source = self.core.sample_envelope
 
         # central layout
         w = QtWidgets.QWidget()
@@ -1408,7 +4930,7 @@ class YujiFunkGUI(QtWidgets.QMainWindow):
             btn = QtWidgets.QPushButton(t)
             btn.setFixedHeight(64)
             btn.setFont(btn_font)
-            btn.clicked.connect(lambda checked, k=t.lower(): self._button_pressed(k))
+            btn.clicked.connect(lambda checked: self._trigger_action('borp'))
             left_buttons.addWidget(btn)
         left_buttons.addStretch()
 
@@ -1436,6 +4958,13 @@ class YujiFunkGUI(QtWidgets.QMainWindow):
         self.msg_box.setFixedHeight(80)
         right.addWidget(self.msg_box)
 
+        # background library reload progress (hidden while idle)
+        self.reload_bar = QtWidgets.QProgressBar()
+        self.reload_bar.setFixedHeight(18)
+        self.reload_bar.setTextVisible(True)
+        self.reload_bar.hide()
+        right.addWidget(self.reload_bar)
+
         right.addStretch()
         btn_row = QtWidgets.QHBoxLayout()
         self.settings_btn = QtWidgets.QPushButton("Settings")
@@ -1449,24 +4978,53 @@ class YujiFunkGUI(QtWidgets.QMainWindow):
         right.addLayout(btn_row)
         self._apply_styles()
 
-        # settings dialog
-        self.settings_dialog = SettingsDialog(self.core, self)
-
-        # connect core signals
-        self.core.token_count_changed.connect(self.on_token_count_changed)
-        self.core.token_active_changed.connect(self.on_token_active_changed)
-        self.core.hyper_active_changed.connect(self.on_hyper_active_changed)
-        self.core.last_sound_changed.connect(self.on_last_sound_changed)
-        self.core.status_message.connect(self.on_status_message)
-        self.core.score_changed.connect(self.on_score_changed)
-        self.core.high_score_changed.connect(self.on_high_score_changed)
-        self.core.multiplier_changed.connect(self.on_multiplier_changed)
-
-        # keyboard hook
+        # settings dialog: built on first open (see show_settings)
+        self.settings_dialog = None
+        self._first_paint_logged = False
+
+        # pull core state once per frame instead of reacting to every queued signal;
+        # only fields that changed since the last frame touch their label
+        self._state_handlers = {
+            'token_count': self.on_token_count_changed,
+            'token_active': self.on_token_active_changed,
+            'hyper_active': self.on_hyper_active_changed,
+            'last_sound': self.on_last_sound_changed,
+            'reload': self.on_reload_progress,
+            'score': self.on_score_changed,
+            'high_score': self.on_high_score_changed,
+            'multiplier': self.on_multiplier_changed,
+        }
+        # the frame timer only runs while something changes: writers wake it with one
+        # queued call, and it stops after a frame with nothing new
+        self._state_version = 0
+        self._log_seq = -1
+        self.frame_timer = QtCore.QTimer(self)
+        self.frame_timer.setTimerType(QtCore.Qt.PreciseTimer)
+        self.frame_timer.setInterval(16)
+        self.frame_timer.timeout.connect(self._on_frame)
+        self._last_frame_tick = None
+        self._wake_pending = False
+        self._wake.connect(self._start_frames, QtCore.Qt.QueuedConnection)
+        self.core.state.listeners.append(self._request_frames)
+        LOG_RING.listeners.append(self._request_frames)
+        self._start_frames()
+
+        # frame instrumentation: F3 toggles the HUD, Ctrl+Shift+E exports a summary
+        self.frame_hud = FrameStatsHud(self)
+        self.frame_hud.move(8, 8)
+        QtWidgets.QShortcut(QtGui.QKeySequence("F3"), self, activated=self.frame_hud.toggle)
+        QtWidgets.QShortcut(QtGui.QKeySequence("Ctrl+Shift+E"), self, activated=self.export_frame_stats)
+        # press-to-audio latency report (also summarised in the debug dump)
+        QtWidgets.QShortcut(QtGui.QKeySequence("Ctrl+Shift+L"), self, activated=self.export_latency_report)
+
+        # keyboard hook: sees every key on the system, so unbound keys and held-key
+        # repeats of actions that don't repeat are dropped right here before any core work
+        self._held_keys = set()
+        self._keyboard_hook = None
         try:
-            keyboard.on_press(lambda e: self._keyboard_callback(e))
+            self._keyboard_hook = keyboard.hook(self._keyboard_callback)
         except Exception as e:
-            self.msg_box.setText(f"Keyboard hook error (try running as admin): {e}")
+            log.error("Keyboard hook error (try running as admin): %s", e)
 
     def _make_status_label(self, text):
         lbl = QtWidgets.QLabel(text)
@@ -1481,6 +5039,8 @@ class YujiFunkGUI(QtWidgets.QMainWindow):
         QPushButton { background-color: #071526; border:2px solid #0ea5ff; border-radius:8px; padding:8px; }
         QPushButton:hover { border:3px solid #2ebaff; margin:-1px; }
         QLabel { color: #cfeeff; }
+        QProgressBar { background-color:#071526; border:1px solid #0ea5ff; border-radius:4px; text-align:center; }
+        QProgressBar::chunk { background-color:#0ea5ff; }
         #QUIT { background-color:#2b0207; border:2px solid #ff4d6d; color:#ffdfe3; }
         """
         self.setStyleSheet(style)
@@ -1489,20 +5049,89 @@ class YujiFunkGUI(QtWidgets.QMainWindow):
         pal.setColor(QtGui.QPalette.Window, QtGui.QColor("#06080a"))
         self.setPalette(pal)
 
-    def _button_pressed(self, key_name):
-        self.core.on_key_event_name(key_name)
-        if key_name.lower() in ['r','1','2','3','4']:
+    def _trigger_action(self, action, t_input=None):
+        if self.core.perform_action(action, t_input) and action == 'borp':
             self.vignette.trigger_zoom()
 
     def _keyboard_callback(self, event):
+        t_input = time.perf_counter()
         try:
-            k = event.name
-            self.core.on_key_event_name(k)
-            if k.lower() in ['r','1','2','3','4']:
-                self.vignette.trigger_zoom()
+            key = event.name.lower() if event.name else None
+            action = self.core.key_actions.get(key)
+            if action is None:
+                return
+            if event.event_type == keyboard.KEY_UP:
+                self._held_keys.discard(key)
+                return
+            if key in self._held_keys:
+                if not self.core.action_repeat.get(action, False):
+                    return  # auto-repeat while held
+            else:
+                self._held_keys.add(key)
+            self._trigger_action(action, t_input)
         except Exception:
             pass
 
+    def _request_frames(self):
+        # any thread; at most one wake-up is queued at a time
+        if not self._wake_pending:
+            self._wake_pending = True
+            self._wake.emit()
+
+    def _start_frames(self):
+        self._wake_pending = False
+        if not self.frame_timer.isActive():
+            self.frame_timer.start()
+
+    def _on_frame(self):
+        t0 = time.perf_counter()
+        if self._last_frame_tick is not None:
+            FRAME_STATS.record('gui.jitter', abs((t0 - self._last_frame_tick) * 1000.0 - self.frame_timer.interval()))
+        self._last_frame_tick = t0
+        changed = self._pull_state()
+        changed = self._pull_log() or changed
+        if not changed:
+            # idle until the next wake-up; a change racing this stop has already queued one
+            self.frame_timer.stop()
+            self._last_frame_tick = None
+            return
+        FRAME_STATS.record('gui.labels', (time.perf_counter() - t0) * 1000.0)
+
+    def paintEvent(self, event):
+        t0 = time.perf_counter()
+        super().paintEvent(event)
+        FRAME_STATS.record('gui.paint', (time.perf_counter() - t0) * 1000.0)
+        if not self._first_paint_logged:
+            self._first_paint_logged = True
+            log.info("Main window first paint %.0f ms after start", (time.perf_counter() - _PROCESS_START) * 1000.0)
+
+    def export_latency_report(self):
+        base = os.path.join(os.path.dirname(self.core.settings_file), time.strftime("latency-%Y%m%d-%H%M%S"))
+        try:
+            json_path, csv_path = self.core.latency.export(base)
+            log.info("Latency report exported: %s, %s", os.path.basename(json_path), os.path.basename(csv_path))
+        except Exception as e:
+            log.error("Latency report export failed: %s", e, exc_info=True)
+
+    def export_frame_stats(self):
+        base = os.path.join(os.path.dirname(self.core.settings_file), time.strftime("frame_stats-%Y%m%d-%H%M%S"))
+        try:
+            json_path, csv_path = FRAME_STATS.export(base)
+            log.info("Frame stats exported: %s, %s", os.path.basename(json_path), os.path.basename(csv_path))
+        except Exception as e:
+            log.error("Frame stats export failed: %s", e, exc_info=True)
+
+    def _pull_state(self):
+        version, changed = self.core.state.changes_since(self._state_version)
+        if not changed:
+            return False
+        self._state_version = version
+        for key, value in changed.items():
+            handler = self._state_handlers.get(key)
+            if handler is not None:
+                handler(value)
+        return True
+
     def on_token_count_changed(self, n):
         self.lbl_token_count.setText(f"Tokens: {n}")
 
@@ -1519,13 +5148,24 @@ class YujiFunkGUI(QtWidgets.QMainWindow):
     def on_last_sound_changed(self, name):
         self.lbl_last_sound.setText(f"Last Sound: {name}")
 
-    def on_status_message(self, msg):
-        # show in GUI and print to console for diagnostics
-        try:
-            self.msg_box.setText(msg)
-        except Exception:
-            pass
-        print("[STATUS]", msg)
+    def on_reload_progress(self, progress):
+        if progress is None:
+            self.reload_bar.hide()
+            return
+        done, total, label = progress
+        # total 0 = still listing folders: busy indicator
+        self.reload_bar.setRange(0, total)
+        self.reload_bar.setValue(done)
+        self.reload_bar.setFormat(f"Loading {label.replace('stage:', '')}... %p%" if total else f"Scanning {label.replace('stage:', '')}...")
+        self.reload_bar.show()
+
+    def _pull_log(self):
+        # message box mirrors the newest INFO+ lines of the log ring buffer
+        if LOG_RING.seq == self._log_seq:
+            return False
+        self._log_seq = LOG_RING.seq
+        self.msg_box.setText("\n".join(LOG_RING.tail(3, self.core.station)))
+        return True
 
     def on_score_changed(self, score):
         self.score_label.setText(str(int(score)))
@@ -1537,9 +5177,27 @@ class YujiFunkGUI(QtWidgets.QMainWindow):
         self.multiplier_label.setText(f"x{m:.1f}")
 
     def show_settings(self):
+        t0 = time.perf_counter()
+        if self.settings_dialog is None or not self.settings_dialog.refresh_from_core():
+            if self.settings_dialog is not None:
+                self.settings_dialog.deleteLater()
+            self.settings_dialog = SettingsDialog(self.core, self)
+            log.debug("Settings dialog built in %.1f ms", (time.perf_counter() - t0) * 1000.0)
+        else:
+            log.debug("Settings dialog refreshed in %.1f ms", (time.perf_counter() - t0) * 1000.0)
         self.settings_dialog.exec_()
 
     def close_app(self):
+        for listeners in (self.core.state.listeners, LOG_RING.listeners):
+            if self._request_frames in listeners:
+                listeners.remove(self._request_frames)
+        self.frame_timer.stop()
+        # other stations' windows keep their hooks; the last core.stop() unhooks everything
+        try:
+            if self._keyboard_hook is not None:
+                keyboard.unhook(self._keyboard_hook)
+        except Exception:
+            pass
         self.core.stop()
         self.vignette.close()
         self.close()
@@ -1547,16 +5205,61 @@ class YujiFunkGUI(QtWidgets.QMainWindow):
 # -----------------------------
 # App entrypoint
 # -----------------------------
+def start_stations(count):
+    """Create `count` stations sharing one audio backend and asset store; returns their cores.
+
+    Station 1 uses yuji_funk_settings.json, station k yuji_funk_settings-k.json (own
+    scores, stats, key bindings and output mix). Stations without a settings file
+    start with no key bindings, since the default keys belong to station 1. With
+    several stations the memory each one adds is logged (tracemalloc: Python
+    allocations only, so the shared PCM map and SDL's buffers are not included).
+    """
+    default = os.path.join(os.path.dirname(os.path.realpath(__file__)), "yuji_funk_settings.json")
+    trace = count > 1 and not tracemalloc.is_tracing()
+    if trace:
+        tracemalloc.start()
+    cores = []
+    try:
+        for k in range(count):
+            before = tracemalloc.get_traced_memory()[0] if trace else 0
+            settings_file = default if k == 0 else default.replace("_settings.json", f"_settings-{k + 1}.json")
+            cores.append(YujiFunkCore(settings_file=settings_file, station=k,
+                                      assets=cores[0].assets if cores else None))
+            if trace:
+                log.info("Station %d ready: +%.1f MB", k + 1, (tracemalloc.get_traced_memory()[0] - before) / 1e6)
+    finally:
+        if trace:
+            tracemalloc.stop()
+    if count > 1:
+        log.info("Shared decoded PCM: %.1f MB for %d stations", cores[0].pcm.used / 1e6, count)
+    return cores
+
+
 def main():
     app = QtWidgets.QApplication(sys.argv)
-    core = YujiFunkCore()
-    # connect console logging for quick debugging
-    core.status_message.connect(lambda m: print("[CORE STATUS]", m))
-    core.last_sound_changed.connect(lambda s: print("[SOUND]", s))
-    gui = YujiFunkGUI(core)
-    gui.show()
-    core.start()
-    sys.exit(app.exec_())
+    log_listener = setup_logging(os.path.join(os.path.dirname(os.path.realpath(__file__)), "yuji_funk.log"),
+                                 level=os.environ.get("YUJI_LOG_LEVEL", "INFO"),
+                                 console=bool(os.environ.get("YUJI_LOG_CONSOLE")))
+    stations = 1
+    if "--stations" in sys.argv[1:]:
+        try:
+            stations = max(1, int(sys.argv[sys.argv.index("--stations") + 1]))
+        except (IndexError, ValueError):
+            log.warning("--stations expects a number; starting one station")
+    cores = start_stations(1 if "--build-pack" in sys.argv[1:] else stations)
+    if "--build-pack" in sys.argv[1:]:
+        # authoring helper: bring the sound pack up to date with the folders and exit
+        cores[0].rebuild_sound_pack()
+        cores[0].stop()
+        log_listener.stop()
+        return
+    guis = [YujiFunkGUI(core) for core in cores]
+    for gui, core in zip(guis, cores):
+        gui.show()
+        core.start()
+    rc = app.exec_()
+    log_listener.stop()
+    sys.exit(rc)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,575 @@
+# bench_yuji_funk.py
+# Benchmarks for the Yuji Funk hot paths, run against generated fixture libraries.
+#
+#   python bench_yuji_funk.py run [--files 200] [--repeat 30] [--audio pygame] [--out bench.json]
+#   python bench_yuji_funk.py compare baseline.json bench.json [--threshold 0.15]
+#   python bench_yuji_funk.py loadgen [--port 7777] [--proto binary] [--batch 16] [--seconds 5]
+#
+# Audio goes to SDL's dummy driver (or the null/callback backend with --audio) and
+# Qt renders offscreen, so no sound card or display is needed. compare exits with status 1 when a benchmark regressed.
+import os
+import sys
+import json
+import math
+import time
+import wave
+import array
+import random
+import shutil
+import gc
+import socket
+import struct
+import tracemalloc
+import collections
+import argparse
+import platform
+import tempfile
+import subprocess
+import statistics
+import importlib.util
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+APP_FILE = os.path.join(os.path.dirname(os.path.realpath(__file__)), "# yuji_funk_gui.py")
+
+
+def load_app():
+    """Import the app module from its file (the name is not importable as-is)."""
+    spec = importlib.util.spec_from_file_location("yuji_funk_gui", APP_FILE)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+# -----------------------------
+# Fixture libraries
+# -----------------------------
+def write_wav(path, seconds, freq_hz, sample_rate=22050, channels=2, seed=0):
+    """16-bit PCM sine with a little noise so files differ."""
+    rng = random.Random(seed)
+    n = int(seconds * sample_rate)
+    samples = array.array('h')
+    step = 2.0 * math.pi * freq_hz / sample_rate
+    for i in range(n):
+        v = int(12000 * math.sin(step * i) + rng.randint(-800, 800))
+        samples.extend([v] * channels)
+    if sys.byteorder == 'big':
+        samples.byteswap()
+    with wave.open(path, 'wb') as w:
+        w.setnchannels(channels)
+        w.setsampwidth(2)
+        w.setframerate(sample_rate)
+        w.writeframes(samples.tobytes())
+
+
+def build_fixtures(root, files, seconds=0.25, ogg_fraction=0.25, sound_entries=None):
+    """Create a full sound library under root and a settings file pointing at it.
+
+    Each library gets `files` files; a share of them is OGG when oggenc is on PATH.
+    Returns (settings_path, summary dict).
+    """
+    oggenc = shutil.which("oggenc")
+    templates = []
+    for i, freq in enumerate((220, 330, 440, 550)):
+        path = os.path.join(root, f"_template{i}.wav")
+        write_wav(path, seconds, freq, seed=i)
+        templates.append(path)
+    ogg_templates = []
+    if oggenc:
+        for path in templates:
+            out = path[:-4] + ".ogg"
+            subprocess.run([oggenc, "-Q", "-o", out, path], check=True)
+            ogg_templates.append(out)
+
+    def fill(folder, count, prefix):
+        os.makedirs(folder, exist_ok=True)
+        made = []
+        n_ogg = int(count * ogg_fraction) if ogg_templates else 0
+        for i in range(count):
+            use_ogg = i < n_ogg
+            src = (ogg_templates if use_ogg else templates)[i % len(templates)]
+            dst = os.path.join(folder, f"{prefix}{i:04d}{'.ogg' if use_ogg else '.wav'}")
+            shutil.copyfile(src, dst)
+            made.append(dst)
+        return made
+
+    lib = os.path.join(root, "lib")
+    shared = os.path.join(lib, "shared")
+    made = {}
+    for stage in ("Normal", "Super", "Miracle"):
+        made[stage] = fill(os.path.join(shared, stage), files, stage.lower())
+    made['funk'] = fill(os.path.join(lib, "funk"), files, "funk")
+    made['special'] = fill(os.path.join(lib, "special"), max(1, files // 10), "special")
+    made['hyper'] = fill(os.path.join(lib, "hyper"), max(1, files // 4), "hyper")
+    made['hyperborb'] = fill(os.path.join(lib, "hyper", "HyperBorps"), files, "hb")
+    stage_sounds = os.path.join(lib, "stage_sounds")
+    os.makedirs(stage_sounds, exist_ok=True)
+    for name in ("normal.wav", "super_unlocked.wav", "miracle_unlocked.wav", "decoy_a.wav", "decoy_b.wav"):
+        shutil.copyfile(templates[0], os.path.join(stage_sounds, name))
+    token = os.path.join(lib, "token")
+    os.makedirs(token, exist_ok=True)
+    for name in ("TokenAppeared.wav", "CollectedOneToken.wav", "CollectedTwoTokens.wav",
+                 "CollectedThreeTokens.wav", "Winner.wav", "Loser.wav"):
+        shutil.copyfile(templates[1], os.path.join(token, name))
+
+    # per-sound entries: every generated file plus padding up to sound_entries
+    rng = random.Random(1)
+    sound_settings = {}
+    for paths in made.values():
+        for p in paths:
+            sound_settings[p] = {'chance': round(rng.random(), 2), 'volume': round(rng.random(), 2)}
+    for i in range(max(0, (sound_entries or 0) - len(sound_settings))):
+        sound_settings[os.path.join(lib, "missing", f"pad{i:06d}.wav")] = {'chance': 1.0, 'volume': 1.0}
+
+    settings = {
+        'high_score': 0, 'total_score': 0, 'games_played': 0,
+        'token_chance': 0.0, 'cooldown': 0, 'funk_every_n_borps': 2,
+        'sound_settings': sound_settings,
+        'paths': {'shared': shared, 'funk': os.path.join(lib, "funk"), 'special': os.path.join(lib, "special"),
+                  'hyper': os.path.join(lib, "hyper"), 'hyperborb': os.path.join(lib, "hyper", "HyperBorps"),
+                  'token': token, 'stage_sounds': stage_sounds},
+    }
+    settings_path = os.path.join(root, "bench_settings.json")
+    with open(settings_path, 'w', encoding='utf-8') as f:
+        json.dump(settings, f)
+    summary = {'files_per_library': files, 'seconds': seconds, 'ogg': bool(ogg_templates),
+               'sound_entries': len(sound_settings)}
+    return settings_path, summary
+
+# -----------------------------
+# Timing
+# -----------------------------
+class Bench:
+    """Collects per-iteration timings (ms) for named cases."""
+    def __init__(self, repeat, warmup=2, only=None):
+        self.repeat = repeat
+        self.warmup = warmup
+        self.only = only
+        self.results = {}
+
+    def wanted(self, name):
+        return not self.only or any(name.startswith(prefix) for prefix in self.only)
+
+    def time(self, name, fn, setup=None, repeat=None):
+        if not self.wanted(name):
+            return
+        times = []
+        for i in range(self.warmup + (repeat or self.repeat)):
+            if setup is not None:
+                setup()
+            t0 = time.perf_counter()
+            fn()
+            elapsed = (time.perf_counter() - t0) * 1000.0
+            if i >= self.warmup:
+                times.append(elapsed)
+        self.record(name, times)
+
+    def record(self, name, times, **extra):
+        times = sorted(times)
+        self.results[name] = dict({
+            'n': len(times),
+            'min_ms': times[0],
+            'median_ms': statistics.median(times),
+            'mean_ms': statistics.fmean(times),
+            'p95_ms': times[min(len(times) - 1, int(0.95 * len(times)))],
+        }, **extra)
+        print(f"  {name:<36}{self.results[name]['median_ms']:10.3f} ms median  ({len(times)} runs)")
+
+# -----------------------------
+# Cases
+# -----------------------------
+def bench_core(app, bench, settings_path):
+    class BenchCore(app.YujiFunkCore):
+        # envelope analysis runs on its own thread after each library load; keep it out of the timings
+        def _analyze_envelopes_async(self):
+            pass
+
+        # the sound pack is built explicitly by the pack.* cases
+        def _rebuild_pack_async(self):
+            pass
+    core = BenchCore(settings_file=settings_path)
+    # folder-based loading first; the pack (if enabled) is timed separately below
+    pack, core.sound_pack = core.sound_pack, None
+
+    # library scan
+    bench.time("scan.reload_borp_stage_files", core.reload_borp_stage_files)
+    bench.time("scan.reload_hyper_funk_files", core.reload_hyper_funk_files)
+    bench.time("scan.reload_hyperborb_files", core.reload_hyperborb_files)
+    names = list(core._library_sources())
+    bench.time("scan.reload_all", lambda: core._reload_now(names))
+    if "scan.reload_all" in bench.results:
+        files, dirs = core.last_walk
+        bench.results["scan.reload_all"].update(files_visited=files, dirs_opened=dirs)
+        print(f"  {'':<36}{files} files visited, {dirs} folders opened per reload")
+    funk = list(core.funk_files)
+    bench.time("scan.filter_loadable", lambda: core._filter_loadable(funk))
+
+    # selection helpers
+    bench.time("select.weighted_random", lambda: [core._select_weighted_random(funk) for _ in range(100)])
+    bench.time("select.find_stage_sound", lambda: core._find_stage_sound('miracle'))
+
+    # press handling through _play_file (dummy audio driver)
+    def reset_press_state():
+        core.hyper_active = False
+        core.token_active = False
+        core.priority_active = False
+        core.delayed_input = False
+        core.key_input_allowed = True
+        core._action_last.clear()
+    bench.time("press.borp", lambda: core.on_key_event_name('r'), setup=reset_press_state, repeat=bench.repeat * 5)
+
+    def enter_hyper():
+        reset_press_state()
+        core.hyper_active = True
+        core.hyperborb_index = 0
+    bench.time("press.hyperborb", lambda: core.on_key_event_name('r'), setup=enter_hyper, repeat=bench.repeat * 5)
+    core.hyper_active = False
+
+    # settings persistence
+    bench.time("settings.load", core.load_settings)
+
+    def touch_settings():
+        core.high_score += 1
+    bench.time("settings.save", lambda: core.save_settings(immediate=True), setup=touch_settings)
+    some_file = funk[0] if funk else None
+    if some_file:
+        def edit_one():
+            core.update_sound_settings({some_file: {'chance': random.random(), 'volume': 1.0}})
+        bench.time("settings.save_one_sound_entry", lambda: core.save_settings(immediate=True), setup=edit_one)
+
+    # sound pack: full build from the folders, then reloads and presses served from the mapping
+    if pack is not None:
+        core.sound_pack = pack
+
+        def drop_pack():
+            pack.close()
+            if os.path.exists(pack.path):
+                os.remove(pack.path)
+        bench.time("pack.build", core.rebuild_sound_pack, setup=drop_pack, repeat=max(3, bench.repeat // 5))
+        bench.time("pack.reload_borp_stage_files", core.reload_borp_stage_files)
+        bench.time("pack.reload_hyperborb_files", core.reload_hyperborb_files)
+        bench.time("pack.press.borp", lambda: core.on_key_event_name('r'), setup=reset_press_state,
+                   repeat=bench.repeat * 5)
+
+    core.running = False
+    try:
+        core.stats.close()
+    except Exception:
+        pass
+    return core
+
+
+def _rss_kb():
+    # current resident set size (Linux only; None elsewhere)
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def bench_pcm(app, bench, core):
+    """Sound construction from files vs from the decoded PCM store: time, traced peak and RSS growth.
+
+    pygame's own decode buffers are allocated by SDL and invisible to tracemalloc,
+    so rss_growth_kb is the comparable memory figure; traced_peak_kb shows the
+    Python-side copies. Skipped with a backend that does not decode (null).
+    """
+    audio = core.audio
+    if not audio.decodes:
+        return
+    files = list(core.funk_files) + list(core.special_files) + list(core.hyperborb_files)
+    for stage in core.borp_stages.values():
+        files += stage['files']
+    store = app.PcmStore(1 << 30, audio)
+    for f in files:
+        store.add(f, audio.load(f))
+    loaders = {"load.sound_from_path": audio.load, "load.sound_from_pcm": store.sound}
+    for name, load in loaders.items():
+        if not bench.wanted(name):
+            continue
+        bench.time(name, lambda: [load(f) for f in files])
+        gc.collect()
+        rss0 = _rss_kb()
+        tracemalloc.start()
+        sounds = [load(f) for f in files]
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        rss1 = _rss_kb()
+        del sounds
+        rss = None if rss0 is None else rss1 - rss0
+        bench.results[name].update(files=len(files), traced_peak_kb=peak // 1024, rss_growth_kb=rss)
+        print(f"  {'':<36}{len(files)} sounds: traced peak {peak // 1024} KB, RSS growth {rss} KB")
+    store.clear()
+
+
+def bench_stations(app, bench, settings_path, count=4):
+    """Memory and start-up time added by each extra station sharing the first one's assets."""
+    name = "stations.add"
+    if not bench.wanted(name):
+        return
+
+    class StationCore(app.YujiFunkCore):
+        def _analyze_envelopes_async(self):
+            pass
+
+        def _rebuild_pack_async(self):
+            pass
+    first = StationCore(settings_file=settings_path)
+    first.rebuild_sound_pack()  # later stations load their libraries from the pack
+    times, traced, rss = [], [], []
+    stations = [first]
+    for k in range(1, count):
+        path = os.path.join(os.path.dirname(settings_path), f"station-{k + 1}_settings.json")
+        shutil.copyfile(settings_path, path)
+        gc.collect()
+        rss0 = _rss_kb()
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        stations.append(StationCore(settings_file=path, station=k, assets=first.assets))
+        times.append((time.perf_counter() - t0) * 1000.0)
+        traced.append(tracemalloc.get_traced_memory()[0] // 1024)
+        tracemalloc.stop()
+        rss1 = _rss_kb()
+        rss.append(None if rss0 is None else rss1 - rss0)
+    bench.record(name, times, traced_kb=traced, rss_growth_kb=rss)
+    print(f"  {'':<36}per extra station: traced {traced} KB, RSS growth {rss} KB")
+    for core in reversed(stations):
+        core.running = False
+        core.stats.close()
+
+
+def bench_vignette(app, bench):
+    from PyQt5 import QtWidgets
+    qapp = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    controller = app.VignetteController()
+    overlay = next(iter(controller.overlays.values()))
+    overlay.show()
+    controller.active = True
+    qapp.processEvents()
+    size = f"{overlay.width()}x{overlay.height()}"
+
+    def advance():
+        # move zoom and colour like a running effect so cache lookups vary
+        controller.zoom_scale = 1.0 + 0.15 * random.random()
+        controller._update_color(time.time())
+    for name, cached in (("paint.vignette_cached", True), ("paint.vignette_direct", False)):
+        controller.use_sprite_cache = cached
+        bench.time(name, overlay.repaint, setup=advance, repeat=bench.repeat * 3)
+        bench.results.get(name, {})['size'] = size
+    controller.close()
+
+# -----------------------------
+# Commands
+# -----------------------------
+def cmd_run(args):
+    os.environ["YUJI_AUDIO_BACKEND"] = args.audio
+    root = args.fixtures or tempfile.mkdtemp(prefix="yuji_bench_")
+    os.makedirs(root, exist_ok=True)
+    print(f"Fixtures in {root}")
+    settings_path, fixtures = build_fixtures(root, args.files, seconds=args.seconds,
+                                             sound_entries=args.sound_entries)
+    app = load_app()
+    from PyQt5 import QtWidgets
+    QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    bench = Bench(args.repeat, only=args.only)
+    try:
+        core = bench_core(app, bench, settings_path)
+        bench_pcm(app, bench, core)
+        bench_stations(app, bench, settings_path)
+        bench_vignette(app, bench)
+    finally:
+        if not args.fixtures:
+            shutil.rmtree(root, ignore_errors=True)
+    out = {
+        'meta': {'created': time.strftime("%Y-%m-%dT%H:%M:%S"), 'python': platform.python_version(),
+                 'platform': platform.platform(), 'repeat': args.repeat, 'fixtures': fixtures,
+                 'audio': args.audio},
+        'results': bench.results,
+    }
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(out, f, indent=2)
+    print(f"Results written to {args.out}")
+    return 0
+
+
+def compare(baseline, current, threshold=0.15, min_delta_ms=0.05):
+    """Rows (name, base ms, current ms, ratio, status) comparing median times."""
+    rows = []
+    base_results = baseline.get('results', {})
+    for name, cur in sorted(current.get('results', {}).items()):
+        base = base_results.get(name)
+        if base is None:
+            rows.append((name, None, cur['median_ms'], None, 'new'))
+            continue
+        b, c = base['median_ms'], cur['median_ms']
+        ratio = c / b if b > 0 else float('inf')
+        status = 'ok'
+        if ratio > 1.0 + threshold and c - b > min_delta_ms:
+            status = 'REGRESSION'
+        elif ratio < 1.0 - threshold and b - c > min_delta_ms:
+            status = 'faster'
+        rows.append((name, b, c, ratio, status))
+    for name in sorted(set(base_results) - set(current.get('results', {}))):
+        rows.append((name, base_results[name]['median_ms'], None, None, 'missing'))
+    return rows
+
+
+def cmd_compare(args):
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    with open(args.current, encoding='utf-8') as f:
+        current = json.load(f)
+    rows = compare(baseline, current, args.threshold, args.min_delta)
+    def cell(value, width, digits):
+        return f"{value:{width}.{digits}f}" if value is not None else "-".rjust(width)
+    print(f"{'benchmark':<36}{'base ms':>10}{'now ms':>10}{'ratio':>8}  status")
+    for name, b, c, ratio, status in rows:
+        print(f"{name:<36}{cell(b, 10, 3)}{cell(c, 10, 3)}{cell(ratio, 8, 2)}  {status}")
+    regressions = [r for r in rows if r[4] == 'REGRESSION']
+    if regressions:
+        print(f"{len(regressions)} regression(s) over {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+# -----------------------------
+# Input server load generator
+# -----------------------------
+def _pct(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] if values else 0.0
+
+
+def loadgen(port, proto="binary", batch=16, window=4, seconds=5.0, key="r", host="127.0.0.1"):
+    """Send key batches to an input server, keeping `window` batches in flight; returns a summary dict."""
+    sock = socket.create_connection((host, port))
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    reader = sock.makefile('rb')
+    if proto == "binary":
+        encoded = key.encode('utf-8')
+        payload = struct.pack("<BH", 0xB5, batch) + (bytes([len(encoded)]) + encoded) * batch
+        ack = struct.Struct("<BHI")
+
+        def read_ack():
+            _, accepted, server_us = ack.unpack(reader.read(ack.size))
+            return batch, accepted, server_us
+    else:
+        payload = (key + "\n").encode('utf-8') * batch
+
+        def read_ack():
+            # one ack per server read, which may cover part of a batch or several
+            _, received, accepted, server_us = reader.readline().split()
+            return int(received), int(accepted), int(server_us)
+
+    sent = collections.deque()  # [send time, events not yet acked] per batch
+    rtts, server_times = [], []
+    events = accepted = 0
+    t_start = time.perf_counter()
+    deadline = t_start + seconds
+    while True:
+        now = time.perf_counter()
+        while now < deadline and len(sent) < window:
+            sock.sendall(payload)
+            sent.append([now, batch])
+            now = time.perf_counter()
+        if not sent:
+            break
+        received, n, server_us = read_ack()
+        server_times.append(server_us / 1000.0)
+        events += received
+        accepted += n
+        t_ack = time.perf_counter()
+        while received > 0:
+            taken = min(received, sent[0][1])
+            sent[0][1] -= taken
+            received -= taken
+            if sent[0][1] == 0:
+                rtts.append((t_ack - sent.popleft()[0]) * 1000.0)
+    elapsed = time.perf_counter() - t_start
+    sock.close()
+    return {
+        'proto': proto, 'batch': batch, 'window': window, 'events': events, 'accepted': accepted,
+        'events_per_s': events / elapsed, 'batch_rtt_p50_ms': _pct(rtts, 0.5), 'batch_rtt_p99_ms': _pct(rtts, 0.99),
+        'server_p50_ms': _pct(server_times, 0.5), 'server_p99_ms': _pct(server_times, 0.99),
+    }
+
+
+def cmd_loadgen(args):
+    core = root = None
+    port = args.port
+    if not port:
+        # no running app given: serve from an in-process core on generated fixtures
+        # (client and server then share one interpreter, so expect lower numbers)
+        os.environ["YUJI_AUDIO_BACKEND"] = args.audio
+        root = tempfile.mkdtemp(prefix="yuji_loadgen_")
+        settings_path, _ = build_fixtures(root, args.files)
+        app = load_app()
+        from PyQt5 import QtWidgets
+        QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+        class LoadCore(app.YujiFunkCore):
+            def _analyze_envelopes_async(self):
+                pass
+        core = LoadCore(settings_file=settings_path)
+        core.action_debounce['borp'] = 0.0
+        server = app.InputServer(core.on_key_events, 0)
+        port = server.port
+    try:
+        result = loadgen(port, args.proto, args.batch, args.window, args.seconds, args.key)
+    finally:
+        if core is not None:
+            server.close()
+            core.stats.close()
+            shutil.rmtree(root, ignore_errors=True)
+    print(f"{result['events']} events ({result['accepted']} accepted) in batches of {args.batch}, "
+          f"{args.window} in flight, {args.proto} protocol")
+    print(f"  {result['events_per_s']:,.0f} events/s")
+    print(f"  batch round trip  p50 {result['batch_rtt_p50_ms']:.3f} ms  p99 {result['batch_rtt_p99_ms']:.3f} ms")
+    print(f"  server processing p50 {result['server_p50_ms']:.3f} ms  p99 {result['server_p99_ms']:.3f} ms")
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Yuji Funk benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run = sub.add_parser("run", help="generate fixtures and run all benchmarks")
+    run.add_argument("--files", type=int, default=200, help="files per library (default 200)")
+    run.add_argument("--seconds", type=float, default=0.25, help="length of each fixture sound")
+    run.add_argument("--sound-entries", type=int, default=0, help="pad sound_settings to this many entries")
+    run.add_argument("--repeat", type=int, default=30, help="timed iterations per benchmark")
+    run.add_argument("--only", nargs="*", help="run only benchmarks starting with these prefixes")
+    run.add_argument("--fixtures", help="keep fixtures in this directory instead of a temp dir")
+    run.add_argument("--audio", choices=("pygame", "null", "callback"), default="pygame",
+                     help="audio backend of the benchmarked cores (default pygame)")
+    run.add_argument("--out", default="bench.json")
+    run.set_defaults(func=cmd_run)
+    cmp_ = sub.add_parser("compare", help="compare two result files; exit 1 on regression")
+    cmp_.add_argument("baseline")
+    cmp_.add_argument("current")
+    cmp_.add_argument("--threshold", type=float, default=0.15, help="allowed slowdown ratio (default 0.15)")
+    cmp_.add_argument("--min-delta", type=float, default=0.05, help="ignore differences below this many ms")
+    cmp_.set_defaults(func=cmd_compare)
+    gen = sub.add_parser("loadgen", help="measure sustained events/s through the input server")
+    gen.add_argument("--port", type=int, default=0, help="input_port of a running app (default: in-process core)")
+    gen.add_argument("--proto", choices=("binary", "line"), default="binary")
+    gen.add_argument("--batch", type=int, default=16, help="key events per batch")
+    gen.add_argument("--window", type=int, default=4, help="batches in flight")
+    gen.add_argument("--seconds", type=float, default=5.0)
+    gen.add_argument("--key", default="r", help="key name to send (must be bound in the app)")
+    gen.add_argument("--files", type=int, default=50, help="fixture files per library for the in-process core")
+    gen.add_argument("--audio", choices=("pygame", "null", "callback"), default="pygame",
+                     help="audio backend of the in-process core (default pygame)")
+    gen.add_argument("--out", help="also write the summary as JSON")
+    gen.set_defaults(func=cmd_loadgen)
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())